@@ -0,0 +1,130 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from general_functions.instrumentation import format_summary, record_results, summary
+from general_functions.snapshot import load_snapshot
+from general_functions.validation import COLUMNAR_MIN_ROWS, validate_chunk
+
+# Headless counterpart of part_number_validator.py for large BOM exports
+# --> one part number per line from a file or stdin, results written in input order as JSONL or CSV
+#
+# --> --timing adds each part number's stage timings (ms) to its result and prints a per stage summary of the last
+#     part numbers to stderr (general_functions/instrumentation.py)
+#
+# ex. python batch_validator.py bom.txt -o results.csv --format csv --workers 8
+
+CSV_COLUMNS = ["line", "input", "model", "valid", "part_number", "errors", "tokens"]
+
+
+# ------------------------- Functions -----------------------------
+
+def read_chunks(lines, chunk_size):
+    # yields lists of (line number, part number) --> blank lines are skipped but keep their line numbers counted
+    numbered = ((number, line.strip()) for number, line in enumerate(lines, start=1))
+    numbered = (item for item in numbered if item[1])
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _validate_numbered_chunk(chunk, timing=False):
+    results = validate_chunk([part_number for _, part_number in chunk], timing=timing)
+    return [{"line": number, **result} for (number, _), result in zip(chunk, results)]
+
+
+def validate_stream(lines, workers=None, chunk_size=500, timing=False):
+    # yields one result dict per non blank line, in input order
+    # --> only a bounded number of chunks are in flight so input is streamed instead of read up front
+    # --> the catalog snapshot (general_functions/snapshot.py) is brought up to date here once, every worker installs
+    #     it in the pool initializer instead of deriving the router, parsers and rule tables again
+    # --> timing: results carry "timing", worker timings are recorded into this process's ring buffer
+    if workers == 1:
+        # no pool to feed --> chunks long enough for the column wise path (general_functions/columnar.py)
+        for chunk in read_chunks(lines, max(chunk_size, COLUMNAR_MIN_ROWS)):
+            yield from _validate_numbered_chunk(chunk, timing)
+        return
+
+    chunks = read_chunks(lines, chunk_size)
+    workers = workers or os.cpu_count() or 1
+    load_snapshot()  # rebuilt here if stale, so the workers only read the file (forked workers inherit it installed)
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_snapshot) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_validate_numbered_chunk, chunk, timing))
+            if len(pending) >= workers * 4:
+                yield from _recorded(pending.popleft().result(), timing)
+        while pending:
+            yield from _recorded(pending.popleft().result(), timing)
+
+
+def _recorded(results, timing):
+    if timing:
+        record_results(results)  # worker timings --> this process's ring buffer
+    return results
+
+
+def write_jsonl(results, out):
+    for result in results:
+        out.write(json.dumps(result) + "\n")
+
+
+def write_csv(results, out, timing=False):
+    writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS + ["timing"] if timing else CSV_COLUMNS)
+    writer.writeheader()
+    for result in results:
+        row = {
+            **result,
+            "errors": " | ".join(result["errors"]),
+            "tokens": json.dumps(result["tokens"]) if result["tokens"] is not None else "",
+        }
+        if timing:
+            row["timing"] = json.dumps(result["timing"])
+        writer.writerow(row)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Validate part numbers in bulk (one per line).")
+    arg_parser.add_argument("input", nargs="?", default="-", help="file of part numbers, '-' or omitted for stdin")
+    arg_parser.add_argument("-o", "--output", default="-", help="output file, '-' or omitted for stdout")
+    arg_parser.add_argument("--format", choices=["jsonl", "csv"], default=None,
+                            help="output format (default: from output extension, else jsonl)")
+    arg_parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores, 1 = no pool)")
+    arg_parser.add_argument("--chunk-size", type=int, default=500,
+                            help=f"part numbers sent to a worker at a time ({COLUMNAR_MIN_ROWS} or more: column wise)")
+    arg_parser.add_argument("--timing", action="store_true",
+                            help="add stage timings (ms) to every result and print a stage summary to stderr")
+    args = arg_parser.parse_args(argv)
+
+    output_format = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8-sig")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        results = validate_stream(
+            source, workers=args.workers, chunk_size=args.chunk_size, timing=args.timing,
+        )
+        if output_format == "csv":
+            write_csv(results, target, args.timing)
+        else:
+            write_jsonl(results, target)
+        if args.timing:
+            stats = summary()
+            print(f"stage timings of the last {stats['total']['count'] if stats else 0} part numbers", file=sys.stderr)
+            print(format_summary(stats), file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == "__main__":
+    main()
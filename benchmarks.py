@@ -0,0 +1,268 @@
+import argparse
+import gc
+import hashlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from pydantic import ValidationError
+
+from general_functions.catalog import CATALOG, find_entry, route_part_number
+from general_functions.parser import compile_token_map
+from general_functions.router import RoutingError
+from general_functions.sampling import generate_valid_parts, sample_configurations
+from general_functions.snapshot import load_snapshot
+from general_functions.validation import validate_part_number
+
+# Micro benchmarks of every catalog model, written as JSON so two revisions can be compared
+# --> stages: routing, TokenMapParser.parse, model construction (model_validator included), build_part_number,
+#     the whole validate_part_number pipeline and generate_valid_parts at 1 / 100 / 10k parts
+# --> every stage runs over a fixed corpus of valid and invalid part numbers per model: valid ones are drawn with a
+#     fixed seed, invalid ones are seeded single character edits of them that fail validation
+# --> save the corpus once (--corpus) and reuse it on the other revision, so both runs time the same inputs
+#
+# ex. python benchmarks.py run -o base.json --corpus corpus.json
+#     git checkout feature && python benchmarks.py run -o head.json --corpus corpus.json
+#     python benchmarks.py compare base.json head.json
+
+RESULTS_FORMAT = 1
+GENERATE_COUNTS = (1, 100, 10_000)
+EDIT_ALPHABET = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789-"
+
+
+# ------------------------- Corpus -----------------------------
+
+def _edit(part_number, rng):
+    # one seeded single character edit --> substitution, deletion, insertion or truncation
+    position = rng.randrange(len(part_number))
+    kind = rng.randrange(4)
+    if kind == 0:
+        return part_number[:position] + rng.choice(EDIT_ALPHABET) + part_number[position + 1:]
+    if kind == 1:
+        return part_number[:position] + part_number[position + 1:]
+    if kind == 2:
+        return part_number[:position] + rng.choice(EDIT_ALPHABET) + part_number[position:]
+    return part_number[:max(position, 1)]
+
+
+def build_corpus(entries, size, seed) -> dict:
+    # catalog name --> {"valid": [...], "invalid": [...]}
+    corpus = {}
+    for entry in entries:
+        rng = random.Random(f"{seed}:{entry['name']}")
+        valid = generate_valid_parts(entry["model"], size, seed=rng)
+        invalid = []
+        if entry["pattern"]:
+            valid = [part for part in valid if validate_part_number(part)["valid"]]
+            for part_number in valid * 4:
+                if len(invalid) >= size:
+                    break
+                edited = _edit(part_number, rng)
+                if edited and edited != part_number and not validate_part_number(edited)["valid"]:
+                    invalid.append(edited)
+        corpus[entry["name"]] = {"valid": valid, "invalid": invalid}
+    return corpus
+
+
+def corpus_hash(corpus) -> str:
+    return hashlib.sha256(json.dumps(corpus, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# ------------------------- Timing -----------------------------
+
+def measure(function, items, repeat) -> dict:
+    # per item time of `function` over `items`, best and median of `repeat` runs (garbage collector off, like timeit)
+    items = list(items)
+    if not items:
+        return None
+    runs = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for item in items:
+                function(item)
+            runs.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    best = min(runs) / len(items)
+    return {
+        "items": len(items),
+        "best_us": best * 1e6,
+        "median_us": statistics.median(runs) / len(items) * 1e6,
+        "per_second": 1 / best if best else None,
+    }
+
+
+def _route(part_number):
+    try:
+        return route_part_number(part_number)
+    except RoutingError:
+        return None
+
+
+def _tokens(parser, part_number):
+    try:
+        return parser.parse(part_number)
+    except ValueError:
+        return None
+
+
+def _construct(model_class, tokens):
+    try:
+        return model_class(**tokens)
+    except ValidationError:
+        return None
+
+
+def benchmark_entry(entry, parts, repeat) -> dict:
+    model_class = entry["model"]
+    valid, invalid = parts["valid"], parts["invalid"]
+    stages = {}
+
+    if entry["pattern"]:
+        parser = compile_token_map(entry["token_map"])
+        valid_tokens = [tokens for tokens in (_tokens(parser, p) for p in valid) if tokens is not None]
+        invalid_tokens = [tokens for tokens in (_tokens(parser, p) for p in invalid) if tokens is not None]
+
+        stages["route"] = measure(_route, valid + invalid, repeat)
+        stages["parse"] = measure(lambda p: _tokens(parser, p), valid, repeat)
+        stages["parse_invalid"] = measure(lambda p: _tokens(parser, p), invalid, repeat)
+        stages["validate"] = measure(lambda p: validate_part_number(p, details=True), valid, repeat)
+        stages["validate_invalid"] = measure(lambda p: validate_part_number(p, details=True), invalid, repeat)
+    else:
+        # configurator only model --> nothing to route or parse, construction works on field dicts
+        valid_tokens = sample_configurations(model_class, len(valid), seed=0)
+        invalid_tokens = []
+
+    stages["construct"] = measure(lambda tokens: _construct(model_class, tokens), valid_tokens, repeat)
+    stages["construct_invalid"] = measure(lambda tokens: _construct(model_class, tokens), invalid_tokens, repeat)
+    instances = [instance for instance in (_construct(model_class, t) for t in valid_tokens) if instance is not None]
+    stages["build_part_number"] = measure(lambda instance: instance.build_part_number(), instances, repeat)
+
+    for count in GENERATE_COUNTS:
+        generated = []
+        runs = max(1, repeat if count < GENERATE_COUNTS[-1] else repeat // 3)
+        timing = measure(lambda seed: generated.append(len(generate_valid_parts(model_class, count, seed=seed))), [0], runs)
+        timing["parts"] = generated[0]  # fewer than `count` when the valid space is smaller
+        timing["parts_per_second"] = timing["parts"] / (timing["best_us"] / 1e6)
+        stages[f"generate_{count}"] = timing
+
+    return {stage: timing for stage, timing in stages.items() if timing is not None}
+
+
+def git_revision() -> dict:
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        revision = subprocess.run(["git", "rev-parse", "HEAD"], cwd=here, capture_output=True, text=True, check=True)
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=here,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return {"revision": None, "dirty": None}
+    return {"revision": revision.stdout.strip(), "dirty": bool(status.stdout.strip())}
+
+
+def run(args):
+    load_snapshot()
+    entries = [find_entry(name) for name in args.models] or CATALOG
+
+    if args.corpus and os.path.exists(args.corpus):
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = json.load(f)
+    else:
+        corpus = build_corpus(CATALOG, args.size, args.seed)
+        if args.corpus:
+            with open(args.corpus, "w", encoding="utf-8") as f:
+                json.dump(corpus, f, indent=1)
+
+    results = {}
+    for entry in entries:
+        parts = corpus.get(entry["name"], {"valid": [], "invalid": []})
+        results[entry["name"]] = benchmark_entry(entry, parts, args.repeat)
+        summary = ", ".join(f"{stage} {timing['best_us']:.1f}us" for stage, timing in results[entry["name"]].items())
+        print(f"{entry['name']}: {summary}", file=sys.stderr)
+
+    report = {
+        "format": RESULTS_FORMAT,
+        "meta": {
+            **git_revision(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "corpus": corpus_hash(corpus),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=1)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+# ------------------------- Compare -----------------------------
+
+def compare(args):
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+    if base["meta"]["corpus"] != head["meta"]["corpus"]:
+        print("warning: the runs used different corpora, pass the same --corpus file to both", file=sys.stderr)
+
+    print(f"base {base['meta']['revision']}  head {head['meta']['revision']}  (best us per item, head / base)")
+    print(f"{'model':45} {'stage':20} {'base':>10} {'head':>10} {'ratio':>7}")
+    slower = 0
+    for name, stages in head["results"].items():
+        for stage, timing in stages.items():
+            before = base["results"].get(name, {}).get(stage)
+            if before is None:
+                continue
+            ratio = timing["best_us"] / before["best_us"] if before["best_us"] else float("inf")
+            flag = ""
+            if ratio > 1 + args.threshold:
+                flag, slower = "  slower", slower + 1
+            elif ratio < 1 - args.threshold:
+                flag = "  faster"
+            print(f"{name:45} {stage:20} {before['best_us']:>10.1f} {timing['best_us']:>10.1f} {ratio:>6.2f}x{flag}")
+    print(f"{slower} stages slower by more than {args.threshold:.0%}")
+    sys.exit(1 if slower else 0)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark routing, parsing, validation and generation per model.")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time every stage of every model and write JSON results")
+    run_parser.add_argument("models", nargs="*", help="catalog display names or model class names (default: all)")
+    run_parser.add_argument("-o", "--output", default="-", help="results file, '-' or omitted for stdout")
+    run_parser.add_argument("--corpus", default=None, help="corpus JSON file: read if it exists, else written there")
+    run_parser.add_argument("--size", type=int, default=200, help="valid and invalid part numbers per model")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=5, help="runs per stage, best and median are reported")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="relative change reported as slower / faster (exit code 1 if any is slower)")
+    compare_parser.set_defaults(handler=compare)
+
+    args = arg_parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
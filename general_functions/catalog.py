@@ -0,0 +1,162 @@
+import importlib
+import importlib.util
+from functools import lru_cache
+
+from general_functions.router import ModelRouter
+
+# Model modules are NOT imported here --> every catalog entry records where its model and token map live
+# ("package.module:NAME") and the module is imported the first time entry["model"] / entry["token_map"] is read.
+# Routing only needs the patterns, so a page that touches one family only pays for that family's modules.
+
+# Regex Pattern Matching for Model Recognition
+# --------------------- JSY ---------------------------
+# --- plugin
+VALVE_DETECTOR = r"^JSY(?P<series>[135])(?P<actuation>[1-5A-C])(?P<static>\d{2})" # actually covers both plugin and non plugin
+JSY_DSUB_MANIFOLD = r"^JJ5SY[135]-10(FW|FC|F|PG|PHC|PH|PGC|PC|P)[12]-"
+JSY_TERMINAL_BOX_MANIFOLD = r"^JJ5SY[135]-10(TC|T)-"
+JSY_LEADWIRE_MANIFOLD = r"^JJ5SY[135]-10(L1|L2|L3)[123]-"
+JSY_EX600_MANIFOLD = r"^JJ5SY[135]-10S6"
+JSY_EX260_MANIFOLD  = r"^JJ5SY[135]-10S(?!FPN|DPN|0)[A-Z0-9]{2,3}"
+JSY_EX260_PROFISAFE_MANIFOLD = r"^JJ5SY[135]-10S(FPN|DPN|0)"
+JSY_EX120_MANIFOLD = r"^JJ5SY[135]-10S3(ZBN|ZB|V|Q|0)-"
+JSY_EJECTOR_MANIFOLD = r"^JJ5SY1-E10S"
+JSY_PLUGIN_VALVE = r"^JSY[135][1-5A-C]00"
+
+# --- non plugin
+JSY_METALBASE_MANIFOLD = r"^JJ5SY[135]-(40|41)"
+JSY_NONPLUGIN_VALVE = r"^JSY[135][1-5A-C]40"
+
+# --------------------- SY1 ---------------------------
+SY1_TYPE_10_11_DSUB_MANIFOLD = r"^SS5Y[357]-(10|11)(FW|F|PG|PH|P)"
+SY1_TYPE_10_11_TERMINAL_BLOCK = r"^SS5Y[357]-(10|11)(TC|T)"
+SY1_BASE_MOUNTED_PLUGIN_VALVE = r"^SY[357][ABC12345]0"
+
+# ---------------------- SY ---------------------------
+SY_BODY_PORTED_VALVE = r"^SY[3579][12345]20"
+
+# ---------------------- HF ---------------------------
+HF1B_ZL = r"^HF1B-ZL"
+
+# ----------------------------- Catalog -----------------------------
+
+def load_object(location: str):
+    # "package.module:NAME" --> the object, importing the module on first use
+    module_name, _, name = location.partition(":")
+    return getattr(importlib.import_module(module_name), name)
+
+
+@lru_cache(maxsize=None)
+def module_file(location: str) -> str:
+    # source file of a "package.module:NAME" location without importing the module (looked up once per location)
+    return importlib.util.find_spec(location.partition(":")[0]).origin
+
+
+class CatalogEntry(dict):
+    # catalog metadata --> "model" / "token_map" are loaded from their locations the first time they are read
+    LAZY_KEYS = {"model": "model_location", "token_map": "token_map_location"}
+
+    def __missing__(self, key):
+        if key not in self.LAZY_KEYS:
+            raise KeyError(key)
+        value = self[key] = load_object(self[self.LAZY_KEYS[key]])
+        return value
+
+
+def _entry(family, name, pattern, module, model, token_map):
+    return CatalogEntry(
+        family=family, name=name, pattern=pattern,
+        model_location=f"{module}:{model}", token_map_location=f"{module}:{token_map}",
+    )
+
+
+# Every model --> list order is the routing priority (first matching pattern wins), pattern None is never routed
+CATALOG = [
+    # ---------------- JSY MANIFOLDS -----------------------
+    _entry("JSY", "JSY Terminal Manifold", JSY_TERMINAL_BOX_MANIFOLD,
+           "jsy_plugin.manifold_terminalbox", "JJ5SY_PLUGIN_MFLD_TERMBOX_MODEL", "JJ5SY_PLUGIN_MFLD_TERMBOX_TOKEN_MAP"),
+    _entry("JSY", "JSY DSUB Manifold", JSY_DSUB_MANIFOLD,
+           "jsy_plugin.manifold_dsub_flatribbon", "JJ5SY_PLUGIN_MFLD_DSUB_MODEL", "JJ5SY_PLUGIN_MFLD_DSUB_TOKEN_MAP"),
+    _entry("JSY", "JSY Leadwire Manifold", JSY_LEADWIRE_MANIFOLD,
+           "jsy_plugin.manifold_leadwire", "JJ5SY_PLUGIN_MFLD_LEADWIRE_MODEL", "JJ5SY_PLUGIN_MFLD_LEADWIRE_TOKEN_MAP"),
+    _entry("JSY", "JSY EX600 Manifold", JSY_EX600_MANIFOLD,
+           "jsy_plugin.manifold_ex600", "JJ5SY_PLUGIN_MFLD_EX600_MODEL", "JJ5SY_PLUGIN_MFLD_EX600_TOKEN_MAP"),
+    _entry("JSY", "JSY EX260 Manifold", JSY_EX260_MANIFOLD,
+           "jsy_plugin.manifold_ex260", "JJ5SY_PLUGIN_MFLD_EX260_MODEL", "JJ5SY_PLUGIN_MFLD_EX260_TOKEN_MAP"),
+    _entry("JSY", "JSY EX260 (PROFISAFE) Manifold", JSY_EX260_PROFISAFE_MANIFOLD,
+           "jsy_plugin.manifold_ex260_profisafe", "JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_MODEL", "JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_TOKEN_MAP"),
+    _entry("JSY", "JSY EX120 Manifold", JSY_EX120_MANIFOLD,
+           "jsy_plugin.manifold_ex120", "JJ5SY_PLUG_IN_MFLD_EX120_MODEL", "JJ5SY_PLUGIN_MFLD_EX120_TOKEN_MAP"),
+    _entry("JSY", "JSY Metalbase Manifold", JSY_METALBASE_MANIFOLD,
+           "jsy_nonplugin.manifold_metalbase", "JJ5SY_NONPLUGIN_MFLD_METALBASE_MODEL", "JJ5SY_NONPLUGIN_MFLD_METALBASE_TOKEN_MAP"),
+    _entry("JSY", "JSY Ejector Manifold", JSY_EJECTOR_MANIFOLD,
+           "jsy_plugin.manifold_jsy_e", "JJ5SY_PLUGIN_EJECTOR_MANIFOLD_MODEL", "JJ5SY_PLUGIN_EJECTOR_MANIFOLD_TOKEN_MAP"),
+
+    # ---------------- SY1 MANIFOLDS -----------------------
+    _entry("SY-1", "SY-1 Type 10/11 DSUB Manifold", SY1_TYPE_10_11_DSUB_MANIFOLD,
+           "SY1.manifold_type_10_11_dsub_flatribbon", "SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_MODEL", "SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_TOKEN_MAP"),
+    _entry("SY-1", "SY-1 Type 10/11 Terminal Block Manifold", SY1_TYPE_10_11_TERMINAL_BLOCK,
+           "SY1.manifold_type_10_11_terminal_block_spring_type", "SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_MODEL", "SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_TOKEN_MAP"),
+
+    # ------------------ SY1 VALVES ------------------
+    _entry("SY-1", "SY-1 Base Mounted Valve", SY1_BASE_MOUNTED_PLUGIN_VALVE,
+           "SY1.valve_base_mounted", "SY1_BASE_MOUNTED_PLUGIN_VALVE_MODEL", "SY1_BASE_MOUNTED_PLUGIN_VALVE_TOKEN_MAP"),
+
+    # ------------------ SY VALVES -------------------
+    _entry("SY", "SY Body Ported Valve", SY_BODY_PORTED_VALVE,
+           "SY.valve_body_ported", "SY_BODY_PORTED_VALVE_MODEL", "SY_BODY_PORTED_VALVE_TOKEN_MAP"),
+
+    # -------------------- HF -------------------------
+    _entry("HF", "HF1B-ZL", HF1B_ZL,
+           "HF.HF1B_ZL", "HF1B_ZL_MODEL", "HF1B_ZL_TOKEN_MAP"),
+
+    # ------------------ JSY VALVES ------------------
+    # static code in the part number decides plugin (00) vs non plugin (40)
+    _entry("JSY", "JSY Non Plugin Valve", JSY_NONPLUGIN_VALVE,
+           "jsy_nonplugin.valve", "JSY_NONPLUGIN_VALVE_MODEL", "NONPLUGIN_VALVE_TOKEN_MAP"),
+    _entry("JSY", "JSY Plugin Valve", JSY_PLUGIN_VALVE,
+           "jsy_plugin.valve", "JSY_PLUGIN_VALVE_MODEL", "PLUGIN_VALVE_TOKEN_MAP"),
+
+    # ------------- NOT ROUTED (configurator only) -------------
+    _entry("SY-1", "SY-1 Blanking Plate", None,
+           "SY1.valve_blank_plate", "SY1_PLUGIN_BLANKING_PLATE_MODEL", "SY1_BASE_MOUNTED_PLUGIN_VALVE_TOKEN_MAP"),
+]
+
+# Patterns used to explain a part number that did not route to any model
+ROUTING_DETECTORS = [
+    (VALVE_DETECTOR, "Unknown static code `{static}` — cannot determine part type."),
+]
+
+
+# router trie from the catalog snapshot (general_functions/snapshot.py)
+_PRECOMPUTED_ROUTER = {}
+
+
+def use_precomputed_router(trie):
+    _PRECOMPUTED_ROUTER["trie"] = trie
+    get_router.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get_router() -> ModelRouter:
+    # built once per process and shared by every rerun / session
+    return ModelRouter(
+        [entry for entry in CATALOG if entry["pattern"]], ROUTING_DETECTORS, trie=_PRECOMPUTED_ROUTER.get("trie")
+    )
+
+
+def route_part_number(part_number: str) -> dict:
+    # returns the catalog entry for the part number or raises RoutingError
+    return get_router().route(part_number)
+
+
+def find_entry(name: str) -> CatalogEntry:
+    # catalog entry by model class name or display name (nothing is imported)
+    for entry in CATALOG:
+        if name in (entry["model_location"].partition(":")[2], entry["name"]):
+            return entry
+    raise KeyError(f"Unknown model '{name}'")
+
+
+def find_model(name: str):
+    # catalog model by class name or display name --> imports only that model's module
+    return find_entry(name)["model"]
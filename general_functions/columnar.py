@@ -0,0 +1,295 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from general_functions.catalog import get_router
+from general_functions.parser import _pattern_width, token_map_key
+
+# Columnar routing and tokenizing for bulk validation (front half of the Arrow pipeline)
+# --> a whole column of part numbers is routed with one regex kernel call per catalog pattern and split into token
+#     columns with one extract_regex call per routed model, no Python code runs per row (except to confirm the hits of
+#     a router pattern RE2 cannot run, ex. the EX260 lookahead)
+# --> Arrow's regex engine (RE2) has no atomic groups, backreferences or lookarounds, so the parser's single regex is
+#     rebuilt without them and every split is checked column wise against what the atomic regex would have taken
+#     --> rows the checks reject are exactly the rows TokenMapParser.match_fast rejects, those go to the scalar parser
+#
+# ex. for group in split_column(df["Part Number"]).values():
+#         check = check_columns(group.entry["model"], group.tokens)   (general_functions/vectorized.py)
+#         group.fallback_rows --> validate_part_number one by one
+
+_LOOKAROUND = re.compile(r"\(\?<?[=!]")
+
+
+def as_string_array(part_numbers) -> pa.Array:
+    # pandas Series / list / pyarrow (Chunked)Array --> one contiguous pyarrow string array
+    if isinstance(part_numbers, pa.ChunkedArray):
+        part_numbers = part_numbers.combine_chunks()
+    elif not isinstance(part_numbers, pa.Array):
+        values = part_numbers.to_numpy(dtype=object) if hasattr(part_numbers, "to_numpy") else list(part_numbers)
+        part_numbers = pa.array(values, type=pa.string(), from_pandas=True)
+    return part_numbers.cast(pa.string())
+
+
+def re2_compatible(pattern) -> bool:
+    try:
+        pc.match_substring_regex(pa.array([""], type=pa.string()), pattern)
+    except pa.ArrowInvalid:
+        return False
+    return True
+
+
+def strip_lookarounds(pattern) -> str:
+    # pattern with every (?=...) / (?!...) / (?<=...) / (?<!...) removed --> matches a superset of the original
+    out = []
+    i = 0
+    while i < len(pattern):
+        found = _LOOKAROUND.search(pattern, i)
+        if found is None:
+            out.append(pattern[i:])
+            break
+        out.append(pattern[i:found.start()])
+        depth, j, in_class = 0, found.start(), False
+        while j < len(pattern):
+            ch = pattern[j]
+            if ch == "\\":
+                j += 2
+                continue
+            if in_class:
+                in_class = ch != "]"
+            elif ch == "[":
+                in_class = True
+            elif ch == "(":
+                depth += 1
+            elif ch == ")":
+                depth -= 1
+                if depth == 0:
+                    break
+            j += 1
+        i = j + 1
+    return "".join(out)
+
+
+def non_capturing(pattern) -> str:
+    # plain (...) groups turned into (?:...) --> extract_regex only accepts named groups
+    out = []
+    i, in_class = 0, False
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(" and not pattern.startswith("?", i + 1):
+            ch = "(?:"
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+# ------------------------- Routing -----------------------------
+
+def route_column(part_numbers) -> np.ndarray:
+    # router entry index per row (same priority as ModelRouter.route), -1 where no pattern matches
+    part_numbers = as_string_array(part_numbers)
+    router = get_router()
+    routed = np.full(len(part_numbers), -1, dtype=np.int32)
+
+    # rows still unrouted and their strings --> compacted whenever a pattern routed a good share of them
+    rows = np.arange(len(part_numbers))
+    strings = part_numbers
+    for priority, entry in enumerate(router.entries):
+        if not len(rows):
+            break
+        pattern = entry["pattern"]
+        if re2_compatible(pattern):
+            hits = pc.fill_null(pc.match_substring_regex(strings, pattern), False).to_numpy(zero_copy_only=False)
+        else:
+            # lookarounds --> the superset pattern runs in Arrow, only its hits are confirmed with Python re
+            hits = pc.fill_null(pc.match_substring_regex(strings, strip_lookarounds(pattern)), False)
+            hits = hits.to_numpy(zero_copy_only=False)
+            candidates = np.flatnonzero(hits)
+            compiled = router._compiled[priority]
+            hits[candidates] = [
+                compiled.match(s) is not None for s in strings.take(pa.array(candidates)).to_pylist()
+            ]
+        if hits.any():
+            routed[rows[hits]] = priority
+            keep = ~hits
+            rows = rows[keep]
+            strings = strings.filter(pa.array(keep))
+    return routed
+
+
+# ------------------------- Tokenizing -----------------------------
+
+class RE2TokenPlan:
+    # the token map's single regex rebuilt for RE2, group t{index} per token
+    # --> "variable" tokens: the atomic group becomes a plain group, checked against the first match of the pattern
+    # --> "fixed" tokens whose pattern only matches `length` characters are kept as they are
+    # --> "window" tokens (pattern can match other lengths) take the next `length` characters, checked with a fullmatch
+    # --> optional fixed / window tokens are (?:...|), checked against whether the atomic regex would take the window
+    def __init__(self, token_map):
+        self.tokens = []   # (field name, group, kind, pattern, length, optional)
+        parts = []
+        for index, token in enumerate(token_map):
+            pattern = non_capturing(token["pattern"])
+            length = token.get("length")
+            optional = token.get("optional", False) and length is not None
+            group = f"t{index}"
+            if length is None:
+                kind = "variable"
+                window = f"(?P<{group}>(?:{pattern}))"
+            elif _pattern_width(token["pattern"]) == (length, length):
+                kind = "fixed"
+                window = f"(?P<{group}>(?:{pattern}))"
+            else:
+                kind = "window"
+                window = f"(?P<{group}>[\\s\\S]{{{length}}})"
+            parts.append(f"(?:{window}|)" if optional else window)
+            self.tokens.append((token["name"], group, kind, pattern, length, optional))
+
+        self.pattern = "^" + "".join(parts) + "$"
+        self.supported = re2_compatible(self.pattern) and all(re2_compatible(token[3]) for token in self.tokens)
+
+        # output column per field name --> the last token with that name wins, like the parser
+        self.fields = {name: group for name, group, *_ in self.tokens}
+
+    def extract(self, strings) -> tuple:
+        # (token table, parsed mask) for already stripped strings
+        # --> parsed rows carry exactly the split TokenMapParser.match_fast returns, the others need the scalar parser
+        split = pc.extract_regex(strings, self.pattern)
+        table = pa.table({name: split.field(group) for name, group in self.fields.items()})
+
+        # the checks only run on rows the RE2 regex split at all
+        matched = np.flatnonzero(split.is_valid().to_numpy(zero_copy_only=False))
+        parsed = np.zeros(len(strings), dtype=bool)
+        parsed[matched] = self._atomic_splits(split.take(pa.array(matched)))
+        return table, parsed
+
+    def _atomic_splits(self, split) -> np.ndarray:
+        # True where every token took what the parser's atomic regex would have taken at its position
+        groups = {group: split.field(group) for _, group, *_ in self.tokens}
+        consistent = np.ones(len(split), dtype=bool)
+
+        # rest of the string from each token on, built back to front
+        rest = [None] * len(self.tokens)
+        tail = None
+        for k in range(len(self.tokens) - 1, -1, -1):
+            column = groups[self.tokens[k][1]]
+            tail = column if tail is None else pc.binary_join_element_wise(column, tail, "")
+            rest[k] = tail
+
+        for k, (name, group, kind, pattern, length, optional) in enumerate(self.tokens):
+            column = groups[group]
+            if kind == "variable":
+                if len(set(_pattern_width(pattern))) == 1:
+                    continue  # one width --> the first match is the only segment it can take
+                first = pc.extract_regex(rest[k], f"^(?P<m>(?:{pattern}))").field("m")
+                check = pc.equal(first, column)
+            elif optional:
+                head = pc.utf8_slice_codeunits(rest[k], 0, length)
+                takes = pc.and_(
+                    pc.greater_equal(pc.utf8_length(rest[k]), length),
+                    pc.match_substring_regex(head, f"^(?:{pattern})$"),
+                )
+                check = pc.equal(pc.not_equal(column, ""), takes)
+            elif kind == "window":
+                check = pc.match_substring_regex(column, f"^(?:{pattern})$")
+            else:
+                continue
+            consistent &= pc.fill_null(check, False).to_numpy(zero_copy_only=False)
+        return consistent
+
+
+@lru_cache(maxsize=None)
+def _token_plan(key) -> RE2TokenPlan:
+    return RE2TokenPlan([
+        {"name": name, "pattern": pattern, "length": length, "optional": optional}
+        for name, pattern, length, optional in key
+    ])
+
+
+def get_token_plan(token_map) -> RE2TokenPlan:
+    return _token_plan(token_map_key(token_map))
+
+
+class TokenGroup:
+    def __init__(self, entry, rows, tokens, fallback_rows):
+        self.entry = entry                  # catalog entry the rows routed to
+        self.rows = rows                    # input row index of each row of `tokens`
+        self.tokens = tokens                # pyarrow Table, one string column per token name
+        self.fallback_rows = fallback_rows  # routed rows the single regex does not split --> scalar parser
+
+
+def tokenize_column(entry, part_numbers) -> tuple:
+    # (token table, parsed mask) of a column of part numbers routed to `entry`
+    plan = get_token_plan(entry["token_map"])
+    strings = pc.utf8_trim_whitespace(as_string_array(part_numbers))
+    if not plan.supported:
+        # token patterns RE2 cannot run --> every row takes the scalar parser
+        empty = pa.table({name: pa.nulls(len(strings), pa.string()) for name in plan.fields})
+        return empty, np.zeros(len(strings), dtype=bool)
+    return plan.extract(strings)
+
+
+def split_column(part_numbers) -> dict:
+    # routes and tokenizes a whole column --> {entry name: TokenGroup}, unrouted rows are left out
+    # (their routing error is the scalar one, ex. route_part_number on those rows)
+    part_numbers = as_string_array(part_numbers)
+    routed = route_column(part_numbers)
+    entries = get_router().entries
+
+    groups = {}
+    for priority in np.unique(routed[routed >= 0]):
+        entry = entries[priority]
+        rows = np.flatnonzero(routed == priority)
+        tokens, parsed = tokenize_column(entry, part_numbers.take(pa.array(rows)))
+        groups[entry["name"]] = TokenGroup(
+            entry, rows[parsed], tokens.filter(pa.array(parsed)), rows[~parsed]
+        )
+    return groups
+
+
+# ------------------------- Validation -----------------------------
+
+def validate_column(part_numbers) -> list:
+    # validate_part_number(part_number) of every row (details=False), in input order
+    # --> routing, the single regex split, the rule checks (general_functions/vectorized.py) and build_part_number
+    #     (general_functions/part_builder.py) run column wise; a row whose single regex split is valid is accepted
+    #     with it, like the scalar path does
+    # --> unrouted rows, rows the single regex does not split and rows whose split is invalid (packrat search,
+    #     error messages) go through the scalar validate_part_number
+    from general_functions.part_builder import build_part_numbers
+    from general_functions.validation import validate_part_number
+    from general_functions.vectorized import check_columns
+
+    inputs = list(part_numbers)
+    results = [None] * len(inputs)
+    for group in split_column(inputs).values():
+        model_class = group.entry["model"]
+        check = check_columns(model_class, group.tokens)
+        valid = check.valid
+        if valid.any():
+            tokens = group.tokens.filter(pa.array(valid))
+            built = build_part_numbers(model_class, tokens).to_pylist()
+            for row, token_dict, part_number in zip(group.rows[valid], tokens.to_pylist(), built):
+                results[row] = {
+                    "input": inputs[row],
+                    "model": model_class.__name__,
+                    "tokens": token_dict,
+                    "valid": True,
+                    "errors": [],
+                    "part_number": part_number,
+                }
+
+    for row, result in enumerate(results):
+        if result is None:
+            results[row] = validate_part_number(inputs[row], compiled=True)
+    return results
@@ -0,0 +1,270 @@
+import argparse
+import random
+import sys
+from functools import lru_cache
+from itertools import islice, product
+from math import prod
+
+from pydantic import ValidationError
+
+from general_functions.construction import build_instance
+from general_functions.enumerator import iter_valid_configurations
+from general_functions.instrumentation import CONSTRUCTION, RULES, current_trace, timed
+from general_functions.rules import (
+    collects_errors, get_domains, get_literal_choices, get_rules, literal_error_message, model_key,
+)
+
+# Plain Python validators generated from the pydantic models
+# --> per model, one function is written out as source and compiled: a frozenset lookup per Literal field, then a
+#     lookup of each rule's field values in its precomputed allowed table (general_functions/rules.py)
+# --> the model's own rule code only runs for a broken rule, to produce its message --> same error lines, in the
+#     same order, as error_messages(ValidationError) from model(**tokens)
+# --> tokens that are not plain strings are handed to pydantic, so every input still gets pydantic's answer
+# --> the same code is also compiled as two functions (field checks / rules), used inside instrumentation.trace() so
+#     both stages are timed on their own
+#
+# ex. validator = get_compiled_validator(SY_BODY_PORTED_VALVE_MODEL)
+#     validator.errors(tokens)        --> [] when valid
+#     validator.instance(tokens)      --> model instance of valid tokens (no validation)
+#     python -m general_functions.compiled_validators SY_BODY_PORTED_VALVE_MODEL --source
+#     python -m general_functions.compiled_validators          (conformance check against pydantic, every model)
+
+CONFORMANCE_SAMPLE_SIZE = 200_000
+
+
+class _NotPlain(Exception):
+    # a token value the generated code does not handle (not a str) --> pydantic decides
+    pass
+
+
+class CompiledValidator:
+    def __init__(self, model_class):
+        self.model_class = model_class
+        self.fields = list(model_class.model_fields)
+        self.source, namespace = _generate(model_class)
+        exec(compile(self.source, f"<compiled validator {model_key(model_class)}>", "exec"), namespace)
+        self._validate = namespace["validate"]
+        self._check_fields = namespace["check_fields"]
+        self._check_rules = namespace["check_rules"]
+        self._all_fields = set(self.fields)
+        self._has_defaults = any(not field.is_required() for field in model_class.model_fields.values())
+
+    def check(self, tokens) -> tuple:
+        # (error lines, field values) --> values (every field, defaults filled in) only when there are no errors
+        try:
+            if current_trace() is None:
+                return self._validate(tokens)
+            return self._check_staged(tokens)
+        except _NotPlain:
+            try:
+                instance = self.model_class(**tokens)
+            except ValidationError as e:
+                return _error_messages(e), None
+            return [], dict(instance.__dict__)
+
+    def _check_staged(self, tokens) -> tuple:
+        # same answer as validate(tokens), field checks and rules timed on their own
+        errors, values = timed(CONSTRUCTION, self._check_fields, tokens)
+        if errors:
+            return errors, None
+        errors = timed(RULES, self._check_rules, values)
+        return (errors, None) if errors else (errors, values)
+
+    def errors(self, tokens) -> list:
+        return self.check(tokens)[0]
+
+    def instance(self, tokens, values=None):
+        # model instance of tokens that passed check() --> built without validating again
+        if values is None:
+            values = self.check(tokens)[1]
+        fields_set = {name for name in self.fields if name in tokens} if self._has_defaults else self._all_fields.copy()
+        return build_instance(self.model_class, values, fields_set)
+
+
+def _error_messages(e):
+    from general_functions.validation import error_messages
+    return error_messages(e)
+
+
+# ------------------------- Code Generation -----------------------------
+
+def _generate(model_class) -> tuple:
+    # (source of `validate(tokens)` and of its two stages `check_fields(tokens)` / `check_rules(values)`, namespace
+    # they run in)
+    domains = get_domains(model_class)
+    rules = get_rules(model_class)
+    collects = collects_errors(model_class)
+    fields = list(model_class.model_fields)
+    var = {name: f"v{position}" for position, name in enumerate(fields)}
+    namespace = {"MISSING": object(), "_NotPlain": _NotPlain}
+
+    lines = [
+        "    errors = []",
+        "    get = tokens.get",
+    ]
+
+    # field stage --> pydantic reports every field error, in field order, and skips the model validator
+    for position, (name, field) in enumerate(model_class.model_fields.items()):
+        v = var[name]
+        lines.append(f"    {v} = get({name!r}, MISSING)")
+        if field.is_required():
+            lines.append(f"    if {v} is MISSING:")
+            lines.append("        errors.append('Field required')")
+        else:
+            namespace[f"DEFAULT_{position}"] = field.default  # defaults are not validated
+            lines.append(f"    if {v} is MISSING:")
+            lines.append(f"        {v} = DEFAULT_{position}")
+        lines.append(f"    elif {v}.__class__ is not str:")
+        lines.append("        raise _NotPlain")
+        choices = get_literal_choices(field.annotation)
+        if choices:
+            namespace[f"DOMAIN_{position}"] = frozenset(choices)
+            namespace[f"LITERAL_{position}"] = literal_error_message(choices)
+            lines.append(f"    elif {v} not in DOMAIN_{position}:")
+            lines.append(f"        errors.append(LITERAL_{position})")
+        elif field.annotation is not str:
+            lines.append("    else:")
+            lines.append("        raise _NotPlain")
+    field_lines = lines + ["    if errors:", "        return errors, None"]
+
+    values = "{" + ", ".join(f"{name!r}: {var[name]}" for name in fields) + "}"
+
+    # rule stage --> allowed table lookup, the rule's own code only runs to word a broken rule
+    lines = ["    errors = []"]
+    literal = {name for name in fields if get_literal_choices(model_class.model_fields[name].annotation)}
+    for index, rule in enumerate(rules):
+        namespace[f"CHECK_{index}"] = rule.check
+        report = [f"        errors.extend(_lines(CHECK_{index}({values})))"]
+        if not collects:
+            report.append("        return errors, None")  # raise style validator --> first broken rule only
+        if rule.fields and set(rule.fields) <= literal:
+            key = var[rule.fields[0]] if len(rule.fields) == 1 else "(" + ", ".join(var[f] for f in rule.fields) + ")"
+            allowed = {combo[0] for combo in rule.allowed} if len(rule.fields) == 1 else set(rule.allowed)
+            namespace[f"ALLOWED_{index}"] = frozenset(allowed)
+            lines.append(f"    if {key} not in ALLOWED_{index}:")
+            lines.extend(report)
+        else:
+            # rule over a plain str field (the table only knows its default) --> the rule code decides
+            lines.append(f"    if CHECK_{index}({values}):")
+            lines.extend(report)
+    rule_lines = lines
+
+    source = [
+        "def validate(tokens):",
+        f"    # generated from {model_key(model_class)} --> (error lines, values)",
+        *field_lines,
+        *rule_lines[1:],  # errors is still the empty list of the field stage
+        "    if errors:",
+        "        return errors, None",
+        f"    return errors, {values}",
+        "",
+        "def check_fields(tokens):",
+        "    # field stage of validate() --> (error lines, values)",
+        *field_lines,
+        f"    return errors, {values}",
+        "",
+        "def check_rules(values):",
+        "    # rule stage of validate() on the values of check_fields() --> error lines",
+        *(f"    {var[name]} = values[{name!r}]" for name in fields),
+        *(line.replace("return errors, None", "return errors") for line in rule_lines),
+        "    return errors",
+    ]
+    namespace["_lines"] = _lines
+    return "\n".join(source) + "\n", namespace
+
+
+def _lines(messages) -> list:
+    # rule messages as error_messages() shows them --> one entry per line of the joined ValueError text
+    return "\n".join(messages).splitlines()
+
+
+@lru_cache(maxsize=None)
+def get_compiled_validator(model_class) -> CompiledValidator:
+    return CompiledValidator(model_class)
+
+
+# ------------------------- Conformance Check -----------------------------
+
+def _pydantic_errors(model_class, tokens) -> list:
+    try:
+        model_class(**tokens)
+    except ValidationError as e:
+        return _error_messages(e)
+    return []
+
+
+def conformance_inputs(model_class, sample_size=CONFORMANCE_SAMPLE_SIZE, seed=0, valid_limit=None):
+    # token dicts to compare on --> every valid configuration (the first `valid_limit` of them), the product of the
+    # field domains (all of it when it is no larger than `sample_size`, else a seeded sample) and, per field,
+    # missing / not one of its choices
+    yield from islice(iter_valid_configurations(model_class), valid_limit)
+
+    domains = get_domains(model_class)
+    names = list(domains)
+    total = prod(len(choices) for choices in domains.values())
+    if total <= sample_size:
+        for combo in product(*domains.values()):
+            yield dict(zip(names, combo))
+    else:
+        rng = random.Random(seed)
+        for _ in range(sample_size):
+            yield {name: rng.choice(choices) for name, choices in domains.items()}
+
+    base = dict(zip(names, (choices[0] for choices in domains.values())))
+    for name in names:
+        yield {key: value for key, value in base.items() if key != name}
+        yield {**base, name: "?"}
+        yield {**base, name: base[name] + "?"}
+
+
+def check_conformance(model_class, sample_size=CONFORMANCE_SAMPLE_SIZE, limit=None, valid_limit=None) -> tuple:
+    # (token dicts compared, mismatch count, first few mismatches) --> mismatch = (tokens, pydantic lines, compiled lines)
+    validator = get_compiled_validator(model_class)
+    inputs = conformance_inputs(model_class, sample_size, valid_limit=valid_limit)
+    if limit is not None:
+        inputs = islice(inputs, limit)
+
+    compared = mismatched = 0
+    examples = []
+    for tokens in inputs:
+        expected = _pydantic_errors(model_class, tokens)
+        got, values = validator.check(tokens)
+        if validator._check_staged(tokens) != (got, values):  # traced requests take the staged functions
+            got = got + ["(staged check differs)"]
+        if got != expected or (not got and validator.instance(tokens, values).model_dump() != model_class(**tokens).model_dump()):
+            mismatched += 1
+            if len(examples) < 10:
+                examples.append((tokens, expected, got))
+        compared += 1
+    return compared, mismatched, examples
+
+
+def main(argv=None):
+    from general_functions.catalog import CATALOG, find_model
+
+    arg_parser = argparse.ArgumentParser(description="Check the generated validators against the pydantic models.")
+    arg_parser.add_argument("models", nargs="*", help="model class names or catalog display names (default: every model)")
+    arg_parser.add_argument("--source", action="store_true", help="print the generated source instead of checking")
+    arg_parser.add_argument("--sample", type=int, default=CONFORMANCE_SAMPLE_SIZE,
+                            help="product space size above which a sample of this size is checked")
+    arg_parser.add_argument("--limit", type=int, default=None, help="compare at most this many token dicts per model")
+    args = arg_parser.parse_args(argv)
+
+    models = [find_model(name) for name in args.models] or list(dict.fromkeys(entry["model"] for entry in CATALOG))
+    if args.source:
+        for model_class in models:
+            print(get_compiled_validator(model_class).source)
+        return
+
+    failed = False
+    for model_class in models:
+        compared, mismatched, examples = check_conformance(model_class, args.sample, args.limit)
+        print(f"{model_class.__name__}: {compared} token dicts, {mismatched} mismatches")
+        for tokens, expected, got in examples:
+            print(f"  {tokens}\n    pydantic: {expected}\n    compiled: {got}")
+        failed |= bool(mismatched)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+_object_setattr = object.__setattr__
+
+
+def build_instance(model_class, values: dict, fields_set: set):
+    # what model_construct does, without its per call field inspection --> no validation at all
+    # --> for values that already passed a full check (general_functions/compiled_validators.py)
+    # values: every model field in field order
+    instance = model_class.__new__(model_class)
+    _object_setattr(instance, "__dict__", values)
+    _object_setattr(instance, "__pydantic_fields_set__", fields_set)
+    _object_setattr(instance, "__pydantic_extra__", None)
+    _object_setattr(instance, "__pydantic_private__", None)
+    return instance
@@ -0,0 +1,178 @@
+import argparse
+from functools import lru_cache
+
+from general_functions.enumerator import restricted_domains
+from general_functions.rules import get_rules
+
+# Exact size of the valid configuration space of a model (optionally with fixed defaults)
+# --> fields fixed to a single value are set up front and do not tie other fields together
+# --> the remaining fields are split into independent components (fields linked by a rule they both read)
+# --> each component is counted with a memoized depth first walk, component counts are multiplied
+#
+# A walk only has to remember the assigned fields that a later rule still reads (the frontier),
+# so sub counts are shared between every partial assignment with the same frontier values.
+
+
+class ComponentCounter:
+    def __init__(self, fields, domains, rules, fixed_values):
+        self.fields = fields                    # component fields in model field order
+        self.domains = domains                  # restricted domains of the whole model
+        self.fixed_values = fixed_values        # values of every single valued field
+        position = {name: i for i, name in enumerate(fields)}
+
+        # field --> rules checked once that field is assigned (its last non fixed field)
+        self.checks = {name: [] for name in fields}
+        for rule in rules:
+            free = [f for f in rule.fields if f in position]
+            if free:
+                self.checks[free[-1]].append(rule)
+
+        # frontier[k] --> fields assigned before k that a rule checked at k or later still reads
+        self.frontier = []
+        for k in range(len(fields) + 1):
+            needed = {f for name in fields[k:] for rule in self.checks[name] for f in rule.fields}
+            self.frontier.append(tuple(f for f in fields[:k] if f in needed))
+        self.memo = {}
+
+    def choices(self, k, values) -> list:
+        # values of field k that keep every rule checked at k satisfied
+        name = self.fields[k]
+        choices = self.domains[name]
+        for rule in self.checks[name]:
+            allowed = rule.allowed_values(name, values)
+            choices = [choice for choice in choices if choice in allowed]
+        return choices
+
+    def count(self, k=0, values=None) -> int:
+        # number of valid completions of fields[k:] given the values of fields[:k]
+        if values is None:
+            values = dict(self.fixed_values)
+        if k == len(self.fields):
+            return 1
+        key = (k, tuple(values[f] for f in self.frontier[k]))
+        if key in self.memo:
+            return self.memo[key]
+
+        name = self.fields[k]
+        total = 0
+        for choice in self.choices(k, values):
+            values[name] = choice
+            total += self.count(k + 1, values)
+        values.pop(name, None)
+        self.memo[key] = total
+        return total
+
+    def configuration(self, index) -> dict:
+        # the index-th valid assignment of the component (0 <= index < count()), in walk order
+        values = dict(self.fixed_values)
+        for k, name in enumerate(self.fields):
+            for choice in self.choices(k, values):
+                values[name] = choice
+                completions = self.count(k + 1, values)
+                if index < completions:
+                    break
+                index -= completions
+        return {name: values[name] for name in self.fields}
+
+
+class CountingPlan:
+    def __init__(self, model_class, defaults=None, rules=None):
+        self.model_class = model_class
+        self.domains = restricted_domains(model_class, defaults)
+        rules = get_rules(model_class) if rules is None else rules
+
+        self.fixed_values = {name: choices[0] for name, choices in self.domains.items() if len(choices) == 1}
+        free = [name for name, choices in self.domains.items() if len(choices) != 1]
+
+        # rules reading only fixed fields are decided up front
+        self.fixed_rules_hold = all(
+            rule.holds(self.fixed_values) for rule in rules
+            if all(f in self.fixed_values for f in rule.fields)
+        )
+
+        self.components = [
+            ComponentCounter(fields, self.domains, [r for r in rules if set(r.fields) & set(fields)], self.fixed_values)
+            for fields in field_components(free, rules)
+        ]
+
+    def component_counts(self) -> list:
+        # [(component fields, number of valid assignments)]
+        if not self.fixed_rules_hold:
+            return [(counter.fields, 0) for counter in self.components]
+        return [(counter.fields, counter.count()) for counter in self.components]
+
+    def configuration(self, index) -> dict:
+        # the index-th valid configuration of the model (0 <= index < total())
+        # --> index is split mixed radix style over the component counts
+        values = dict(self.fixed_values)
+        for counter in reversed(self.components):
+            index, component_index = divmod(index, counter.count())
+            values.update(counter.configuration(component_index))
+        return {name: values[name] for name in self.domains}
+
+    def total(self) -> int:
+        if not self.fixed_rules_hold:
+            return 0
+        total = 1
+        for counter in self.components:
+            total *= counter.count()
+            if not total:
+                break
+        return total
+
+
+def field_components(fields, rules) -> list:
+    # groups fields that share a rule (transitively) --> list of field tuples, in the given field order
+    parent = {name: name for name in fields}
+
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for rule in rules:
+        linked = [f for f in rule.fields if f in parent]
+        for other in linked[1:]:
+            parent[find(other)] = find(linked[0])
+
+    groups = {}
+    for name in fields:
+        groups.setdefault(find(name), []).append(name)
+    return [tuple(group) for group in groups.values()]
+
+
+@lru_cache(maxsize=256)
+def _counting_plan(model_class, defaults_key) -> CountingPlan:
+    return CountingPlan(model_class, dict(defaults_key))
+
+
+def get_counting_plan(model_class, defaults=None) -> CountingPlan:
+    # cached per (model, defaults) so repeated counts / draws reuse the memo tables
+    return _counting_plan(model_class, tuple(sorted((defaults or {}).items())))
+
+
+def count_valid(model_class, defaults=None) -> int:
+    # exact number of valid configurations of the model with the given fields fixed
+    return get_counting_plan(model_class, defaults).total()
+
+
+# ------------------------- CLI -----------------------------
+# ex. python -m general_functions.counting SY_BODY_PORTED_VALVE_MODEL --set series=5
+
+def main(argv=None):
+    from general_functions.catalog import CATALOG, find_model
+
+    arg_parser = argparse.ArgumentParser(description="Count the valid configurations of a model (all models if omitted).")
+    arg_parser.add_argument("model", nargs="?", default=None, help="model class name or catalog display name")
+    arg_parser.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE", help="fix a field to a value")
+    args = arg_parser.parse_args(argv)
+
+    defaults = dict(item.split("=", 1) for item in args.set)
+    models = [find_model(args.model)] if args.model else [entry["model"] for entry in CATALOG]
+    for model_class in models:
+        print(f"{model_class.__name__}\t{count_valid(model_class, defaults)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+from functools import lru_cache
+from math import prod
+
+import numpy as np
+import pyarrow as pa
+
+from general_functions.enumerator import iter_valid_configurations
+from general_functions.part_builder import build_part_numbers
+from general_functions.rules import get_domains
+from general_functions.vectorized import _as_column_dict, _encode_column
+
+# Configurations as integers (mixed radix over the field domains, in model field order)
+# --> digit of a field = index of its value in the field's choices, radix = number of choices, the last field is the
+#     least significant digit --> ids sort like iter_valid_configurations lists them
+# --> one uint64 per configuration instead of a dict of strings / a model instance, so enumerations, samples and batch
+#     results fit in NumPy arrays and membership / set differences are array operations (np.isin, np.setdiff1d ...)
+# --> plain str fields only have their default in the domains (general_functions/rules.py), other values have no id
+#
+# ex. codec = get_codec(SY_BODY_PORTED_VALVE_MODEL)
+#     codec.encode(tokens) --> int      codec.decode(i) --> field dict      codec.to_part_number(i) --> str
+#     ids = codec.valid_ids()           (sorted uint64 array of the valid space)
+#     python -m general_functions.encoding HF1B-ZL3H04-E-P                    (part number --> id)
+#     python -m general_functions.encoding HF1B_ZL_MODEL --decode 7779
+
+
+class ConfigurationCodec:
+    def __init__(self, model_class):
+        self.model_class = model_class
+        self.domains = get_domains(model_class)
+        self.fields = list(self.domains)
+        self.radices = [len(choices) for choices in self.domains.values()]
+        self.size = prod(self.radices)  # number of ids, valid or not
+        if self.size > 2 ** 64:
+            raise OverflowError(f"{model_class.__name__} has more configurations than a uint64 holds")
+
+        # place value of each field's digit
+        self.strides = [prod(self.radices[position + 1:]) for position in range(len(self.fields))]
+        self._digits = {name: {value: digit for digit, value in enumerate(choices)} for name, choices in self.domains.items()}
+
+        # digit of a field left out of a token dict --> its default, like model(**tokens)
+        self._missing = {}
+        for name, field in model_class.model_fields.items():
+            if not field.is_required() and field.default in self._digits[name]:
+                self._missing[name] = self._digits[name][field.default]
+
+    # ------------------------- Scalar -----------------------------
+
+    def encode(self, tokens) -> int:
+        # token / field dict --> id (keys that are not model fields are ignored, like the model does)
+        code = 0
+        for name, stride in zip(self.fields, self.strides):
+            if name in tokens:
+                digit = self._digits[name].get(tokens[name])
+                if digit is None:
+                    raise ValueError(f"'{tokens[name]}' is not one of the choices of {name}")
+            elif name in self._missing:
+                digit = self._missing[name]
+            else:
+                raise KeyError(f"Missing value for required field '{name}'")
+            code += digit * stride
+        return code
+
+    def decode(self, code) -> dict:
+        # id --> field dict, every field in model field order
+        code = int(code)
+        if not 0 <= code < self.size:
+            raise ValueError(f"{code} is not a configuration id of {self.model_class.__name__}")
+        values = {}
+        for name, stride, radix in zip(self.fields, self.strides, self.radices):
+            values[name] = self.domains[name][code // stride % radix]
+        return values
+
+    def to_part_number(self, code) -> str:
+        return self.model_class.model_construct(**self.decode(code)).build_part_number()
+
+    # ------------------------- Arrays -----------------------------
+
+    def encode_many(self, configurations) -> np.ndarray:
+        return np.fromiter((self.encode(values) for values in configurations), dtype=np.uint64)
+
+    def encode_columns(self, columns) -> tuple:
+        # token columns (dict / DataFrame / pyarrow Table) --> (uint64 ids, encoded mask)
+        # --> rows holding a value outside a field's choices are not encoded (id 0, mask False)
+        columns = _as_column_dict(columns)
+        length = len(next(iter(columns.values()))) if columns else 0
+        ids = np.zeros(length, dtype=np.uint64)
+        encoded = np.ones(length, dtype=bool)
+        for name, stride in zip(self.fields, self.strides):
+            if name in columns:
+                digits = np.asarray(_encode_column(columns[name], self.domains[name]), dtype=np.int64)
+            elif name in self._missing:
+                digits = np.full(length, self._missing[name], dtype=np.int64)
+            else:
+                raise KeyError(f"Missing column for required field '{name}'")
+            encoded &= digits >= 0
+            ids += np.where(digits >= 0, digits, 0).astype(np.uint64) * np.uint64(stride)
+        ids[~encoded] = 0
+        return ids, encoded
+
+    def decode_columns(self, ids) -> pa.Table:
+        # uint64 ids --> table of field values, one string column per field
+        ids = np.asarray(ids, dtype=np.uint64)
+        if len(ids) and int(ids.max()) >= self.size:
+            raise ValueError(f"ids out of range for {self.model_class.__name__}")
+        columns = {}
+        for name, stride, radix in zip(self.fields, self.strides, self.radices):
+            digits = ids // np.uint64(stride) % np.uint64(radix)
+            columns[name] = pa.array(self.domains[name], type=pa.string()).take(pa.array(digits.astype(np.int64)))
+        return pa.table(columns)
+
+    def to_part_numbers(self, ids) -> pa.Array:
+        # uint64 ids --> part numbers, built column wise (general_functions/part_builder.py)
+        return build_part_numbers(self.model_class, self.decode_columns(ids))
+
+    def valid_ids(self, defaults=None) -> np.ndarray:
+        # sorted ids of the valid space (the enumerator lists configurations in id order)
+        return self.encode_many(iter_valid_configurations(self.model_class, defaults))
+
+
+@lru_cache(maxsize=None)
+def get_codec(model_class) -> ConfigurationCodec:
+    return ConfigurationCodec(model_class)
+
+
+def encode(model_class, tokens) -> int:
+    return get_codec(model_class).encode(tokens)
+
+
+def decode(model_class, code) -> dict:
+    return get_codec(model_class).decode(code)
+
+
+def to_part_number(model_class, code) -> str:
+    return get_codec(model_class).to_part_number(code)
+
+
+def contains(sorted_ids, ids) -> np.ndarray:
+    # membership of each id in a sorted id array (ex. valid_ids()) --> bool mask, one binary search per id
+    sorted_ids = np.asarray(sorted_ids, dtype=np.uint64)
+    ids = np.asarray(ids, dtype=np.uint64)
+    if not len(sorted_ids):
+        return np.zeros(len(ids), dtype=bool)
+    positions = np.searchsorted(sorted_ids, ids)
+    return sorted_ids[np.minimum(positions, len(sorted_ids) - 1)] == ids
+
+
+# ------------------------- CLI -----------------------------
+
+def main(argv=None):
+    from general_functions.catalog import find_model
+    from general_functions.validation import validate_part_number
+
+    arg_parser = argparse.ArgumentParser(description="Part numbers to configuration ids and back.")
+    arg_parser.add_argument("values", nargs="+", help="part numbers, or a model name followed by ids with --decode")
+    arg_parser.add_argument("--decode", action="store_true", help="first value is a model, the others ids to decode")
+    args = arg_parser.parse_intermixed_args(argv)
+
+    if args.decode:
+        codec = get_codec(find_model(args.values[0]))
+        for code in args.values[1:]:
+            print(f"{code}\t{codec.to_part_number(int(code))}")
+        return
+
+    for part_number in args.values:
+        result = validate_part_number(part_number)
+        if not result["valid"]:
+            print(f"{part_number}\tinvalid: {'; '.join(result['errors'])}")
+            continue
+        model_class = find_model(result["model"])
+        print(f"{part_number}\t{result['model']}\t{get_codec(model_class).encode(result['tokens'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+
+from general_functions.rules import get_domains, get_rules
+
+# Exhaustive listing of the valid configuration space of a model
+# --> fields are assigned depth first in model field order
+# --> a rule is checked as soon as the last field it reads is assigned, so a partial assignment that breaks
+#     a rule is dropped right there instead of after the full cartesian product is built
+
+
+def restricted_domains(model_class, defaults=None) -> dict:
+    # model domains with the fixed (default) fields narrowed to their selected value
+    # --> a default outside the field's Literal choices leaves that field with no values
+    defaults = defaults or {}
+    domains = {}
+    for name, choices in get_domains(model_class).items():
+        if name in defaults:
+            domains[name] = tuple(c for c in choices if c == defaults[name])
+        else:
+            domains[name] = choices
+    return domains
+
+
+def rules_by_last_field(model_class) -> dict:
+    # field name --> rules that become fully assigned once that field is set (model field order)
+    fields = list(get_domains(model_class))
+    by_field = {name: [] for name in fields}
+    for rule in get_rules(model_class):
+        if rule.fields:
+            by_field[rule.fields[-1]].append(rule)
+    return by_field
+
+
+def iter_valid_configurations(model_class, defaults=None):
+    # lazy generator of every valid field dict of the model (respecting defaults)
+    domains = restricted_domains(model_class, defaults)
+    fields = list(domains)
+    checks = rules_by_last_field(model_class)
+    values = {}
+
+    def assign(k):
+        if k == len(fields):
+            yield dict(values)
+            return
+        name = fields[k]
+        choices = domains[name]
+        for rule in checks[name]:
+            allowed = rule.allowed_values(name, values)
+            choices = [choice for choice in choices if choice in allowed]
+        for choice in choices:
+            values[name] = choice
+            yield from assign(k + 1)
+        values.pop(name, None)
+
+    yield from assign(0)
+
+
+def enumerate_part_numbers(model_class, defaults=None):
+    # lazy generator of every valid part number of the model
+    # --> values come from the model's own domains and rules, so the pydantic validation is skipped
+    for values in iter_valid_configurations(model_class, defaults):
+        yield model_class.model_construct(**values).build_part_number()
+
+
+# ------------------------- CLI -----------------------------
+# ex. python -m general_functions.enumerator JJ5SY_PLUGIN_MFLD_EX260_MODEL --set series=1 --limit 100
+
+def main(argv=None):
+    from general_functions.catalog import find_model
+
+    arg_parser = argparse.ArgumentParser(description="List every valid part number of a model.")
+    arg_parser.add_argument("model", help="model class name or catalog display name")
+    arg_parser.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE", help="fix a field to a value")
+    arg_parser.add_argument("--limit", type=int, default=None, help="stop after this many part numbers")
+    args = arg_parser.parse_args(argv)
+
+    model_class = find_model(args.model)
+    defaults = dict(item.split("=", 1) for item in args.set)
+    for count, part_number in enumerate(enumerate_part_numbers(model_class, defaults)):
+        if args.limit is not None and count >= args.limit:
+            break
+        print(part_number)
+
+
+if __name__ == "__main__":
+    main()
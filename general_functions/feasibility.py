@@ -0,0 +1,67 @@
+from itertools import product
+
+from general_functions.counting import CountingPlan, count_valid
+from general_functions.enumerator import restricted_domains
+from general_functions.rules import get_domains, get_rules
+
+# Exact answer to "can anything valid be generated with these defaults?"
+# --> feasible when the counted valid space is not empty (uses the cached rule tables, no model construction)
+# --> when it is empty, the rules responsible are named with the messages they raise for the chosen defaults
+
+
+def rule_messages(rule, domains) -> list:
+    # messages the rule raises over every assignment of its fields within the given domains
+    messages = []
+    for combo in product(*(domains[name] for name in rule.fields)):
+        for message in rule.check(dict(zip(rule.fields, combo))):
+            if message not in messages:
+                messages.append(message)
+    return messages
+
+
+def blocking_rules(model_class, defaults) -> list:
+    # rules that make the defaults impossible
+    # 1. rules with no allowed combination left once the defaults are fixed
+    # 2. otherwise rules whose removal alone makes the defaults feasible
+    # 3. otherwise every rule reading a defaulted field (the conflict spans several rules)
+    domains = restricted_domains(model_class, defaults)
+    rules = get_rules(model_class)
+
+    blocking = [
+        rule for rule in rules
+        if not any(all(value in domains[name] for name, value in zip(rule.fields, combo)) for combo in rule.allowed)
+    ]
+    if blocking:
+        return blocking
+
+    blocking = [
+        rule for rule in rules
+        if CountingPlan(model_class, defaults, [r for r in rules if r is not rule]).total()
+    ]
+    if blocking:
+        return blocking
+
+    return [rule for rule in rules if set(rule.fields) & set(defaults)]
+
+
+def get_defaults_error(model_class, defaults):
+    # None when at least one valid configuration exists, else a message naming what blocks the defaults
+    defaults = defaults or {}
+    model_domains = get_domains(model_class)
+    unknown = [
+        f"`{name}` = `{value}` is not an option of {model_class.__name__}"
+        for name, value in defaults.items() if name not in model_domains or value not in model_domains[name]
+    ]
+    if unknown:
+        return "Invalid defaults:\n" + "\n".join(f"- {line}" for line in unknown)
+
+    if count_valid(model_class, defaults):
+        return None
+
+    domains = restricted_domains(model_class, defaults)
+    lines = []
+    for rule in blocking_rules(model_class, defaults):
+        messages = rule_messages(rule, domains) or rule.messages
+        fields = ", ".join(f"`{name}`" for name in rule.fields)
+        lines.extend(f"{message} ({fields})" for message in messages if f"{message} ({fields})" not in lines)
+    return "No valid combination exists for these defaults:\n" + "\n".join(f"- {line}" for line in lines)
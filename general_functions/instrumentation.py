@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+# Stage timings of validation requests
+# --> `with trace(label):` starts a request, every `with stage(name):` / timed(name, function, ...) inside it records
+#     a span (high resolution perf_counter), the finished request goes to the RECENT ring buffer
+# --> outside of a trace both are close to free: timed() is one extra call (hot paths: validate_part_number, the
+#     compiled validators), stage() returns one shared do nothing context manager (coarse blocks: page rendering)
+# --> the current trace is a context variable --> concurrent requests (threads of the Streamlit server, asyncio tasks)
+#     each record their own spans
+#
+# ex. with trace(part_number) as request:
+#         result = validate_part_number(part_number)
+#     request.breakdown()     --> {"routing": 0.004, "parse": 0.006, ...} (ms per stage)
+#     summary()               --> per stage count / mean / p50 / p99 over the ring buffer
+
+RING_SIZE = 1000
+
+# stages in pipeline order
+ROUTING = "routing"
+PARSE = "parse"
+CONSTRUCTION = "construction"   # field checks + instance creation (model(**tokens) also runs the model_validator)
+RULES = "rules"                 # model rules on their own (generated validators)
+BUILD = "build_part_number"
+DESCRIPTION = "description"
+RENDER = "render"               # DataFrames on the validator page
+STAGES = (ROUTING, PARSE, CONSTRUCTION, RULES, BUILD, DESCRIPTION, RENDER)
+
+# finished requests, newest last --> {"label", "started", "total_ms", "spans": [(stage, ms), ...]}
+RECENT = deque(maxlen=RING_SIZE)
+_recent_lock = threading.Lock()  # Streamlit sessions run on separate script threads
+
+_current = ContextVar("validation_trace", default=None)
+
+
+class Trace:
+    def __init__(self, label):
+        self.label = label
+        self.started = time.time()
+        self.spans = []  # (stage, seconds) in the order they finished
+        self.total = None
+
+    def breakdown(self) -> dict:
+        # ms per stage, spans of the same stage summed (ex. construction of several candidate splits)
+        totals = {}
+        for name, seconds in self.spans:
+            totals[name] = totals.get(name, 0.0) + seconds * 1000
+        return totals
+
+    def record(self) -> dict:
+        return {
+            "label": self.label,
+            "started": self.started,
+            "total_ms": self.total * 1000 if self.total is not None else None,
+            "spans": [(name, seconds * 1000) for name, seconds in self.spans],
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.spans.append((self.name, time.perf_counter() - self.start))
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def stage(name):
+    # span of the current request, a no-op outside of trace()
+    current = _current.get()
+    if current is None:
+        return _NO_SPAN
+    return _Span(current, name)
+
+
+def timed(name, function, *args):
+    # function(*args), timed as a span of the current request
+    current = _current.get()
+    if current is None:
+        return function(*args)
+    start = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        current.spans.append((name, time.perf_counter() - start))
+
+
+def trace(label=""):
+    # one request --> recorded to RECENT when the block ends, nested traces record into the outer one
+    return _TraceBlock(label)
+
+
+class _TraceBlock:
+    def __init__(self, label):
+        self.request = None
+        self.label = label
+
+    def __enter__(self) -> Trace:
+        outer = _current.get()
+        self.request = outer if outer is not None else Trace(self.label)
+        self._token = _current.set(self.request) if outer is None else None
+        self._start = time.perf_counter()
+        return self.request
+
+    def __exit__(self, *exc):
+        if self._token is not None:
+            _current.reset(self._token)
+            self.request.total = time.perf_counter() - self._start
+            _append(self.request.record())
+        return False
+
+
+def current_trace():
+    return _current.get()
+
+
+def _append(item):
+    with _recent_lock:
+        RECENT.append(item)
+
+
+def recent() -> list:
+    # copy of the ring buffer, oldest first
+    with _recent_lock:
+        return list(RECENT)
+
+
+def record(label, breakdown: dict, total_ms=None):
+    # request timed somewhere else (ex. a pool worker) --> into this process's ring buffer
+    _append({
+        "label": label,
+        "started": time.time(),
+        "total_ms": total_ms if total_ms is not None else sum(breakdown.values()),
+        "spans": list(breakdown.items()),
+    })
+
+
+def record_results(results):
+    # results of validate_chunk(timing=True) that ran in a pool worker --> this process's ring buffer
+    for result in results:
+        spans = {name: ms for name, ms in result["timing"].items() if name != "total"}
+        record(result["input"], spans, result["timing"]["total"])
+
+
+def summary(records=None) -> dict:
+    # stage --> {"count", "mean_ms", "p50_ms", "p99_ms"} over the given records (default: the ring buffer)
+    per_stage = {}
+    for item in (recent() if records is None else records):
+        totals = {}
+        for name, ms in item["spans"]:
+            totals[name] = totals.get(name, 0.0) + ms
+        if item["total_ms"] is not None:
+            totals["total"] = item["total_ms"]
+        for name, ms in totals.items():
+            per_stage.setdefault(name, []).append(ms)
+
+    order = {name: position for position, name in enumerate(STAGES + ("total",))}
+    result = {}
+    for name in sorted(per_stage, key=lambda name: order.get(name, len(order))):
+        values = sorted(per_stage[name])
+        result[name] = {
+            "count": len(values),
+            "mean_ms": sum(values) / len(values),
+            "p50_ms": values[len(values) // 2],
+            "p99_ms": values[min(len(values) - 1, int(len(values) * 0.99))],
+        }
+    return result
+
+
+def format_summary(stats) -> str:
+    # summary() as a text table (CLI output)
+    lines = [f"{'stage':20} {'count':>8} {'mean ms':>10} {'p50 ms':>10} {'p99 ms':>10}"]
+    for name, row in stats.items():
+        lines.append(f"{name:20} {row['count']:>8} {row['mean_ms']:>10.4f} {row['p50_ms']:>10.4f} {row['p99_ms']:>10.4f}")
+    return "\n".join(lines)
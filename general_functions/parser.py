@@ -1,41 +1,249 @@
 import re
+from pydantic import ValidationError
+
+try:
+    from re import _parser as _sre_parser
+except ImportError:  # python < 3.11
+    import sre_parse as _sre_parser
 
 class TokenMapParser:
-    def __init__(self, token_map):
+    def __init__(self, token_map, state=None):
         self.token_map = token_map
+        if state is not None:
+            self._restore(state)
+            return
 
-    def parse(self, raw_string):
-        s = raw_string.strip()
-        result = {}
-        i = 0  # position cursor
+        # compile every token pattern once --> (name, compiled pattern, length, optional)
+        self.tokens = [
+            (token["name"], re.compile(token["pattern"]), token.get("length"), token.get("optional", False))
+            for token in token_map
+        ]
+        # longest segment each token can take, bounds the packrat search
+        self.max_widths = [_pattern_width(token["pattern"])[1] for token in token_map]
+        self._compile_fast_path()
 
-        for token in self.token_map:
+    def _compile_fast_path(self):
+        # Builds one anchored regex for the whole token map with a named group per token, so a valid part number
+        # is split by a single fullmatch instead of the token by token loop
+        # --> repeated names (ex. separator) get numbered group names, the last occurrence wins like in the loop
+        # --> variable length tokens are atomic groups: the first match of the pattern is kept and never
+        #     backtracked into, exactly like pattern.match(s, i) in the loop
+        # --> fixed length tokens must match exactly `length` characters
+        parts = []
+        group_for_name = {}
+        for index, token in enumerate(self.token_map):
             name = token["name"]
             pattern = token["pattern"]
             length = token.get("length")
-            optional = token.get("optional", False)
+            group = name if name not in group_for_name else f"{name}__{index}"
+            group_for_name[name] = group
+
+            if length is None:
+                parts.append(f"(?P<{group}>(?>{pattern}))")
+                continue
+
+            min_width, max_width = _pattern_width(pattern)
+            if min_width == max_width == length:
+                window = f"(?P<{group}>(?:{pattern}))"
+            else:
+                # pattern can match other lengths --> pin it to the next `length` characters by capturing the tail after
+                # that window and requiring the remaining string to equal it once the pattern has matched
+                tail = f"_tail__{index}"
+                window = f"(?=[\\s\\S]{{{length}}}(?P<{tail}>[\\s\\S]*))(?P<{group}>(?:{pattern}))(?=(?P={tail})\\Z)"
+            if token.get("optional", False):
+                window = f"(?>{window}|)"
+            parts.append(window)
+
+        self._fast_fields = [(name, group) for name, group in group_for_name.items()]
+        try:
+            self._fast = re.compile("".join(parts))
+        except re.error:
+            # fast path unavailable (ex. no atomic group support) --> parse always uses the token loop
+            self._fast = None
+
+    def state(self) -> dict:
+        # plain data needed to rebuild the parser without analysing the token patterns again (snapshot)
+        return {
+            "max_widths": self.max_widths,
+            "fast_pattern": self._fast.pattern if self._fast is not None else None,
+            "fast_fields": self._fast_fields,
+        }
+
+    def _restore(self, state):
+        self.tokens = [
+            (token["name"], re.compile(token["pattern"]), token.get("length"), token.get("optional", False))
+            for token in self.token_map
+        ]
+        self.max_widths = list(state["max_widths"])
+        self._fast_fields = list(state["fast_fields"])
+        self._fast = re.compile(state["fast_pattern"]) if state["fast_pattern"] is not None else None
 
-            # If length is specified, slice it and match pattern
+    def match_fast(self, s):
+        # single regex split of an already stripped string --> token dict, or None if it does not parse
+        if self._fast is None:
+            return None
+        match = self._fast.fullmatch(s)
+        if match is None:
+            return None
+        groups = match.groupdict("")
+        return {name: groups[group] for name, group in self._fast_fields}
+
+    def parse(self, raw_string):
+        s = raw_string.strip()
+
+        tokens = self.match_fast(s)
+        if tokens is not None:
+            return tokens
+
+        # fast path failed --> walk the tokens one by one for a detailed error message
+        result = {}
+        i = 0  # position cursor
+
+        # patterns are matched in place with (pos, endpos) so no slices of s are made while parsing
+        for name, pattern, length, optional in self.tokens:
+            # If length is specified, match pattern against exactly that window
             if length is not None:
-                segment = s[i:i+length]
-                if not re.fullmatch(pattern, segment):
+                if not pattern.fullmatch(s, i, i + length):
                     if optional:
                         result[name] = ""
                         continue
                     else:
-                        raise ValueError(f"Token '{name}' at position {i} is invalid: '{segment}'")
-                result[name] = segment
+                        raise ValueError(f"Token '{name}' at position {i} is invalid: '{s[i:i+length]}'")
+                result[name] = s[i:i+length]
                 i += length
             else:
-                match = re.match(pattern, s[i:])
+                match = pattern.match(s, i)
                 if match:
                     segment = match.group()
                     result[name] = segment
                     i += len(segment)
                 else:
                     raise ValueError(f"Token '{name}' could not be matched at the end")
-                
+
         if i != len(s):
             raise ValueError(f"Unexpected trailing characters after parsing: '{s[i:]}'")
 
-        return result
\ No newline at end of file
+        return result
+
+    # ------------------------------ Packrat Mode ------------------------------
+    # The loop above is greedy and never backtracks, so optional tokens next to each other
+    # (ex. electrical_entry L|LN|LO followed by m8_connector_length / light_surge_voltage_suppressor)
+    # can be mis-split. Packrat mode explores every way each token can match and memoizes
+    # (token index, position) so the work stays linear in tokens x positions.
+
+    def _token_options(self, s, k, i):
+        # every (segment, next position) token k can take at position i --> the greedy choice comes first
+        name, pattern, length, optional = self.tokens[k]
+        options = []
+
+        if length is not None:
+            if i + length <= len(s) and pattern.fullmatch(s, i, i + length):
+                options.append(i + length)
+            # optional or regex-optional (ex. [T]?) fixed tokens may also be left out
+            if optional or pattern.fullmatch(""):
+                options.append(i)
+        else:
+            match = pattern.match(s, i)
+            if match:
+                options.append(match.end())
+            max_end = min(len(s), i + self.max_widths[k])
+            for j in range(max_end, i - 1, -1):
+                if j not in options and pattern.fullmatch(s, i, j):
+                    options.append(j)
+            if optional and i not in options:
+                options.append(i)
+
+        return [(s[i:j], j) for j in options]
+
+    def parse_all(self, raw_string, limit=None):
+        # every complete split of the string as token dicts, greedy split first (same dict layout as parse)
+        s = raw_string.strip()
+        count = len(self.tokens)
+        memo = {}
+
+        def completes(k, i):
+            # can tokens k.. consume s[i:] exactly --> memo keeps only the options that lead to a complete parse
+            if k == count:
+                return i == len(s)
+            key = (k, i)
+            if key not in memo:
+                memo[key] = [(segment, j) for segment, j in self._token_options(s, k, i) if completes(k + 1, j)]
+            return bool(memo[key])
+
+        if not completes(0, 0):
+            return []
+
+        results = []
+        seen = set()
+        path = [None] * count
+
+        def walk(k, i):
+            if limit is not None and len(results) >= limit:
+                return
+            if k == count:
+                tokens = {}
+                for (name, _, _, _), segment in zip(self.tokens, path):
+                    tokens[name] = segment
+                key = tuple(tokens.items())
+                if key not in seen:
+                    seen.add(key)
+                    results.append(tokens)
+                return
+            for segment, j in memo[(k, i)]:
+                path[k] = segment
+                walk(k + 1, j)
+
+        walk(0, 0)
+        return results
+
+    def choose_valid(self, model, candidates, raw_string):
+        # builds the model from each candidate split in order and returns (tokens, instance) for the first valid one
+        # --> a split other than the greedy one must also rebuild to the same part number, separators are not model
+        #     fields so the model alone cannot reject a split that skipped one
+        # --> if none validate, the error of the first candidate is raised
+        s = raw_string.strip()
+        greedy = self.match_fast(s)
+        first_error = None
+        for tokens in candidates:
+            try:
+                instance = model(**tokens)
+            except ValidationError as e:
+                if first_error is None:
+                    first_error = e
+                continue
+            if tokens == greedy or instance.build_part_number() == s:
+                return tokens, instance
+        if first_error is None:
+            raise ValueError(f"Part number does not match any valid layout for {model.__name__}")
+        raise first_error
+
+
+def _pattern_width(pattern):
+    # (min, max) number of characters a pattern can match
+    return _sre_parser.parse(pattern).getwidth()
+
+
+# One compiled parser per token map for the whole process
+# --> keyed by id() since token maps are lists, the token map itself is kept alive alongside its parser
+_PARSER_CACHE = {}
+
+# Parser states from the catalog snapshot (general_functions/snapshot.py) --> token map contents --> state
+_PRECOMPILED = {}
+
+def token_map_key(token_map) -> tuple:
+    return tuple(
+        (token["name"], token["pattern"], token.get("length"), token.get("optional", False))
+        for token in token_map
+    )
+
+def use_precompiled(states: dict):
+    _PRECOMPILED.clear()
+    _PRECOMPILED.update(states)
+
+def compile_token_map(token_map) -> TokenMapParser:
+    cached = _PARSER_CACHE.get(id(token_map))
+    if cached is None or cached[0] is not token_map:
+        state = _PRECOMPILED.get(token_map_key(token_map)) if _PRECOMPILED else None
+        cached = (token_map, TokenMapParser(token_map, state))
+        _PARSER_CACHE[id(token_map)] = cached
+    return cached[1]
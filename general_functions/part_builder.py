@@ -0,0 +1,184 @@
+import argparse
+import ast
+import inspect
+import sys
+import textwrap
+from functools import lru_cache
+from itertools import islice
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from pydantic_core import PydanticUndefined
+
+from general_functions.columnar import as_string_array
+from general_functions.enumerator import iter_valid_configurations
+from general_functions.vectorized import _as_column_dict
+
+# Column wise build_part_number
+# --> the model's own build_part_number is read once (AST) and every piece of it becomes an Arrow string kernel:
+#     f-strings --> binary_join_element_wise, `x if self.field else ""` --> if_else on the non empty rows
+# --> one call builds the part numbers of a whole token table, the model method stays the only definition of the format
+# --> a method using anything else (calls, if statements, format specs ...) is built row by row with the model
+#     itself, so every model works and the result is always the scalar one
+#
+# ex. build_part_numbers(SY1_BASE_MOUNTED_PLUGIN_VALVE_MODEL, token_table)   --> pyarrow string array
+#     python -m general_functions.part_builder        (checks every model over its whole valid space)
+
+CHECK_CHUNK_SIZE = 100_000
+
+
+class ColumnBuilder:
+    def __init__(self, model_class):
+        self.model_class = model_class
+        self.fields = model_class.model_fields
+        try:
+            self._steps, self._result = self._compile_method()
+            self.vectorized = True
+        except NotImplementedError:
+            self._steps, self._result = [], None
+            self.vectorized = False
+
+    # ------------------------- Compilation -----------------------------
+
+    def _compile_method(self):
+        source = textwrap.dedent(inspect.getsource(self.model_class.build_part_number))
+        func_def = ast.parse(source).body[0]
+        steps = []  # (local name, expression) in method order
+        for stmt in func_def.body:
+            if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant):
+                continue  # docstring
+            if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name):
+                steps.append((stmt.targets[0].id, self._compile(stmt.value)))
+            elif isinstance(stmt, ast.Return) and stmt.value is not None:
+                return steps, self._compile(stmt.value)
+            else:
+                raise NotImplementedError(ast.unparse(stmt))
+        raise NotImplementedError("build_part_number has no return")
+
+    def _compile(self, node):
+        # expression node --> function(env) returning a str (same for every row) or a pyarrow string array
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            value = node.value
+            return lambda env: value
+        if isinstance(node, ast.JoinedStr) or (isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add)):
+            parts = [self._compile(part) for part in (node.values if isinstance(node, ast.JoinedStr) else (node.left, node.right))]
+            return lambda env: _concat([part(env) for part in parts])
+        if isinstance(node, ast.FormattedValue) and node.conversion == -1 and node.format_spec is None:
+            return self._compile(node.value)  # field values are strings --> f"{x}" is x
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "self" \
+                and node.attr in self.fields:
+            name = node.attr
+            return lambda env: env["self"][name]
+        if isinstance(node, ast.Name):
+            name = node.id
+            return lambda env: env[name]
+        if isinstance(node, ast.IfExp):
+            test, body, orelse = self._compile(node.test), self._compile(node.body), self._compile(node.orelse)
+            return lambda env: _if_else(_truthy(test(env)), body(env), orelse(env))
+        raise NotImplementedError(ast.unparse(node))
+
+    # ------------------------- Building -----------------------------
+
+    def build(self, columns) -> pa.Array:
+        # token columns (dict / DataFrame / pyarrow Table named like the fields) --> part number per row
+        columns = _as_column_dict(columns)
+        length = len(next(iter(columns.values()))) if columns else 0
+        if not self.vectorized:
+            rows = pa.table({name: as_string_array(column) for name, column in columns.items()}).to_pylist() if columns else []
+            return pa.array([self.model_class.model_construct(**row).build_part_number() for row in rows], pa.string())
+
+        values = {}
+        for name, field in self.fields.items():
+            if name in columns:
+                values[name] = as_string_array(columns[name])
+            elif field.default is not PydanticUndefined:
+                values[name] = str(field.default)  # missing column --> field default like model_construct
+            else:
+                raise KeyError(f"Missing column for required field '{name}'")
+
+        env = {"self": values}
+        for name, expression in self._steps:
+            env[name] = expression(env)
+        result = self._result(env)
+        if isinstance(result, str):
+            return pa.array([result] * length, pa.string())
+        return result
+
+
+def _concat(parts):
+    if all(isinstance(part, str) for part in parts):
+        return "".join(parts)
+    return pc.binary_join_element_wise(*parts, "")
+
+
+def _truthy(value):
+    if isinstance(value, str):
+        return bool(value)
+    return pc.not_equal(value, "")
+
+
+def _if_else(condition, then, otherwise):
+    if isinstance(condition, bool):
+        return then if condition else otherwise
+    return pc.if_else(condition, then, otherwise)
+
+
+@lru_cache(maxsize=None)
+def get_column_builder(model_class) -> ColumnBuilder:
+    return ColumnBuilder(model_class)
+
+
+def build_part_numbers(model_class, columns) -> pa.Array:
+    return get_column_builder(model_class).build(columns)
+
+
+# ------------------------- Conformance Check -----------------------------
+
+def check_builder(model_class, defaults=None, limit=None, chunk_size=CHECK_CHUNK_SIZE) -> tuple:
+    # builds every valid configuration both ways --> (configurations checked, mismatch count, first few mismatches)
+    # mismatch = (field values, scalar part number, column part number)
+    configurations = iter_valid_configurations(model_class, defaults)
+    if limit is not None:
+        configurations = islice(configurations, limit)
+
+    checked = mismatched = 0
+    examples = []
+    while True:
+        chunk = list(islice(configurations, chunk_size))
+        if not chunk:
+            break
+        built = build_part_numbers(model_class, pa.Table.from_pylist(chunk)).to_pylist()
+        for values, column_part in zip(chunk, built):
+            scalar_part = model_class.model_construct(**values).build_part_number()
+            if scalar_part != column_part:
+                mismatched += 1
+                if len(examples) < 10:
+                    examples.append((values, scalar_part, column_part))
+        checked += len(chunk)
+    return checked, mismatched, examples
+
+
+def main(argv=None):
+    from general_functions.catalog import CATALOG, find_model
+
+    arg_parser = argparse.ArgumentParser(description="Check column wise part number building against build_part_number.")
+    arg_parser.add_argument("models", nargs="*", help="model class names or catalog display names (default: every model)")
+    arg_parser.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE", help="fix a field to a value")
+    arg_parser.add_argument("--limit", type=int, default=None, help="check at most this many configurations per model")
+    args = arg_parser.parse_args(argv)
+
+    defaults = dict(item.split("=", 1) for item in args.set)
+    models = [find_model(name) for name in args.models] or list(dict.fromkeys(entry["model"] for entry in CATALOG))
+    failed = False
+    for model_class in models:
+        mode = "columns" if get_column_builder(model_class).vectorized else "row by row"
+        checked, mismatched, examples = check_builder(model_class, defaults, args.limit)
+        print(f"{model_class.__name__}: {checked} configurations, {mismatched} mismatches ({mode})")
+        for values, scalar_part, column_part in examples:
+            print(f"  {scalar_part!r} != {column_part!r}  {values}")
+        failed |= bool(mismatched)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
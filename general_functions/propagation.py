@@ -0,0 +1,53 @@
+from general_functions.enumerator import restricted_domains
+from general_functions.rules import get_rules
+
+# Option pruning for configurators (generalized arc consistency over the rule tables)
+# --> a value stays in a field's options only while every rule reading that field still has an allowed
+#     combination using it within the current options of the rule's other fields
+# --> pruning a field re-checks only the rules that read it, until nothing changes
+#
+# Values left may still be unreachable through a combination of several rules (the model validation
+# stays the final word), but every value removed is certainly impossible.
+
+
+def _rules_by_field(model_class) -> dict:
+    by_field = {}
+    for rule in get_rules(model_class):
+        for name in rule.fields:
+            by_field.setdefault(name, []).append(rule)
+    return by_field
+
+
+def propagate(model_class, domains) -> dict:
+    # field --> tuple of values still reachable, in the order of the given domains
+    # an empty tuple means the current selections already break a rule
+    current = {name: set(choices) for name, choices in domains.items()}
+    by_field = _rules_by_field(model_class)
+
+    pending = list(get_rules(model_class))
+    queued = {id(rule) for rule in pending}
+    while pending:
+        rule = pending.pop()
+        queued.discard(id(rule))
+        field_sets = [current[name] for name in rule.fields]
+
+        supported = [set() for _ in rule.fields]
+        for combo in rule.allowed:
+            if all(value in values for value, values in zip(combo, field_sets)):
+                for values, value in zip(supported, combo):
+                    values.add(value)
+
+        for name, values in zip(rule.fields, supported):
+            if len(values) < len(current[name]):
+                current[name] = values
+                for other in by_field[name]:
+                    if other is not rule and id(other) not in queued:
+                        pending.append(other)
+                        queued.add(id(other))
+
+    return {name: tuple(value for value in choices if value in current[name]) for name, choices in domains.items()}
+
+
+def reachable_options(model_class, selections=None) -> dict:
+    # options of every field once the selected fields are fixed
+    return propagate(model_class, restricted_domains(model_class, selections))
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+
+from general_functions import snapshot
+from general_functions.validation import validate_part_number
+
+# Process wide cache of validation results
+# --> one instance per server process, shared by every Streamlit session (module state lives as long as the process)
+# --> keyed by the normalized part number and the hash of the model sources (models_version()) --> an edited model
+#     module is imported again, everything derived from it is rebuilt and the cache starts over
+# --> bounded: least recently used entries are evicted past `maxsize`, entries older than `ttl` seconds expire
+
+CACHE_MAX_SIZE = 10_000
+CACHE_TTL_SECONDS = 60 * 60
+
+
+class ValidationCache:
+    def __init__(self, maxsize=CACHE_MAX_SIZE, ttl=CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key --> (stored at, result)
+        self._lock = threading.Lock()   # sessions run on separate script threads
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and time.monotonic() - item[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# ------------------------- Model Versions -----------------------------
+
+# sources the process runs on --> taken at import, next to load_snapshot() on the pages
+_sources = {"signature": snapshot.source_signature(), "hash": snapshot.source_hash()}
+_sources_lock = threading.Lock()
+
+
+def models_version() -> str:
+    # source hash of the models in use --> file stats are compared on every call, the files are only read again
+    # (and the edited model modules reloaded) when a stat changed
+    signature = snapshot.source_signature()
+    with _sources_lock:
+        if signature != _sources["signature"]:
+            source_hash = snapshot.source_hash()
+            if source_hash != _sources["hash"]:
+                changed = {path for path, _, _ in set(signature) ^ set(_sources["signature"])}
+                snapshot.reload_models(changed)
+                _cache.clear()
+                _sources["hash"] = source_hash
+            _sources["signature"] = signature
+        return _sources["hash"]
+
+
+# ------------------------- Cached Validation -----------------------------
+
+_cache = ValidationCache()
+
+
+def get_validation_cache() -> ValidationCache:
+    return _cache
+
+
+def normalize_part_number(part_number: str) -> str:
+    # trailing whitespace never changes a result (the parser strips it), leading whitespace can (routing is anchored)
+    return part_number.rstrip()
+
+
+def validate_cached(part_number: str, refresh: bool = False) -> dict:
+    # validate_part_number(details=True) through the shared cache
+    # --> cached results are shared between sessions, treat them as read only
+    # --> refresh=True runs the whole pipeline again and replaces the cached result (timing on the validator page)
+    normalized = normalize_part_number(part_number)
+    key = (normalized, models_version())
+    result = None if refresh else _cache.get(key)
+    if result is None:
+        result = validate_part_number(normalized, details=True)
+        _cache.put(key, result)
+    return result
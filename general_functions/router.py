@@ -0,0 +1,138 @@
+import re
+
+# characters that end the literal part of a router pattern
+_REGEX_META = set(".^$*+?{}[]()|\\")
+_QUANTIFIERS = set("?*{")
+
+# key used inside trie nodes to hold the entries whose literal prefix ends there
+_ENTRIES = None
+
+
+class RoutingError(ValueError):
+    pass
+
+
+def _parse_char_class(pattern, i):
+    # returns (characters, index after the closing bracket) for a simple [...] class
+    # --> negated classes and escapes are not expanded, None is returned instead
+    end = pattern.find("]", i + 1)
+    if end == -1:
+        return None, i
+    body = pattern[i + 1:end]
+    if not body or body.startswith("^") or "\\" in body:
+        return None, i
+
+    chars = []
+    k = 0
+    while k < len(body):
+        if k + 2 < len(body) and body[k + 1] == "-":
+            chars.extend(chr(c) for c in range(ord(body[k]), ord(body[k + 2]) + 1))
+            k += 3
+        else:
+            chars.append(body[k])
+            k += 1
+    return chars, end + 1
+
+
+def literal_prefixes(pattern, limit=64):
+    # Expands the fixed start of an anchored router pattern into every literal string it can begin with
+    # ex. r"^SY[357][ABC12345]0" --> ['SY3A0', 'SY3B0', ... 'SY751', ...]
+    # Stops at the first group, wildcard or quantified atom. Character classes are expanded while the
+    # number of prefixes stays below `limit`.
+    if not pattern.startswith("^"):
+        return [""]
+
+    # top level alternation means there is no common literal start
+    depth = 0
+    in_class = False
+    for k, ch in enumerate(pattern):
+        if pattern[k - 1:k] == "\\":
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif not in_class and ch == "(":
+            depth += 1
+        elif not in_class and ch == ")":
+            depth -= 1
+        elif not in_class and ch == "|" and depth == 0:
+            return [""]
+
+    prefixes = [""]
+    i = 1
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "[":
+            chars, nxt = _parse_char_class(pattern, i)
+            if chars is None or len(prefixes) * len(chars) > limit:
+                break
+        elif ch == "\\" and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            chars, nxt = [pattern[i + 1]], i + 2
+        elif ch not in _REGEX_META:
+            chars, nxt = [ch], i + 1
+        else:
+            break
+
+        # an optional / repeated atom cannot be part of the literal prefix
+        if nxt < len(pattern) and pattern[nxt] in _QUANTIFIERS:
+            break
+        prefixes = [p + c for p in prefixes for c in chars]
+        if nxt < len(pattern) and pattern[nxt] == "+":
+            break
+        i = nxt
+
+    return prefixes
+
+
+class ModelRouter:
+    # Routes a part number to the first matching catalog entry
+    # --> entries are dicts with at least a "pattern" key, checked in list order (list order = priority)
+    # --> a character trie of literal pattern prefixes narrows the candidates so only a handful of compiled
+    #     regexes are ever tried, no matter how many product families are registered
+    def __init__(self, entries, detectors=(), trie=None):
+        self.entries = list(entries)
+        self._compiled = [re.compile(entry["pattern"]) for entry in self.entries]
+
+        # detectors explain why a part number could not be routed --> (pattern, message template using named groups)
+        self._detectors = [(re.compile(pattern), message) for pattern, message in detectors]
+
+        # a trie built earlier for the same entries (catalog snapshot) is reused as is
+        self._trie = trie
+        if trie is not None:
+            return
+        self._trie = {}
+        for priority, entry in enumerate(self.entries):
+            for prefix in literal_prefixes(entry["pattern"]):
+                node = self._trie
+                for ch in prefix:
+                    node = node.setdefault(ch, {})
+                node.setdefault(_ENTRIES, []).append(priority)
+
+    def candidates(self, part_number):
+        # entry indexes whose literal prefix is a prefix of the part number, in priority order
+        node = self._trie
+        found = list(node.get(_ENTRIES, ()))
+        for ch in part_number:
+            node = node.get(ch)
+            if node is None:
+                break
+            found.extend(node.get(_ENTRIES, ()))
+        return sorted(set(found))
+
+    def match(self, part_number):
+        for priority in self.candidates(part_number):
+            if self._compiled[priority].match(part_number):
+                return self.entries[priority]
+        return None
+
+    def route(self, part_number):
+        entry = self.match(part_number)
+        if entry is not None:
+            return entry
+
+        for pattern, message in self._detectors:
+            detected = pattern.match(part_number)
+            if detected:
+                raise RoutingError(message.format(**detected.groupdict()))
+        raise RoutingError("Invalid part number format — unable to route to a model.")
@@ -0,0 +1,281 @@
+import ast
+import inspect
+import textwrap
+from functools import lru_cache
+from itertools import product
+from types import SimpleNamespace
+from typing import Literal, get_args, get_origin
+
+# Turns the `model_validator` of a part number model into a list of independent rules
+# --> every top level `if` that raises / appends an error is one rule
+# --> the fields a rule reads (directly or through helper variables such as din_rail_value) are its scope
+# --> each rule keeps the original code, so it behaves exactly like the model it came from
+#
+# Models stay plain pydantic classes, nothing in the model files has to change.
+
+
+class Rule:
+    def __init__(self, fields, messages, check, source):
+        self.fields = fields        # field names the rule reads, in model field order
+        self.messages = messages    # error messages the rule can produce
+        self._check = check         # check(values) --> list of error messages, None until compiled (snapshot rules)
+        self.source = source        # original code of the rule, for display
+        self.allowed = None         # set of allowed value tuples over `fields`, filled in by get_rules
+        self._indexes = {}          # field --> {values of the other fields: allowed values of that field}
+        self._load_check = None     # compiles the check on first use for rules restored from a snapshot
+
+    def check(self, values) -> list:
+        # error messages the rule raises for the values (empty if the rule holds)
+        if self._check is None:
+            self._check = self._load_check()
+        return self._check(values)
+
+    def holds(self, values) -> bool:
+        return tuple(values[name] for name in self.fields) in self.allowed
+
+    def allowed_values(self, name, values) -> frozenset:
+        # allowed values of one of the rule's fields given the values of its other fields
+        index = self._indexes.get(name)
+        if index is None:
+            position = self.fields.index(name)
+            found = {}
+            for combo in self.allowed:
+                found.setdefault(combo[:position] + combo[position + 1:], set()).add(combo[position])
+            index = self._indexes[name] = {key: frozenset(choices) for key, choices in found.items()}
+        return index.get(tuple(values[field] for field in self.fields if field != name), frozenset())
+
+    def __repr__(self):
+        return f"Rule({', '.join(self.fields)})"
+
+
+# ------------------------- Domains -----------------------------
+
+def get_literal_choices(type_):
+    # extract choices from a Literal[...] type --> if choices are not defined as a literal type it will not work
+    if get_origin(type_) == Literal:
+        return get_args(type_)
+    return None
+
+
+def literal_error_message(choices) -> str:
+    # pydantic's literal_error text
+    quoted = [repr(choice) for choice in choices]
+    if len(quoted) == 1:
+        return f"Input should be {quoted[0]}"
+    return f"Input should be {', '.join(quoted[:-1])} or {quoted[-1]}"
+
+
+# Precomputed domains / rule tables (see general_functions/snapshot.py) --> "module:ClassName" --> data
+_PRECOMPUTED = {}
+
+
+def model_key(model_class) -> str:
+    return f"{model_class.__module__}:{model_class.__qualname__}"
+
+
+def use_precomputed(models: dict):
+    # installs snapshot data, models read afterwards skip introspection and table building
+    _PRECOMPUTED.clear()
+    _PRECOMPUTED.update(models)
+    get_domains.cache_clear()
+    get_rules.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get_domains(model_class) -> dict:
+    # every model field --> tuple of allowed values, in model field order
+    # non Literal fields can only take their default
+    precomputed = _PRECOMPUTED.get(model_key(model_class))
+    if precomputed is not None:
+        return dict(precomputed["domains"])
+
+    domains = {}
+    for name, field in model_class.model_fields.items():
+        choices = get_literal_choices(field.annotation)
+        if choices:
+            domains[name] = tuple(choices)
+        else:
+            domains[name] = (field.default if field.default is not None else "",)
+    return domains
+
+
+# ------------------------- Rule Extraction -----------------------------
+
+def _self_fields(node, field_names):
+    # self.<field> attributes read anywhere inside node
+    return {
+        sub.attr for sub in ast.walk(node)
+        if isinstance(sub, ast.Attribute) and isinstance(sub.value, ast.Name) and sub.value.id == "self"
+        and sub.attr in field_names
+    }
+
+
+def _names_read(node):
+    return {sub.id for sub in ast.walk(node) if isinstance(sub, ast.Name) and isinstance(sub.ctx, ast.Load)}
+
+
+def _names_assigned(node):
+    return {sub.id for sub in ast.walk(node) if isinstance(sub, ast.Name) and isinstance(sub.ctx, ast.Store)}
+
+
+def _is_error_list(stmt):
+    # errors = []
+    return (
+        isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name)
+        and isinstance(stmt.value, ast.List) and not stmt.value.elts
+    )
+
+
+def _reports_error(node, error_lists):
+    # does the statement raise or append to an error list somewhere inside
+    for sub in ast.walk(node):
+        if isinstance(sub, ast.Raise):
+            return True
+        if (
+            isinstance(sub, ast.Call) and isinstance(sub.func, ast.Attribute) and sub.func.attr == "append"
+            and isinstance(sub.func.value, ast.Name) and sub.func.value.id in error_lists
+        ):
+            return True
+    return False
+
+
+def _messages(node):
+    # string constants passed to ValueError(...) / errors.append(...)
+    messages = []
+    for sub in ast.walk(node):
+        if isinstance(sub, ast.Call) and sub.args and isinstance(sub.args[0], ast.Constant) and isinstance(sub.args[0].value, str):
+            is_raise = isinstance(sub.func, ast.Name) and sub.func.id == "ValueError"
+            is_append = isinstance(sub.func, ast.Attribute) and sub.func.attr == "append"
+            if is_raise or is_append:
+                messages.append(sub.args[0].value)
+    return messages
+
+
+def _compile_rule(stmt, preamble, error_lists, func_globals, name):
+    # def _rule(self):
+    #     errors = []
+    #     <helper variables the rule needs>
+    #     <the rule's if statement>
+    #     return errors
+    # --> a raised ValueError is turned into a one message list
+    error_list = next(iter(error_lists), "errors")
+    func = ast.parse(f"def {name}(self):\n    {error_list} = []\n    return {error_list}").body[0]
+    func.body[1:1] = [*preamble, stmt]
+    module = ast.fix_missing_locations(ast.Module(body=[func], type_ignores=[]))
+    namespace = {}
+    exec(compile(module, f"<rule {name}>", "exec"), dict(func_globals), namespace)
+    rule_func = namespace[name]
+
+    def check(values):
+        try:
+            return rule_func(SimpleNamespace(**values))
+        except ValueError as e:
+            return [str(e)]
+
+    return check
+
+
+def _validator_functions(model_class):
+    decorators = getattr(model_class, "__pydantic_decorators__", None)
+    if decorators is None:
+        return []
+    return [d.func for d in decorators.model_validators.values() if d.info.mode == "after"]
+
+
+def _extract_rules(model_class):
+    field_names = list(model_class.model_fields)
+    field_set = set(field_names)
+    rules = []
+
+    for func in _validator_functions(model_class):
+        tree = ast.parse(textwrap.dedent(inspect.getsource(func)))
+        func_def = tree.body[0]
+        error_lists = {stmt.targets[0].id for stmt in func_def.body if _is_error_list(stmt)}
+
+        # helper variables assigned before / between rules --> (statement, names it assigns)
+        helpers = []
+        for stmt in func_def.body:
+            if _is_error_list(stmt) or isinstance(stmt, ast.Return) or isinstance(stmt, ast.Expr):
+                continue
+            reads_errors = bool(_names_read(getattr(stmt, "test", ast.Pass())) & error_lists)
+            if reads_errors:
+                continue  # if errors: raise ValueError(...) --> reporting, not a rule
+
+            if not _reports_error(stmt, error_lists):
+                helpers.append((stmt, _names_assigned(stmt)))
+                continue
+
+            # collect the helper statements this rule depends on (transitively)
+            needed = []
+            wanted = _names_read(stmt)
+            for helper, assigned in reversed(helpers):
+                if assigned & wanted:
+                    needed.insert(0, helper)
+                    wanted |= _names_read(helper)
+
+            fields = _self_fields(stmt, field_set)
+            for helper in needed:
+                fields |= _self_fields(helper, field_set)
+
+            name = f"{func.__name__}_rule_{len(rules)}"
+            rules.append(Rule(
+                fields=tuple(f for f in field_names if f in fields),
+                messages=_messages(stmt),
+                check=_compile_rule(stmt, needed, error_lists, func.__globals__, name),
+                source=ast.unparse(stmt),
+            ))
+
+    return rules
+
+
+@lru_cache(maxsize=None)
+def _compiled_checks(model_class) -> list:
+    return [rule._check for rule in _extract_rules(model_class)]
+
+
+def _restore_rules(model_class, stored) -> list:
+    # snapshot rules --> tables come from the snapshot, the checks are only compiled if a message is asked for
+    rules = []
+    for index, data in enumerate(stored):
+        rule = Rule(fields=tuple(data["fields"]), messages=list(data["messages"]), check=None, source=data["source"])
+        rule.allowed = set(data["allowed"])
+        rule._load_check = lambda index=index: _compiled_checks(model_class)[index]
+        rules.append(rule)
+    return rules
+
+
+def dump_rules(model_class) -> list:
+    # plain data of a model's rules for the snapshot
+    return [
+        {"fields": rule.fields, "messages": rule.messages, "source": rule.source, "allowed": rule.allowed}
+        for rule in get_rules(model_class)
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_rules(model_class) -> list:
+    # rules of a model with their allowed value tables over each rule's fields
+    # --> tables are the index every fast check uses (pruning, counting, feasibility)
+    precomputed = _PRECOMPUTED.get(model_key(model_class))
+    if precomputed is not None:
+        return _restore_rules(model_class, precomputed["rules"])
+
+    domains = get_domains(model_class)
+    rules = _extract_rules(model_class)
+    for rule in rules:
+        rule.allowed = {
+            combo for combo in product(*(domains[name] for name in rule.fields))
+            if not rule.check(dict(zip(rule.fields, combo)))
+        }
+    return rules
+
+
+@lru_cache(maxsize=None)
+def collects_errors(model_class) -> bool:
+    # True when the validator gathers every failing rule into one error (errors.append style),
+    # False when it raises on the first failing rule
+    for func in _validator_functions(model_class):
+        tree = ast.parse(textwrap.dedent(inspect.getsource(func)))
+        if any(_is_error_list(stmt) for stmt in tree.body[0].body):
+            return True
+    return False
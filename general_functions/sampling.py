@@ -0,0 +1,50 @@
+import random
+
+from general_functions.counting import get_counting_plan
+
+# Uniform draws from the valid configuration space of a model
+# --> a draw picks an index in [0, count) and walks the counting tables down to the configuration it names,
+#     so every draw is valid by construction and no pydantic construction is ever rejected
+# --> distinct indices give distinct configurations, so `count` parts need `count` draws
+
+
+def _get_rng(seed):
+    return seed if isinstance(seed, random.Random) else random.Random(seed)
+
+
+def sample_configurations(model_class, count: int, defaults=None, seed=None) -> list:
+    # up to `count` distinct valid field dicts, uniformly drawn (without replacement)
+    plan = get_counting_plan(model_class, defaults)
+    total = plan.total()
+    indices = _get_rng(seed).sample(range(total), min(count, total))
+    return [plan.configuration(index) for index in indices]
+
+
+def generate_random_instance(model_class, defaults=None, seed=None):
+    # one uniformly drawn valid model instance, None when the defaults allow no valid configuration
+    configurations = sample_configurations(model_class, 1, defaults, seed)
+    if not configurations:
+        return None
+    return model_class.model_construct(**configurations[0])
+
+
+def generate_valid_parts(model_class, count: int, defaults=None, seed=None) -> list:
+    # `count` distinct valid part numbers (all of them if the space is smaller)
+    # --> draws are uniform over valid configurations, not over part numbers: a part number that k configurations
+    #     print the same way (HF1B-ZL dynamic separators) is k times as likely to be picked as one printed once
+    rng = _get_rng(seed)
+    plan = get_counting_plan(model_class, defaults)
+    total = plan.total()
+
+    parts = {}
+    drawn = set()
+    # a few models print two configurations the same way (HF1B-ZL dynamic separators)
+    # --> top up with fresh indices until `count` distinct strings exist or the space is used up
+    while len(parts) < count and len(drawn) < total:
+        wanted = min(count - len(parts), total - len(drawn))
+        indices = [i for i in rng.sample(range(total), min(total, wanted + len(drawn))) if i not in drawn][:wanted]
+        for index in indices:
+            drawn.add(index)
+            part_number = model_class.model_construct(**plan.configuration(index)).build_part_number()
+            parts.setdefault(part_number, None)
+    return list(parts)[:count]
@@ -0,0 +1,181 @@
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+from functools import lru_cache
+
+from general_functions import catalog, parser, router, rules
+from general_functions.catalog import CATALOG, get_router, module_file
+from general_functions.parser import compile_token_map, token_map_key
+from general_functions.rules import dump_rules, get_domains, model_key
+
+# Precompiled catalog snapshot
+# --> everything derived from the model modules at runtime (Literal domains, rule tables used for counting /
+#     feasibility / pruning, router trie, token map parser state) is built once and pickled to one file
+# --> the file is keyed by a hash of the model sources and of the code that derives the data, pages load it at
+#     startup and it is rebuilt automatically the first time the hash no longer matches
+# --> loading it does not import any model module, lookups are keyed by "module:ClassName"
+#
+# Compiled regexes cannot be stored as such, pattern strings are stored and compiled again on load.
+#
+# ex. python -m general_functions.snapshot            (rebuild if stale)
+#     python -m general_functions.snapshot --check    (exit code 1 if stale)
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "catalog_snapshot.pkl")
+
+# code that derives the snapshot data --> a change here invalidates the snapshot like a model change does
+DERIVING_MODULES = (catalog, parser, router, rules, sys.modules[__name__])
+
+
+def source_files() -> list:
+    model_files = {module_file(entry["model_location"]) for entry in CATALOG}
+    return sorted(model_files) + [module.__file__ for module in DERIVING_MODULES]
+
+
+def source_hash() -> str:
+    digest = hashlib.sha256(f"{SNAPSHOT_FORMAT}:{sys.version_info[:2]}".encode())
+    for path in source_files():
+        with open(path, "rb") as f:
+            digest.update(os.path.basename(path).encode() + b"\0" + f.read() + b"\0")
+    return digest.hexdigest()
+
+
+def build_snapshot() -> dict:
+    # imports every model module --> only run when the snapshot is missing or stale
+    models = {}
+    parsers = {}
+    for entry in CATALOG:
+        model_class = entry["model"]
+        models[model_key(model_class)] = {
+            "domains": get_domains(model_class),
+            "rules": dump_rules(model_class),
+        }
+        parsers[token_map_key(entry["token_map"])] = compile_token_map(entry["token_map"]).state()
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "hash": source_hash(),
+        "models": models,
+        "parsers": parsers,
+        "router_trie": get_router()._trie,
+    }
+
+
+def write_snapshot(snapshot, path=SNAPSHOT_PATH):
+    # written next to the final file then renamed, so a concurrent reader never sees half a file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    # snapshot dict, or None when missing / unreadable / stale
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        return None
+    if snapshot.get("hash") != source_hash():
+        return None
+    return snapshot
+
+
+def install_snapshot(snapshot):
+    rules.use_precomputed(snapshot["models"])
+    parser.use_precompiled(snapshot["parsers"])
+    catalog.use_precomputed_router(snapshot["router_trie"])
+
+
+@lru_cache(maxsize=None)
+def load_snapshot(path=SNAPSHOT_PATH) -> bool:
+    # once per process --> installs the snapshot, rebuilding it first if it is missing or stale
+    # returns True when an existing snapshot was used, False when it had to be rebuilt
+    snapshot = read_snapshot(path)
+    reused = snapshot is not None
+    if snapshot is None:
+        snapshot = build_snapshot()
+        try:
+            write_snapshot(snapshot, path)
+        except OSError:
+            pass  # read only install --> still use the fresh data for this process
+    install_snapshot(snapshot)
+    return reused
+
+
+# Reloading edited models in a running process (general_functions/result_cache.py)
+# --> memoized state derived from the model classes, per module --> modules not imported yet have nothing memoized
+DERIVED_CACHES = {
+    "general_functions.catalog": ("get_router",),
+    "general_functions.rules": ("get_domains", "get_rules", "_compiled_checks", "collects_errors"),
+    "general_functions.compiled_validators": ("get_compiled_validator",),
+    "general_functions.vectorized": ("get_rule_masks",),
+    "general_functions.part_builder": ("get_column_builder",),
+    "general_functions.encoding": ("get_codec",),
+    "general_functions.counting": ("_counting_plan",),
+    "general_functions.space_store": ("open_valid_space",),
+    "general_functions.columnar": ("_token_plan",),
+}
+
+
+def source_signature() -> tuple:
+    # (path, mtime, size) of every source file --> cheap change check, source_hash() tells whether the content changed
+    signature = []
+    for path in source_files():
+        stat = os.stat(path)
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def clear_derived_state():
+    # drops the installed snapshot and every memoized router / rule table / validator / parser / plan
+    # --> rebuilt from the model classes on next use, the next load_snapshot() call rebuilds the snapshot file
+    rules.use_precomputed({})
+    parser.use_precompiled({})
+    parser._PARSER_CACHE.clear()
+    catalog._PRECOMPUTED_ROUTER.clear()
+    for module_name, names in DERIVED_CACHES.items():
+        module = sys.modules.get(module_name)
+        if module is not None:
+            for name in names:
+                getattr(module, name).cache_clear()
+    load_snapshot.cache_clear()
+
+
+def reload_models(changed_files=None):
+    # model modules of the changed source files (all of them when None) are imported again on next use
+    # --> catalog entries drop their loaded model / token map, derived state is cleared
+    # --> edits to the deriving code itself (DERIVING_MODULES) still need a restart
+    for entry in CATALOG:
+        path = module_file(entry["model_location"])
+        if changed_files is None or path in changed_files:
+            sys.modules.pop(entry["model_location"].partition(":")[0], None)
+            entry.pop("model", None)
+            entry.pop("token_map", None)
+    clear_derived_state()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Build the precompiled catalog snapshot.")
+    arg_parser.add_argument("--check", action="store_true", help="only report whether the snapshot is current")
+    arg_parser.add_argument("--force", action="store_true", help="rebuild even if the snapshot is current")
+    args = arg_parser.parse_args(argv)
+
+    current = read_snapshot() is not None
+    if args.check:
+        print("current" if current else "stale")
+        sys.exit(0 if current else 1)
+    if current and not args.force:
+        print(f"{SNAPSHOT_PATH} is current")
+        return
+    snapshot = build_snapshot()
+    write_snapshot(snapshot)
+    print(f"wrote {SNAPSHOT_PATH} ({len(snapshot['models'])} models, {os.path.getsize(SNAPSHOT_PATH)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
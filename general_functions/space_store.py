@@ -0,0 +1,178 @@
+import argparse
+import glob
+import hashlib
+import inspect
+import os
+import sys
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+
+from general_functions import encoding, enumerator, rules
+from general_functions.counting import count_valid
+from general_functions.encoding import contains, get_codec
+from general_functions.enumerator import iter_valid_configurations
+from general_functions.rules import model_key
+
+# On disk valid spaces
+# --> per model, the sorted uint64 ids (general_functions/encoding.py) of every valid configuration, written once by
+#     the enumerator to an .npy file and opened with np.load(mmap_mode="r")
+# --> the file is memory mapped read only: every process of a pool reads the same page cached copy and only the pages
+#     a lookup touches are ever read
+# --> membership, sampling and range scans are binary searches / index picks over the sorted ids
+# --> the file name carries a hash of the model source and of the code deriving the ids (like the catalog snapshot),
+#     a model change makes the old file unused and the next open builds the new one
+#
+# ex. space = open_valid_space(JJ5SY_PLUGIN_MFLD_EX600_MODEL)
+#     space.contains_tokens(tokens)  /  space.sample(100, seed=0)  /  space.prefix_range({"series": "5"})
+#     python -m general_functions.space_store                  (build every missing store)
+#     python -m general_functions.space_store --check          (exit code 1 if a store is missing or stale)
+
+STORE_DIR = os.path.join(os.path.dirname(__file__), "valid_spaces")
+BUILD_CHUNK_SIZE = 100_000
+
+# code that derives the ids --> a change here invalidates the stores like a model change does
+DERIVING_MODULES = (encoding, enumerator, rules, sys.modules[__name__])
+
+
+class ValidSpace:
+    def __init__(self, model_class, ids):
+        self.model_class = model_class
+        self.codec = get_codec(model_class)
+        self.ids = ids  # sorted uint64 array, memory mapped
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ------------------------- Membership -----------------------------
+
+    def contains(self, ids) -> np.ndarray:
+        return contains(self.ids, ids)
+
+    def contains_tokens(self, tokens) -> bool:
+        # whether a parsed token dict is a valid configuration
+        # --> a value the ids cannot hold (outside a field's choices, a plain str field off its default) is not in it
+        try:
+            code = self.codec.encode(tokens)
+        except (KeyError, ValueError):
+            return False
+        return bool(self.contains(np.array([code], dtype=np.uint64))[0])
+
+    # ------------------------- Sampling -----------------------------
+
+    def sample(self, count: int, seed=None) -> np.ndarray:
+        # up to `count` distinct valid ids, uniformly drawn (without replacement)
+        rng = np.random.default_rng(seed)
+        positions = rng.choice(len(self.ids), size=min(count, len(self.ids)), replace=False)
+        return np.asarray(self.ids[np.sort(positions)])
+
+    def sample_part_numbers(self, count: int, seed=None) -> list:
+        return self.codec.to_part_numbers(self.sample(count, seed)).to_pylist()
+
+    # ------------------------- Range Scans -----------------------------
+
+    def id_range(self, low: int, high: int) -> np.ndarray:
+        # valid ids in [low, high)
+        start, stop = np.searchsorted(self.ids, np.array([low, high], dtype=np.uint64))
+        return self.ids[start:stop]
+
+    def prefix_range(self, values: dict) -> np.ndarray:
+        # valid ids whose leading fields (in model field order) take the given values --> one contiguous id range
+        fields = self.codec.fields
+        if list(values) != fields[:len(values)]:
+            raise ValueError(f"Range scans fix leading fields in model field order: {fields[:len(values)]}")
+        if not values:
+            return self.ids[:]
+        low = sum(self.codec._digits[name][value] * stride
+                  for (name, value), stride in zip(values.items(), self.codec.strides))
+        return self.id_range(low, low + self.codec.strides[len(values) - 1])
+
+    def part_numbers(self, ids) -> list:
+        return self.codec.to_part_numbers(ids).to_pylist()
+
+
+# ------------------------- Building -----------------------------
+
+def source_hash(model_class) -> str:
+    digest = hashlib.sha256(f"{model_key(model_class)}:{np.dtype(np.uint64).str}".encode())
+    for path in [inspect.getsourcefile(model_class)] + [module.__file__ for module in DERIVING_MODULES]:
+        with open(path, "rb") as f:
+            digest.update(os.path.basename(path).encode() + b"\0" + f.read() + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def store_path(model_class, store_dir=STORE_DIR) -> str:
+    return os.path.join(store_dir, f"{model_class.__name__}-{source_hash(model_class)}.npy")
+
+
+def build_valid_space(model_class, store_dir=STORE_DIR) -> str:
+    # enumerates the model once and writes its sorted ids --> path of the store
+    # --> the array is sized with the exact count and filled chunk by chunk, so the space is never held in memory
+    path = store_path(model_class, store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    codec = get_codec(model_class)
+    total = count_valid(model_class)
+
+    # written next to the final file then renamed, so a concurrent reader never sees half a file
+    temp_path = f"{path[:-len('.npy')]}.{os.getpid()}.tmp.npy"
+    ids = np.lib.format.open_memmap(temp_path, mode="w+", dtype=np.uint64, shape=(total,))
+    configurations = iter_valid_configurations(model_class)
+    written = 0
+    while True:
+        chunk = codec.encode_many(islice(configurations, BUILD_CHUNK_SIZE))
+        if not len(chunk):
+            break
+        ids[written:written + len(chunk)] = chunk
+        written += len(chunk)
+    ids.flush()
+    del ids
+    if written != total:
+        os.remove(temp_path)
+        raise RuntimeError(f"{model_class.__name__}: enumerated {written} configurations, counted {total}")
+    os.replace(temp_path, path)
+
+    # stores of older model versions
+    for old_path in glob.glob(os.path.join(store_dir, f"{model_class.__name__}-*.npy")):
+        if old_path != path and ".tmp." not in old_path:
+            os.remove(old_path)
+    return path
+
+
+@lru_cache(maxsize=None)
+def open_valid_space(model_class, store_dir=STORE_DIR) -> ValidSpace:
+    # once per process and model --> the memory mapped store, built first when missing or stale
+    path = store_path(model_class, store_dir)
+    if not os.path.exists(path):
+        build_valid_space(model_class, store_dir)
+    return ValidSpace(model_class, np.load(path, mmap_mode="r"))
+
+
+def main(argv=None):
+    from general_functions.catalog import CATALOG, find_model
+
+    arg_parser = argparse.ArgumentParser(description="Build the on disk valid spaces (sorted configuration ids).")
+    arg_parser.add_argument("models", nargs="*", help="model class names or catalog display names (default: every model)")
+    arg_parser.add_argument("--check", action="store_true", help="only report which stores are missing or stale")
+    arg_parser.add_argument("--force", action="store_true", help="rebuild even if the store is current")
+    args = arg_parser.parse_args(argv)
+
+    models = [find_model(name) for name in args.models] or list(dict.fromkeys(entry["model"] for entry in CATALOG))
+    missing = False
+    for model_class in models:
+        path = store_path(model_class)
+        current = os.path.exists(path)
+        if args.check:
+            print(f"{model_class.__name__}: {'current' if current else 'missing'}")
+            missing |= not current
+            continue
+        if current and not args.force:
+            print(f"{model_class.__name__}: {path} is current")
+            continue
+        build_valid_space(model_class)
+        print(f"{model_class.__name__}: wrote {path} ({os.path.getsize(path)} bytes)")
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from pydantic import ValidationError
+
+from general_functions.catalog import route_part_number
+from general_functions.compiled_validators import get_compiled_validator
+from general_functions.instrumentation import BUILD, CONSTRUCTION, DESCRIPTION, PARSE, ROUTING, timed, trace
+from general_functions.parser import compile_token_map
+from general_functions.router import RoutingError
+
+# chunk length from which validate_chunk takes the column wise path (slower below about 5k part numbers)
+COLUMNAR_MIN_ROWS = 10_000
+
+
+def error_messages(e: ValidationError) -> list:
+    # pydantic error text as shown on the validator page --> "Value error, " prefix removed, one entry per line
+    messages = []
+    for err in e.errors():
+        msg = err["msg"]
+        if msg.lower().startswith("value error, "):
+            msg = msg[len("Value error, "):]
+        messages.extend(msg.splitlines())
+    return messages
+
+
+def validate_part_number(part_number: str, details: bool = False, compiled: bool = False) -> dict:
+    # Route, parse and validate one part number without any UI
+    # --> same pipeline as part_number_validator.py, returns a plain dict so results can cross process boundaries
+    # --> details=True adds what the validator page displays: error_type ("routing" / "parse" / "validation"),
+    #     the model dump and the description
+    # --> compiled=True checks token dicts with the model's generated validator (general_functions/compiled_validators.py)
+    #     instead of constructing the pydantic model --> same result, no ValidationError raised per rejected split
+    # --> every step is a stage of general_functions/instrumentation.py, timed when the call runs inside trace()
+    result = {
+        "input": part_number,
+        "model": None,
+        "tokens": None,
+        "valid": False,
+        "errors": [],
+        "part_number": "",
+    }
+    if details:
+        result.update(error_type=None, dump=None, description=None)
+
+    def accept(tokens, instance):
+        result.update(tokens=tokens, valid=True, part_number=timed(BUILD, instance.build_part_number))
+        if details:
+            result.update(dump=instance.model_dump(), description=timed(DESCRIPTION, instance.description))
+        return result
+
+    def reject(error_type, errors):
+        result["errors"] = errors
+        if details:
+            result["error_type"] = error_type
+        return result
+
+    try:
+        entry = timed(ROUTING, route_part_number, part_number)
+    except RoutingError as e:
+        return reject("routing", [str(e)])
+
+    model = entry["model"]
+    parser = compile_token_map(entry["token_map"])
+    result["model"] = model.__name__
+    if compiled:
+        return _validate_compiled(part_number, model, parser, result, accept, reject)
+
+    # single regex split first, the packrat search only runs when that split is missing or invalid
+    tokens = timed(PARSE, parser.match_fast, part_number.strip())
+    if tokens is not None:
+        try:
+            return accept(tokens, timed(CONSTRUCTION, model.model_validate, tokens))
+        except ValidationError:
+            pass
+
+    candidates = timed(PARSE, parser.parse_all, part_number)
+    try:
+        if not candidates:
+            timed(PARSE, parser.parse, part_number)  # raises the detailed parse error
+        result["tokens"] = candidates[0]
+        tokens, instance = timed(CONSTRUCTION, parser.choose_valid, model, candidates, part_number)
+    except ValidationError as e:
+        return reject("validation", error_messages(e))
+    except ValueError as e:
+        return reject("parse", [f"Parse error: {e}"])
+
+    return accept(tokens, instance)
+
+
+def _validate_compiled(part_number, model, parser, result, accept, reject):
+    # the steps of validate_part_number after routing, with the generated validator in place of model(**tokens)
+    # --> candidate order and the round trip rule are the ones of TokenMapParser.choose_valid
+    validator = get_compiled_validator(model)
+    s = part_number.strip()
+
+    greedy = timed(PARSE, parser.match_fast, s)
+    if greedy is not None:
+        errors, values = validator.check(greedy)
+        if not errors:
+            return accept(greedy, timed(CONSTRUCTION, validator.instance, greedy, values))
+
+    candidates = timed(PARSE, parser.parse_all, part_number)
+    if not candidates:
+        try:
+            timed(PARSE, parser.parse, part_number)  # raises the detailed parse error
+        except ValueError as e:
+            return reject("parse", [f"Parse error: {e}"])
+    result["tokens"] = candidates[0]
+
+    first_errors = None
+    for tokens in candidates:
+        errors, values = validator.check(tokens)
+        if errors:
+            if first_errors is None:
+                first_errors = errors
+            continue
+        instance = timed(CONSTRUCTION, validator.instance, tokens, values)
+        if tokens == greedy or timed(BUILD, instance.build_part_number) == s:
+            return accept(tokens, instance)
+
+    if first_errors is None:
+        return reject("parse", [f"Parse error: Part number does not match any valid layout for {model.__name__}"])
+    return reject("validation", first_errors)
+
+
+def validate_chunk(part_numbers, details: bool = False, timing: bool = False) -> list:
+    # unit of work for process pools --> one list of results per list of part numbers
+    # --> generated validators: bulk jobs reject many splits, no ValidationError is built for those
+    # --> chunks of COLUMNAR_MIN_ROWS part numbers or more are routed, split and checked column wise
+    #     (general_functions/columnar.py) --> same results, Arrow's per call regex compilation only pays off on long
+    #     columns
+    # --> timing=True adds "timing" to every result: ms per stage and "total" (the requests also go to this
+    #     process's ring buffer, general_functions/instrumentation.py)
+    if not timing:
+        if not details and len(part_numbers) >= COLUMNAR_MIN_ROWS:
+            from general_functions.columnar import validate_column  # pyarrow / pandas only for long chunks
+            return validate_column(part_numbers)
+        return [validate_part_number(part_number, details, compiled=True) for part_number in part_numbers]
+    results = []
+    for part_number in part_numbers:
+        with trace(part_number) as request:
+            result = validate_part_number(part_number, details, compiled=True)
+        result["timing"] = {**request.breakdown(), "total": request.total * 1000}
+        results.append(result)
+    return results
@@ -0,0 +1,163 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is optional here, pandas / NumPy columns work without it
+    pa = pc = None
+
+from general_functions.rules import collects_errors, get_domains, get_literal_choices, get_rules, literal_error_message
+
+# Column wise rule checking for bulk validation
+# --> token columns are dictionary encoded against each field's Literal choices (code = index of the choice)
+# --> every rule becomes a boolean "broken" table over the product of its fields' choices, so a rule is checked for
+#     every row at once with one fancy index into that table
+# --> result per row: a bitmask of broken rules (bit i = i-th rule of get_rules) and a bitmask of fields whose value
+#     is not one of its choices (bit j = j-th model field), which map back to the model's own error messages
+#
+# ex. check = check_columns(SY_BODY_PORTED_VALVE_MODEL, token_df)
+#     token_df[~check.valid]  /  check.messages(row)
+
+
+class RuleMasks:
+    def __init__(self, model_class):
+        self.model_class = model_class
+        self.domains = get_domains(model_class)
+        self.fields = list(self.domains)
+        self.rules = get_rules(model_class)
+        self.collects_errors = collects_errors(model_class)
+        if len(self.rules) > 64 or len(self.fields) > 64:
+            raise ValueError(f"{model_class.__name__} has more rules / fields than a uint64 bitmask holds")
+
+        # fields typed as plain str accept any value in pydantic, the tables only know their default
+        self.literal_fields = {
+            name for name, field in model_class.model_fields.items() if get_literal_choices(field.annotation)
+        }
+        # code of a field left out of the columns --> its default, like model(**tokens); required fields have none
+        self.missing_codes = {
+            name: self.domains[name].index(field.default)
+            for name, field in model_class.model_fields.items()
+            if not field.is_required() and field.default in self.domains[name]
+        }
+
+        # rule --> (field positions, strides of the flattened table, broken table)
+        self.tables = []
+        for rule in self.rules:
+            sizes = [len(self.domains[name]) for name in rule.fields]
+            strides = np.cumprod([1] + sizes[:0:-1])[::-1].astype(np.int64)
+            broken = np.ones(int(np.prod(sizes)) if sizes else 1, dtype=bool)
+            for combo in rule.allowed:
+                index = sum(self.domains[name].index(value) * stride for name, value, stride in zip(rule.fields, combo, strides))
+                broken[index] = False
+            self.tables.append(([self.fields.index(name) for name in rule.fields], strides, broken))
+
+    def encode(self, columns, length) -> np.ndarray:
+        # (fields x rows) int32 codes, -1 where the value is not one of the field's choices or the column of a
+        # required field is missing
+        codes = np.empty((len(self.fields), length), dtype=np.int32)
+        for position, name in enumerate(self.fields):
+            column = columns.get(name)
+            if column is None:
+                codes[position] = self.missing_codes.get(name, -1)
+                continue
+            codes[position] = _encode_column(column, self.domains[name])
+        return codes
+
+    def evaluate(self, columns) -> "ColumnCheck":
+        columns = _as_column_dict(columns)
+        length = len(next(iter(columns.values()))) if columns else 0
+        codes = self.encode(columns, length)
+        outside = codes < 0
+        # required fields without a column --> "Field required" on every row (whatever the field's type)
+        missing = {
+            position for position, name in enumerate(self.fields) if name not in columns and name not in self.missing_codes
+        }
+
+        domain_errors = np.zeros(length, dtype=np.uint64)
+        unchecked = np.zeros(length, dtype=bool)
+        for position, name in enumerate(self.fields):
+            if name in self.literal_fields or position in missing:
+                domain_errors |= outside[position].astype(np.uint64) << np.uint64(position)
+            else:
+                unchecked |= outside[position]
+
+        # the model validator only runs once every field passed its own validation
+        evaluated = (domain_errors == 0) & ~unchecked
+        safe_codes = np.where(outside, 0, codes)
+        violations = np.zeros(length, dtype=np.uint64)
+        for bit, (positions, strides, broken) in enumerate(self.tables):
+            index = np.zeros(length, dtype=np.int64)
+            for position, stride in zip(positions, strides):
+                index += safe_codes[position] * stride
+            violations |= (broken[index] & evaluated).astype(np.uint64) << np.uint64(bit)
+
+        return ColumnCheck(self, codes, violations, domain_errors, unchecked, missing)
+
+
+class ColumnCheck:
+    def __init__(self, masks, codes, violations, domain_errors, unchecked, missing=frozenset()):
+        self.masks = masks
+        self.codes = codes
+        self.missing = missing              # positions of required fields without a column
+        self.violations = violations        # uint64 per row, bit i --> masks.rules[i] broken
+        self.domain_errors = domain_errors  # uint64 per row, bit j --> masks.fields[j] not one of its choices / missing
+        self.unchecked = unchecked          # rows with a plain str field the tables cannot decide (validate those normally)
+        self.valid = (violations == 0) & (domain_errors == 0) & ~unchecked
+
+    def broken_rules(self, row) -> list:
+        bits = int(self.violations[row])
+        return [rule for bit, rule in enumerate(self.masks.rules) if bits >> bit & 1]
+
+    def values(self, row) -> dict:
+        # decoded field values of a row (None for values outside the field's choices)
+        return {
+            name: self.masks.domains[name][code] if code >= 0 else None
+            for name, code in zip(self.masks.fields, self.codes[:, row])
+        }
+
+    def messages(self, row) -> list:
+        # the error lines validate_part_number reports for the row, in the same order
+        if self.domain_errors[row]:
+            bits = int(self.domain_errors[row])
+            return [
+                "Field required" if position in self.missing else literal_error_message(self.masks.domains[name])
+                for position, name in enumerate(self.masks.fields) if bits >> position & 1
+            ]
+        broken = self.broken_rules(row)
+        if not broken:
+            return []
+        values = self.values(row)
+        if not self.masks.collects_errors:
+            return broken[0].check(values)  # raise style validator --> only the first failing rule is reported
+        return [message for rule in broken for message in rule.check(values)]
+
+
+def _encode_column(column, choices) -> np.ndarray:
+    # index of each value in `choices`, -1 when it is not one of them
+    if pa is not None and isinstance(column, (pa.Array, pa.ChunkedArray)):
+        # arrow kernel --> no Python string per row
+        found = pc.index_in(column.cast(pa.string()), value_set=pa.array(choices, type=pa.string()))
+        return pc.fill_null(found, -1).to_numpy(zero_copy_only=False)
+    values = column.to_numpy(dtype=object) if hasattr(column, "to_numpy") else np.asarray(column, dtype=object)
+    return pd.Categorical(values, categories=list(choices)).codes
+
+
+def _as_column_dict(columns) -> dict:
+    if hasattr(columns, "column_names"):
+        return {name: columns[name] for name in columns.column_names}  # pyarrow Table
+    if isinstance(columns, pd.DataFrame):
+        return {name: columns[name] for name in columns.columns}
+    return dict(columns)
+
+
+@lru_cache(maxsize=None)
+def get_rule_masks(model_class) -> RuleMasks:
+    return RuleMasks(model_class)
+
+
+def check_columns(model_class, columns) -> ColumnCheck:
+    # columns: dict / DataFrame / pyarrow Table of token columns named like the model fields
+    return get_rule_masks(model_class).evaluate(columns)
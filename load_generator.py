@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+# Local load generator for validation_service.py
+# --> `--concurrency` keep-alive connections, each sending its next request as soon as the previous answer is in
+# --> part numbers come from a file (one per line) or, without one, from POST /generate of every routed model
+# --> reports throughput and the p50 / p90 / p99 / max latency of the completed requests (HTTP 200), failed requests
+#     (other status, connection errors) are counted as errors
+#
+# ex. python load_generator.py --url http://127.0.0.1:8080 --concurrency 32 --requests 5000
+#     python load_generator.py bom.txt --batch 100 --requests 200
+
+
+class Connection:
+    # minimal HTTP/1.1 client over one persistent connection (the service always answers with Content-Length)
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None) -> tuple:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+        )
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            # the server closed the keep-alive connection --> the next request opens a new one
+            self.close()
+            raise ConnectionError("connection closed by the server")
+        status = int(status_line.split()[1])
+        length, close = 0, False
+        while True:
+            line = (await self.reader.readline()).strip()
+            if not line:
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "connection" and value.strip().lower() == "close":
+                close = True
+        payload = await self.reader.readexactly(length)
+        if close:
+            self.close()
+        return status, json.loads(payload) if payload else None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def fetch_part_numbers(connection, per_model) -> list:
+    _, listing = await connection.request("GET", "/models")
+    part_numbers = []
+    for model in listing["models"]:
+        if model["routed"]:
+            status, body = await connection.request("POST", "/generate", {"model": model["model"], "count": per_model, "seed": 0})
+            if status == 200:
+                part_numbers.extend(body["part_numbers"])
+    return part_numbers
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_load(host, port, part_numbers, requests, concurrency, batch, seed) -> dict:
+    rng = random.Random(seed)
+    bodies = [
+        {"part_numbers": rng.sample(part_numbers, min(batch, len(part_numbers)))} if batch > 1
+        else {"part_number": rng.choice(part_numbers)}
+        for _ in range(requests)
+    ]
+    latencies = []  # completed requests only
+    errors = 0
+    queue = iter(bodies)
+
+    async def client():
+        nonlocal errors
+        connection = Connection(host, port)
+        try:
+            for body in queue:
+                start = time.perf_counter()
+                try:
+                    status, _ = await connection.request("POST", "/validate", body)
+                except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    status = None
+                    connection.close()
+                if status == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    report = {
+        "requests": len(latencies) + errors,
+        "completed": len(latencies),
+        "part_numbers": len(latencies) * max(batch, 1),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None,  # no completed request
+    }
+    if latencies:
+        report.update(
+            p50_ms=percentile(latencies, 0.50) * 1000,
+            p90_ms=percentile(latencies, 0.90) * 1000,
+            p99_ms=percentile(latencies, 0.99) * 1000,
+            max_ms=latencies[-1] * 1000,
+        )
+    return report
+
+
+async def main_async(args):
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+
+    if args.input:
+        with open(args.input, encoding="utf-8-sig") as f:
+            part_numbers = [line.strip() for line in f if line.strip()]
+    else:
+        connection = Connection(host, port)
+        part_numbers = await fetch_part_numbers(connection, args.per_model)
+        connection.close()
+    if not part_numbers:
+        sys.exit("no part numbers to send")
+
+    if args.warmup:
+        await run_load(host, port, part_numbers, args.warmup, args.concurrency, args.batch, args.seed + 1)
+    report = await run_load(host, port, part_numbers, args.requests, args.concurrency, args.batch, args.seed)
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(
+        f"{report['completed']} of {report['requests']} requests completed ({report['part_numbers']} part numbers) "
+        f"in {report['seconds']:.2f}s --> {report['requests_per_second']:.0f} req/s, {report['errors']} errors"
+    )
+    if not report["completed"]:
+        print("latency ms: no request completed")
+        return
+    print(
+        f"latency ms: p50 {report['p50_ms']:.1f}  p90 {report['p90_ms']:.1f}  p99 {report['p99_ms']:.1f}  "
+        f"max {report['max_ms']:.1f}"
+    )
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Send validation load to validation_service.py.")
+    arg_parser.add_argument("input", nargs="?", default=None, help="file of part numbers (default: ask /generate)")
+    arg_parser.add_argument("--url", default="http://127.0.0.1:8080", help="service address")
+    arg_parser.add_argument("--requests", type=int, default=2000, help="requests to send")
+    arg_parser.add_argument("--concurrency", type=int, default=16, help="connections sending at the same time")
+    arg_parser.add_argument("--batch", type=int, default=1, help="part numbers per request (1 = single requests)")
+    arg_parser.add_argument("--warmup", type=int, default=200, help="requests sent first and left out of the report")
+    arg_parser.add_argument("--per-model", type=int, default=50, help="part numbers generated per model without input")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = arg_parser.parse_args(argv)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
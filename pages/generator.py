@@ -1,77 +1,49 @@
 import streamlit as st
-import random
 import pandas as pd
-from pydantic import ValidationError
 from typing import get_args, get_origin, Literal
 from io import BytesIO, StringIO
 
-# -------- To resolve moving up into different directory and importing files in separate folder --------
-import sys
-import os
-
-ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-if ROOT_DIR not in sys.path:
-    sys.path.append(ROOT_DIR)
-
-# --------------------- Part Validation Models -------------------------
-# -------------------------- JSY --------------------------
-# ---- PLUG IN -----
-from jsy_plugin.valve import JSY_PLUGIN_VALVE_MODEL
-from jsy_plugin.manifold_dsub_flatribbon import JJ5SY_PLUGIN_MFLD_DSUB_MODEL 
-from jsy_plugin.manifold_terminalbox import JJ5SY_PLUGIN_MFLD_TERMBOX_MODEL 
-from jsy_plugin.manifold_leadwire import JJ5SY_PLUGIN_MFLD_LEADWIRE_MODEL 
-from jsy_plugin.manifold_ex600 import JJ5SY_PLUGIN_MFLD_EX600_MODEL 
-from jsy_plugin.manifold_ex260 import JJ5SY_PLUGIN_MFLD_EX260_MODEL 
-from jsy_plugin.manifold_ex260_profisafe import JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_MODEL 
-from jsy_plugin.manifold_ex120 import JJ5SY_PLUG_IN_MFLD_EX120_MODEL 
-from jsy_plugin.manifold_jsy_e import JJ5SY_PLUGIN_EJECTOR_MANIFOLD_MODEL
-
-# ----- NON PLUG IN -----
-from jsy_nonplugin.valve import JSY_NONPLUGIN_VALVE_MODEL 
-from jsy_nonplugin.manifold_metalbase import JJ5SY_NONPLUGIN_MFLD_METALBASE_MODEL 
-
-# -------------------------- SY-1 --------------------------
-from SY1.manifold_type_10_11_dsub_flatribbon import SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_MODEL 
-from SY1.manifold_type_10_11_terminal_block_spring_type import SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_MODEL
-from SY1.valve_base_mounted import SY1_BASE_MOUNTED_PLUGIN_VALVE_MODEL
-
-# -------------------------- SY ----------------------------
-from SY.valve_body_ported import SY_BODY_PORTED_VALVE_MODEL
-
-# -------------------------- HF ----------------------------
-from HF.HF1B_ZL import HF1B_ZL_MODEL
+# ----- GENERAL FUNCTIONS -----
+from general_functions.catalog import find_model
+from general_functions.counting import count_valid
+from general_functions.feasibility import get_defaults_error
+from general_functions.sampling import generate_valid_parts
+from general_functions.snapshot import load_snapshot
 
-# ----------------------------- Model Map (for user selection of models) -----------------------------
+# precompiled domains / rule tables / router / parsers --> rebuilt here only when a model source changed
+load_snapshot()
 
+# ----------------------------- Model Map (for user selection of models) -----------------------------
+# display names from general_functions/catalog.py --> a model module is only imported once it is selected
 MODEL_SERIES_MAP = {
-    "JSY": {
-        "JSY Plugin Valve" : JSY_PLUGIN_VALVE_MODEL,
-        "JSY DSUB Manifold" : JJ5SY_PLUGIN_MFLD_DSUB_MODEL,
-        "JSY Terminal Manifold" : JJ5SY_PLUGIN_MFLD_TERMBOX_MODEL,
-        "JSY Leadwire Manifold" : JJ5SY_PLUGIN_MFLD_LEADWIRE_MODEL,
-        "JSY EX600 Manifold" : JJ5SY_PLUGIN_MFLD_EX600_MODEL,
-        "JSY EX260 Manifold" : JJ5SY_PLUGIN_MFLD_EX260_MODEL,
-        "JSY EX260 (PROFISAFE) Manifold" : JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_MODEL,
-        "JSY EX120 Manifold" : JJ5SY_PLUG_IN_MFLD_EX120_MODEL,
-
-        "JSY Non Plugin Valve" : JSY_NONPLUGIN_VALVE_MODEL,
-        "JSY Metalbase Manifold" : JJ5SY_NONPLUGIN_MFLD_METALBASE_MODEL,
-        "JSY Ejector Manifold" : JJ5SY_PLUGIN_EJECTOR_MANIFOLD_MODEL
-    },
-
-    "SY-1": {
-        "SY-1 Type 10/11 DSUB Manifold" : SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_MODEL,
-        "SY-1 Type 10/11 Terminal Block Manifold" : SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_MODEL,
-        "SY-1 Base Mounted Valve" : SY1_BASE_MOUNTED_PLUGIN_VALVE_MODEL
-    },
-
-    "SY": {
-        "SY Body Ported Valve" : SY_BODY_PORTED_VALVE_MODEL
-    },
+    "JSY": [
+        "JSY Plugin Valve",
+        "JSY DSUB Manifold",
+        "JSY Terminal Manifold",
+        "JSY Leadwire Manifold",
+        "JSY EX600 Manifold",
+        "JSY EX260 Manifold",
+        "JSY EX260 (PROFISAFE) Manifold",
+        "JSY EX120 Manifold",
+
+        "JSY Non Plugin Valve",
+        "JSY Metalbase Manifold",
+        "JSY Ejector Manifold"
+    ],
+
+    "SY-1": [
+        "SY-1 Type 10/11 DSUB Manifold",
+        "SY-1 Type 10/11 Terminal Block Manifold",
+        "SY-1 Base Mounted Valve"
+    ],
+
+    "SY": [
+        "SY Body Ported Valve"
+    ],
     
-    "HF": {
-        "HF1B-ZL" : HF1B_ZL_MODEL
-    },
+    "HF": [
+        "HF1B-ZL"
+    ],
 }
 
 # ------------------------- Functions -----------------------------
@@ -82,40 +54,6 @@ def get_literal_choices(type_):
         return get_args(type_)
     return None
 
-def generate_random_instance(model_class, defaults=None):
-    defaults = defaults or {}
-
-    for _ in range(100):
-        field_values = {}
-        for name, field in model_class.model_fields.items():
-            if name in defaults:
-                field_values[name] = defaults[name]
-            else:
-                choices = get_literal_choices(field.annotation)
-                if choices:
-                    field_values[name] = random.choice(choices)
-                else:
-                    field_values[name] = field.default if field.default is not None else ""
-        try:
-            return model_class(**field_values)
-        except ValidationError:
-            continue
-    return None
-
-
-def generate_valid_parts(model_class, count: int, defaults=None):
-    valid_parts = set()
-    attempts = 0
-    max_attempts = count * 20
-
-    while len(valid_parts) < count and attempts < max_attempts:
-        part = generate_random_instance(model_class, defaults)
-        if part:
-            valid_parts.add(part.build_part_number())
-        attempts += 1
-
-    return list(valid_parts)
-
 # Extract valid default options based on Literal[...] fields
 def get_literal_fields(model_class):
     literal_fields = {}
@@ -125,18 +63,6 @@ def get_literal_fields(model_class):
             literal_fields[name] = choices
     return literal_fields
 
-def validate_defaults_by_sampling(model_class, defaults, tries=100):
-    for _ in range(tries):
-        instance = generate_random_instance(model_class, defaults)
-        if instance is not None:
-            return True  # at least one valid combo found
-    return False  # no valid instances after multiple attempts
-
-def get_validation_error_if_all_fail(model_class, defaults, tries=100):
-    valid = validate_defaults_by_sampling(model_class, defaults, tries)
-    return None if valid else "No valid combinations could be found after sampling. Double check default option combinations are valid."
-
-
 # -------------------------------------------------------------
 st.set_page_config(page_title="Part Generator", layout="wide")
 st.title("Part Number Generator")
@@ -151,9 +77,9 @@ with col1:
         product_series = st.selectbox("Product Series", list(MODEL_SERIES_MAP.keys()))
         
     with msubcol2:
-        available_models = list(MODEL_SERIES_MAP[product_series].keys())
+        available_models = MODEL_SERIES_MAP[product_series]
         model_choice = st.selectbox("Select Model", available_models)
-        model_class = MODEL_SERIES_MAP[product_series][model_choice]
+        model_class = find_model(model_choice)
 
     # user help info and dropdowns for user-selectable defaults
     with st.expander("🛠️ Help"):
@@ -184,11 +110,22 @@ with col1:
 # -------------------- Column 2 -------------------------
 
 with col2:
-    count = st.selectbox("How many parts to generate?", [1, 10, 20, 100])
+    ccol1, ccol2 = st.columns([1, 1])
+    with ccol1:
+        count = st.selectbox("How many parts to generate?", [1, 10, 20, 100])
+    with ccol2:
+        # exact size of the valid space for the selected model and defaults
+        available_count = count_valid(model_class, user_defaults)
+        st.metric("Valid configurations", f"{available_count:,}")
+    if available_count == 0:
+        # checked live --> defaults that block everything are named before Generate is clicked
+        st.warning(get_defaults_error(model_class, user_defaults))
+    elif count > available_count:
+        st.warning(f"Only {available_count:,} valid configurations exist for these defaults — fewer than the {count} requested.")
     if st.button("Generate", use_container_width=True):
         subcol1, subcol2 = st.columns([1, 1])
-        if not validate_defaults_by_sampling(model_class, user_defaults):
-            error_msg = get_validation_error_if_all_fail(model_class, user_defaults)
+        error_msg = get_defaults_error(model_class, user_defaults)
+        if error_msg:
             st.error(error_msg)
         else:
             result = generate_valid_parts(model_class, count, defaults=user_defaults)
@@ -3,40 +3,38 @@ from pydantic import ValidationError
 from typing import get_args, get_origin, Literal
 import base64
 
-# --------------------- Part Validation Models -------------------------
+# ----- GENERAL FUNCTIONS -----
+from general_functions.catalog import find_model
+from general_functions.propagation import propagate, reachable_options
+from general_functions.snapshot import load_snapshot
 
-# -------------------------- SY-1 --------------------------
-from SY1.manifold_type_10_11_dsub_flatribbon import SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_MODEL 
-from SY1.manifold_type_10_11_terminal_block_spring_type import SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_MODEL
-from SY1.valve_base_mounted import SY1_BASE_MOUNTED_PLUGIN_VALVE_MODEL
-from SY1.valve_blank_plate import SY1_PLUGIN_BLANKING_PLATE_MODEL
-
-# -------------------------- SY ----------------------------
-from SY.valve_body_ported import SY_BODY_PORTED_VALVE_MODEL
+# precompiled domains / rule tables / router / parsers --> rebuilt here only when a model source changed
+load_snapshot()
 
 # ----------------------------- Model Map (for user selection of models) -----------------------------
 # -- Product Series
 # ----- Manifold Models
 # ----- Valve model related to manifold model
+# models are catalog display names (general_functions/catalog.py) --> imported once the manifold type is selected
 MANIFOLD_VALVE_ASSOCIATIONS = {
     "SY-1": {
         "Type 10/11 DSUB Manifold": {
-            "manifold_model": SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_MODEL,
-            "valve_model": SY1_BASE_MOUNTED_PLUGIN_VALVE_MODEL,
-            "blanking_plate_model": SY1_PLUGIN_BLANKING_PLATE_MODEL,
+            "manifold_model": "SY-1 Type 10/11 DSUB Manifold",
+            "valve_model": "SY-1 Base Mounted Valve",
+            "blanking_plate_model": "SY-1 Blanking Plate",
             "hto_pdf": "SY1/HTO/manifold_type_10_11_dsub_flatribbon_hto.pdf"
         },
         "Type 10/11 Terminal Block Manifold": {
-            "manifold_model": SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_MODEL,
-            "valve_model": SY1_BASE_MOUNTED_PLUGIN_VALVE_MODEL,
-            "blanking_plate_model": SY1_PLUGIN_BLANKING_PLATE_MODEL,
+            "manifold_model": "SY-1 Type 10/11 Terminal Block Manifold",
+            "valve_model": "SY-1 Base Mounted Valve",
+            "blanking_plate_model": "SY-1 Blanking Plate",
             "hto_pdf": "SY1/HTO/manifold_type_10_11_terminal_block_spring_type_hto.pdf"
         }
     },
     "SY": {
         "SY MANIFOLD MODEL": {
             # "manifold_model" : MANIFOLD_MODEL_HERE,
-            "valve_model": SY_BODY_PORTED_VALVE_MODEL
+            "valve_model": "SY Body Ported Valve"
         }
     }
 }
@@ -58,6 +56,13 @@ def get_literal_fields(model_class):
             literal_fields[name] = choices
     return literal_fields
 
+# Selectbox limited to the options still reachable after the selections made above it
+# --> a stored selection that is no longer reachable falls back to the first reachable option
+def pruned_selectbox(label, options, key, **kwargs):
+    if st.session_state.get(key) not in options:
+        st.session_state[key] = options[0]
+    return st.selectbox(label, list(options), key=key, **kwargs)
+
 def show_pdf(file_path):
     with open(file_path, "rb") as f:
         base64_pdf = base64.b64encode(f.read()).decode("utf-8")
@@ -96,9 +101,9 @@ with col1:
 
         # extract models
         selected_entry = MANIFOLD_VALVE_ASSOCIATIONS[product_series][manifold_choice]
-        manifold_model = selected_entry.get("manifold_model", "N/A")
-        valve_model = selected_entry.get("valve_model", "N/A")
-        blanking_plate_model = selected_entry.get("blanking_plate_model", "N/A")
+        manifold_model = find_model(selected_entry["manifold_model"]) if "manifold_model" in selected_entry else "N/A"
+        valve_model = find_model(selected_entry["valve_model"]) if "valve_model" in selected_entry else "N/A"
+        blanking_plate_model = find_model(selected_entry["blanking_plate_model"]) if "blanking_plate_model" in selected_entry else "N/A"
         hto_pdf_path = selected_entry.get("hto_pdf", "N/A")
 
     # how to order popover - could be useful to display link to how to order page
@@ -119,18 +124,21 @@ with col1:
         st.subheader("Configure Manifold")
         user_defaults = {}
         literal_fields = get_literal_fields(manifold_model)
+        # options are pruned top to bottom --> each dropdown only offers values the selections above still allow
+        manifold_options = reachable_options(manifold_model)
 
         for field_name, choices in literal_fields.items():
             if len(choices) == 1:
                 # auto-apply the only available choice
                 user_defaults[field_name] = choices[0]
             else:
-                selection = st.selectbox(
+                selection = pruned_selectbox(
                     f"{field_name.replace('_', ' ').title()}:",
-                    list(choices),
+                    manifold_options[field_name] or choices,
                     key=field_name
                 )
-                user_defaults[field_name] = selection 
+                user_defaults[field_name] = selection
+                manifold_options = propagate(manifold_model, {**manifold_options, field_name: (selection,)})
 
 # Second column for displaying configured manifold part number
 # --- shows valve configuration for each station
@@ -226,6 +234,7 @@ with col2:
                     if station_type == "Valve":
                         header_cols = st.columns(len(val_visible_fields))
                         cols = st.columns(len(val_visible_fields))
+                        valve_options = reachable_options(valve_model_cls, {**val_hidden_defaults, "series": model_instance.series})
 
                         for i, (field_name, options) in enumerate(val_visible_fields.items()):
                             short_label = smart_abbreviate(field_name, max_len=13)
@@ -234,13 +243,14 @@ with col2:
                                 st.markdown(f"<div style='text-align:center; font-weight:600;'>{short_label}</div>", unsafe_allow_html=True)
 
                             with cols[i]:
-                                selected = st.selectbox(
+                                selected = pruned_selectbox(
                                     "",
-                                    options,
+                                    valve_options[field_name] or options,
                                     key=f"{field_name}_{sta}",
                                     label_visibility="collapsed"
                                 )
                                 config[field_name] = selected
+                                valve_options = propagate(valve_model_cls, {**valve_options, field_name: (selected,)})
 
                         config.update(val_hidden_defaults)
                         config["series"] = model_instance.series
@@ -1,38 +1,71 @@
 import streamlit as st
-
-# --------------------- Part Validation Models -------------------------
-# ---- PLUG IN -----
-from jsy_plugin.valve import JSY_PLUGIN_VALVE_MODEL, PLUGIN_VALVE_TOKEN_MAP
-from jsy_plugin.manifold_dsub_flatribbon import JJ5SY_PLUGIN_MFLD_DSUB_MODEL, JJ5SY_PLUGIN_MFLD_DSUB_TOKEN_MAP
-from jsy_plugin.manifold_terminalbox import JJ5SY_PLUGIN_MFLD_TERMBOX_MODEL, JJ5SY_PLUGIN_MFLD_TERMBOX_TOKEN_MAP
-from jsy_plugin.manifold_leadwire import JJ5SY_PLUGIN_MFLD_LEADWIRE_MODEL, JJ5SY_PLUGIN_MFLD_LEADWIRE_TOKEN_MAP
-from jsy_plugin.manifold_ex600 import JJ5SY_PLUGIN_MFLD_EX600_MODEL, JJ5SY_PLUGIN_MFLD_EX600_TOKEN_MAP
-from jsy_plugin.manifold_ex260 import JJ5SY_PLUGIN_MFLD_EX260_MODEL, JJ5SY_PLUGIN_MFLD_EX260_TOKEN_MAP
-from jsy_plugin.manifold_ex260_profisafe import JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_MODEL, JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_TOKEN_MAP
-from jsy_plugin.manifold_ex120 import JJ5SY_PLUG_IN_MFLD_EX120_MODEL, JJ5SY_PLUGIN_MFLD_EX120_TOKEN_MAP
-from jsy_plugin.manifold_jsy_e import JJ5SY_PLUGIN_EJECTOR_MANIFOLD_MODEL, JJ5SY_PLUGIN_EJECTOR_MANIFOLD_TOKEN_MAP
-
-# ----- NON PLUG IN -----
-from jsy_nonplugin.valve import JSY_NONPLUGIN_VALVE_MODEL, NONPLUGIN_VALVE_TOKEN_MAP
-from jsy_nonplugin.manifold_metalbase import JJ5SY_NONPLUGIN_MFLD_METALBASE_MODEL, JJ5SY_NONPLUGIN_MFLD_METALBASE_TOKEN_MAP
-
-# ----- SY-1 -----
-from SY1.manifold_type_10_11_dsub_flatribbon import SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_MODEL, SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_TOKEN_MAP
-from SY1.manifold_type_10_11_terminal_block_spring_type import SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_MODEL, SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_TOKEN_MAP
-from SY1.valve_base_mounted import SY1_BASE_MOUNTED_PLUGIN_VALVE_MODEL, SY1_BASE_MOUNTED_PLUGIN_VALVE_TOKEN_MAP
-
-# ----- SY -----
-from SY.valve_body_ported import SY_BODY_PORTED_VALVE_MODEL, SY_BODY_PORTED_VALVE_TOKEN_MAP
-
-# ----- Low Vacuum (HF) -----
-from HF.HF1B_ZL import HF1B_ZL_MODEL, HF1B_ZL_TOKEN_MAP 
+from contextlib import nullcontext
 
 # ----- GENERAL FUNCTIONS -----
-from general_functions.parser import TokenMapParser
+from general_functions.instrumentation import RENDER, stage, summary, trace
+from general_functions.result_cache import get_validation_cache, models_version, validate_cached
+from general_functions.validation import validate_chunk
+from general_functions.snapshot import load_snapshot
 # ----------------------------------------------------------------------
-from pydantic import ValidationError
 import pandas as pd
-import re
+from io import BytesIO
+
+# precompiled domains / rule tables / router / parsers --> rebuilt here only when a model source changed
+load_snapshot()
+
+# ------------------------- Functions -----------------------------
+BULK_CHUNK_SIZE = 500  # unique part numbers validated between progress updates
+BULK_CACHE_CHUNKS = 200  # validated chunks kept for reruns (100k unique part numbers)
+
+@st.cache_data(show_spinner=False)
+def read_part_list(file_bytes, file_name):
+    # uploaded CSV / Excel file --> DataFrame of strings (blank cells stay empty strings), parsed once per file
+    if file_name.lower().endswith(".xlsx"):
+        return pd.read_excel(BytesIO(file_bytes), dtype=str).fillna("")
+    return pd.read_csv(BytesIO(file_bytes), dtype=str, keep_default_na=False)
+
+def guess_part_column(columns):
+    # first column that looks like a part number column, otherwise the first column
+    for column in columns:
+        if "part" in str(column).lower():
+            return column
+    return columns[0]
+
+@st.cache_data(show_spinner=False, max_entries=BULK_CACHE_CHUNKS)
+def validate_chunk_cached(part_numbers, version):
+    # chunk of a bulk list (tuple) --> reruns of the same list (column change, download clicks) reuse its results
+    # --> version (models_version()) is part of the cache key, chunks validated before a model edit are not reused
+    return validate_chunk(list(part_numbers))
+
+def validate_unique(part_numbers, progress, timing=False):
+    # validates each distinct part number once --> {part number: result}, progress bar updated per chunk
+    # --> timing=True (?debug=1) validates again instead of reusing cached chunks
+    unique_parts = list(dict.fromkeys(p for p in part_numbers if p))
+    version = models_version()
+    results = {}
+    for start in range(0, len(unique_parts), BULK_CHUNK_SIZE):
+        chunk = unique_parts[start:start + BULK_CHUNK_SIZE]
+        for result in validate_chunk(chunk, timing=True) if timing else validate_chunk_cached(tuple(chunk), version):
+            results[result["input"]] = result
+        done = min(start + BULK_CHUNK_SIZE, len(unique_parts))
+        progress.progress(done / len(unique_parts), text=f"Validated {done} of {len(unique_parts)} unique part numbers")
+    return results
+
+def show_timing(request):
+    # ?debug=1 --> ms per stage of this request, the total also counts the page work between stages
+    timing_df = pd.DataFrame(
+        [{"Stage": name, "ms": round(ms, 3)} for name, ms in request.breakdown().items()]
+        + [{"Stage": "total", "ms": round(request.total * 1000, 3)}]
+    )
+    st.caption("Timing")
+    st.dataframe(timing_df, hide_index=True)
+
+def show_timing_summary():
+    # ?debug=1 --> stages of the last requests of this server process (every session, bulk lists included)
+    summary_df = pd.DataFrame.from_dict(summary(), orient="index").round(3)
+    if not summary_df.empty:
+        st.sidebar.caption("Recent requests (ms)")
+        st.sidebar.dataframe(summary_df)
 
 # -------------------------- Page Setup --------------------------
 st.set_page_config(
@@ -43,155 +76,126 @@ st.set_page_config(
 
 st.title("Part Number Validator")
 
-# Regex Pattern Matching for Model Recognition
-# --------------------- JSY ---------------------------
-# --- plugin
-VALVE_DETECTOR = r"^JSY(?P<series>[135])(?P<actuation>[1-5A-C])(?P<static>\d{2})" # actually covers both plugin and non plugin
-JSY_DSUB_MANIFOLD = r"^JJ5SY[135]-10(FW|FC|F|PG|PHC|PH|PGC|PC|P)[12]-"
-JSY_TERMINAL_BOX_MANIFOLD = r"^JJ5SY[135]-10(TC|T)-"
-JSY_LEADWIRE_MANIFOLD = r"^JJ5SY[135]-10(L1|L2|L3)[123]-"
-JSY_EX600_MANIFOLD = r"^JJ5SY[135]-10S6"
-JSY_EX260_MANIFOLD  = r"^JJ5SY[135]-10S(?!FPN|DPN|0)[A-Z0-9]{2,3}"
-JSY_EX260_PROFISAFE_MANIFOLD = r"^JJ5SY[135]-10S(FPN|DPN|0)"
-JSY_EX120_MANIFOLD = r"^JJ5SY[135]-10S3(ZBN|ZB|V|Q|0)-"
-JSY_EJECTOR_MANIFOLD = r"^JJ5SY1-E10S"
-
-# --- non plugin
-JSY_METALBASE_MANIFOLD = r"^JJ5SY[135]-(40|41)"
+# ?debug=1 --> every part number runs the whole pipeline (no cached result) and the page shows its stage timings
+debug = bool(st.query_params.get("debug"))
 
+# ---------- USER INPUT ----------
 
-# --------------------- SY1 ---------------------------
-SY1_TYPE_10_11_DSUB_MANIFOLD = r"^SS5Y[357]-(10|11)(FW|F|PG|PH|P)"
-SY1_TYPE_10_11_TERMINAL_BLOCK = r"^SS5Y[357]-(10|11)(TC|T)"
-SY1_BASE_MOUNTED_PLUGIN_VALVE = r"^SY[357][ABC12345]0"
+input_mode = st.radio("Input Mode", ["Single Part Number", "Bulk List"], horizontal=True)
 
-# ---------------------- SY ---------------------------
-SY_BODY_PORTED_VALVE = r"^SY[3579][12345]20"
+# ---------- BULK VALIDATION ----------
 
-# ---------------------- HF ---------------------------
-HF1B_ZL = r"^HF1B-ZL"
+if input_mode == "Bulk List":
+    uploaded_file = st.file_uploader("Upload a CSV or Excel part list", type=["csv", "xlsx"])
+    pasted = st.text_area("...or paste part numbers (one per line)", "")
 
-# ---------- USER INPUT ----------
+    if uploaded_file is not None:
+        parts_df = read_part_list(uploaded_file.getvalue(), uploaded_file.name)
+        if parts_df.empty:
+            st.warning("Uploaded file has no rows.")
+            st.stop()
+        columns = list(parts_df.columns)
+        part_column = st.selectbox("Part Number Column", columns, index=columns.index(guess_part_column(columns)))
+    elif pasted.strip():
+        parts_df = pd.DataFrame({"Part Number": pasted.splitlines()})
+        part_column = "Part Number"
+    else:
+        st.stop()
+
+    part_numbers = parts_df[part_column].astype(str).str.strip()
+    progress = st.progress(0.0, text="Validating...")
+    results = validate_unique(part_numbers, progress, timing=debug)
+    progress.empty()
+
+    # join the unique results back onto every row
+    empty_result = {"valid": False, "model": None, "part_number": "", "errors": ["No part number"]}
+    row_results = [results.get(part_number, empty_result) for part_number in part_numbers]
+    annotated_df = parts_df.copy()
+    annotated_df["Valid"] = [r["valid"] for r in row_results]
+    annotated_df["Model"] = [r["model"] or "Unrouted" for r in row_results]
+    annotated_df["Validated Part Number"] = [r["part_number"] for r in row_results]
+    annotated_df["Errors"] = [" | ".join(r["errors"]) for r in row_results]
+
+    valid_count = int(annotated_df["Valid"].sum())
+    st.success(f"✅ {valid_count} of {len(annotated_df)} rows valid ({len(results)} unique part numbers checked)")
+
+    summary_df = (
+        annotated_df.groupby("Model")["Valid"]
+        .agg(Rows="count", Valid="sum")
+        .assign(Invalid=lambda df: df["Rows"] - df["Valid"])
+        .reset_index()
+    )
+    st.subheader("Summary")
+    st.dataframe(summary_df, use_container_width=True, hide_index=True)
+
+    st.subheader("Results")
+    st.dataframe(annotated_df, use_container_width=True, height=35 * (min(len(annotated_df), 20) + 1))
+
+    subcol1, subcol2 = st.columns(2)
+    excel_buffer = BytesIO()
+    annotated_df.to_excel(excel_buffer, index=False, sheet_name="Validation")
+    excel_buffer.seek(0)
+    with subcol1:
+        st.download_button("Download as Excel", data=excel_buffer, file_name="validated_parts.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", use_container_width=True)
+    with subcol2:
+        st.download_button("Download as CSV", data=annotated_df.to_csv(index=False), file_name="validated_parts.csv", mime="text/csv", use_container_width=True)
+    if debug:
+        show_timing_summary()
+    st.stop()
+
+# ---------- SINGLE PART NUMBER ----------
 
 part_number = st.text_input("Enter a part number", "")
 
 # --------- MODEL RECOGNITION ---------
 
 if part_number:
-    model = None
-    token_map = None
-
-    # ---------------- JSY MANIFOLDS -----------------------
-    if re.match(JSY_TERMINAL_BOX_MANIFOLD, part_number):
-        model = JJ5SY_PLUGIN_MFLD_TERMBOX_MODEL
-        token_map = JJ5SY_PLUGIN_MFLD_TERMBOX_TOKEN_MAP
-
-    elif re.match(JSY_DSUB_MANIFOLD, part_number):
-        model = JJ5SY_PLUGIN_MFLD_DSUB_MODEL
-        token_map = JJ5SY_PLUGIN_MFLD_DSUB_TOKEN_MAP
-
-    elif re.match(JSY_LEADWIRE_MANIFOLD, part_number):
-        model = JJ5SY_PLUGIN_MFLD_LEADWIRE_MODEL
-        token_map = JJ5SY_PLUGIN_MFLD_LEADWIRE_TOKEN_MAP
-
-    elif re.match(JSY_EX600_MANIFOLD, part_number):
-        model = JJ5SY_PLUGIN_MFLD_EX600_MODEL
-        token_map = JJ5SY_PLUGIN_MFLD_EX600_TOKEN_MAP
-
-    elif re.match(JSY_EX260_MANIFOLD, part_number):
-        model = JJ5SY_PLUGIN_MFLD_EX260_MODEL
-        token_map = JJ5SY_PLUGIN_MFLD_EX260_TOKEN_MAP
-
-    elif re.match(JSY_EX260_PROFISAFE_MANIFOLD, part_number):
-        model = JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_MODEL
-        token_map = JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_TOKEN_MAP
-
-    elif re.match(JSY_EX120_MANIFOLD, part_number):
-        model = JJ5SY_PLUG_IN_MFLD_EX120_MODEL
-        token_map = JJ5SY_PLUGIN_MFLD_EX120_TOKEN_MAP
-    
-    elif re.match(JSY_METALBASE_MANIFOLD, part_number):
-        model = JJ5SY_NONPLUGIN_MFLD_METALBASE_MODEL
-        token_map = JJ5SY_NONPLUGIN_MFLD_METALBASE_TOKEN_MAP
-
-    elif re.match(JSY_EJECTOR_MANIFOLD, part_number):
-        model = JJ5SY_PLUGIN_EJECTOR_MANIFOLD_MODEL
-        token_map = JJ5SY_PLUGIN_EJECTOR_MANIFOLD_TOKEN_MAP
-
-    # ---------------- SY1 MANIFOLDS -----------------------
-    elif re.match(SY1_TYPE_10_11_DSUB_MANIFOLD, part_number):
-        model = SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_MODEL
-        token_map = SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_TOKEN_MAP
-
-    elif re.match(SY1_TYPE_10_11_TERMINAL_BLOCK, part_number):
-        model = SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_MODEL
-        token_map = SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_TOKEN_MAP
-
-    # ------------------ SY1 VALVES ------------------
-    elif re.match(SY1_BASE_MOUNTED_PLUGIN_VALVE, part_number):
-        model = SY1_BASE_MOUNTED_PLUGIN_VALVE_MODEL
-        token_map = SY1_BASE_MOUNTED_PLUGIN_VALVE_TOKEN_MAP
-
-    # ------------------ SY VALVES -------------------
-    elif re.match(SY_BODY_PORTED_VALVE, part_number):
-        model = SY_BODY_PORTED_VALVE_MODEL
-        token_map = SY_BODY_PORTED_VALVE_TOKEN_MAP
-        
-    # -------------------- HF -------------------------
-    elif re.match(HF1B_ZL, part_number):
-        model = HF1B_ZL_MODEL
-        token_map = HF1B_ZL_TOKEN_MAP
-        
-    else:
-    # checking valve options
-        match = re.match(VALVE_DETECTOR, part_number)
-        if match:
-            static_code = match.group("static")
-            if static_code == "40":
-                model = JSY_NONPLUGIN_VALVE_MODEL
-                token_map = NONPLUGIN_VALVE_TOKEN_MAP
-            elif static_code == "00":
-                model = JSY_PLUGIN_VALVE_MODEL
-                token_map = PLUGIN_VALVE_TOKEN_MAP
+    # routing, parsing and validation results are shared across sessions --> general_functions/result_cache.py
+    with trace(part_number) if debug else nullcontext() as request:
+        result = validate_cached(part_number, refresh=debug)
+        tokens = result["tokens"]
+
+        with stage(RENDER):
+            if result["error_type"] == "routing":
+                st.error(result["errors"][0])
+
+            # ------------ PART VALIDATION ------------
+            elif result["valid"]:
+                validator_df = pd.DataFrame(result["dump"].items(), columns=["Field", "Value"])
+                st.success("✅ Part number is valid.")
+                st.dataframe(validator_df, use_container_width=True, height=35 * (len(tokens) + 1))
+
+                st.markdown(f"### {result['description']}:\n`{result['part_number']}`")
+
+            # PyDantic Model is Throwing Error
+            elif result["error_type"] == "validation":
+                st.error("❌ Validation error:")
+                for line in result["errors"]:
+                    st.write(f"• {line}")
+
+                if tokens is not None:
+                    st.subheader("Parsed Tokens")
+                    st.dataframe(pd.DataFrame([tokens]), use_container_width=True)
+
+            # Parser is Throwing Error
             else:
-                st.error(f"Unknown static code `{static_code}` — cannot determine part type.")
-                st.stop()
-        else:
-            st.error("Invalid part number format — unable to route to a model.")
-            st.stop()
+                st.error(f"❌ {result['errors'][0]}")
+                if tokens is not None:
+                    st.subheader("🔍 Partial Tokens Extracted")
+                    st.dataframe(pd.DataFrame([tokens]).T, use_container_width=True)
+                else:
+                    st.warning("⚠️ Parsing failed before any tokens could be generated.")
+
+    if debug:
+        show_timing(request)
 
+if debug:
+    show_timing_summary()
 
-    # ------------ PART VALIDATION ------------
-    try:
-        parser = TokenMapParser(token_map)
-        tokens = parser.parse(part_number)
-        valve = model(**tokens)
-
-        validator_df = pd.DataFrame(valve.model_dump().items(), columns=["Field", "Value"])
-        st.success("✅ Part number is valid.")
-        st.dataframe(validator_df, use_container_width=True, height=35 * (len(tokens) + 1))
-
-        st.markdown(f"### {valve.description()}:\n`{valve.build_part_number()}`")
-
-    # PyDantic Model is Throwing Error
-    except ValidationError as e:
-        st.error("❌ Validation error:")
-        for err in e.errors():
-            msg = err["msg"]
-            if msg.lower().startswith("value error, "):
-                msg = msg[len("Value error, "):]
-            for line in msg.splitlines():
-                st.write(f"• {line}")
-
-        if "tokens" in locals():
-            st.subheader("Parsed Tokens")
-            st.dataframe(pd.DataFrame([tokens]), use_container_width=True)
-
-    # Parser is Throwing Error
-    except ValueError as e:
-        st.error(f"❌ Parse error: {e}")
-        if "tokens" in locals():
-            st.subheader("🔍 Partial Tokens Extracted")
-            st.dataframe(pd.DataFrame([tokens]).T, use_container_width=True)
-        else:
-            st.warning("⚠️ Parsing failed before any tokens could be generated.")
+# ---------- CACHE STATS ----------
+
+cache_stats = get_validation_cache().stats()
+st.sidebar.caption(
+    f"Validation cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['size']} of {cache_stats['maxsize']} entries)"
+)
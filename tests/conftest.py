@@ -0,0 +1,56 @@
+from functools import lru_cache
+from itertools import product
+
+import pytest
+from pydantic import ValidationError
+
+from general_functions.catalog import CATALOG, find_model
+from general_functions.rules import get_domains
+
+# every model of the catalog once (entries can share a model), in catalog order
+CATALOG_MODELS = list(dict.fromkeys(entry["model"] for entry in CATALOG))
+
+# models whose whole field domain product is small enough to construct with pydantic one by one
+SMALL_MODELS = [find_model(name) for name in (
+    "HF1B_ZL_MODEL", "JSY_NONPLUGIN_VALVE_MODEL", "JSY_PLUGIN_VALVE_MODEL", "SY1_PLUGIN_BLANKING_PLATE_MODEL",
+)]
+
+
+@pytest.fixture(params=CATALOG_MODELS, ids=lambda model_class: model_class.__name__)
+def model_class(request):
+    # tests taking `model_class` run once per catalog model
+    return request.param
+
+
+@pytest.fixture(params=SMALL_MODELS, ids=lambda model_class: model_class.__name__)
+def small_model(request):
+    # tests taking `small_model` run once per model of SMALL_MODELS
+    return request.param
+
+
+@lru_cache(maxsize=None)
+def _pydantic_valid(model_class) -> tuple:
+    domains = get_domains(model_class)
+    valid = []
+    for combo in product(*domains.values()):
+        values = dict(zip(domains, combo))
+        try:
+            model_class(**values)
+        except ValidationError:
+            continue
+        valid.append(values)
+    return tuple(valid)
+
+
+def brute_force_configurations(model_class, defaults=None) -> list:
+    # every valid field dict of the model (with `defaults` fixed), in domain product order, decided by pydantic
+    defaults = defaults or {}
+    return [
+        dict(values) for values in _pydantic_valid(model_class)
+        if all(values.get(name) == value for name, value in defaults.items())
+    ]
+
+
+@pytest.fixture
+def brute_force():
+    return brute_force_configurations
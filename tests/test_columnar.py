@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from general_functions import columnar, validation
+from general_functions.catalog import CATALOG, get_router
+from general_functions.columnar import route_column, split_column, validate_column
+from general_functions.parser import compile_token_map
+from general_functions.router import RoutingError
+from general_functions.sampling import generate_valid_parts
+from general_functions.validation import validate_chunk, validate_part_number
+
+# column wise routing / splitting / validation (general_functions/columnar.py) against the scalar pipeline
+
+PARTS_PER_MODEL = 60
+EDIT_CHARS = "0135ABEFGHLMNPRSTUZ-"
+
+
+@pytest.fixture(scope="module")
+def part_numbers() -> list:
+    # valid part numbers of every routed model, single character edits of them, padding and unroutable strings
+    rng = random.Random(0)
+    parts = []
+    for entry in CATALOG:
+        if entry["pattern"]:
+            parts.extend(generate_valid_parts(entry["model"], PARTS_PER_MODEL, seed=0))
+    edited = []
+    for part_number in parts:
+        i = rng.randrange(len(part_number))
+        edited.append(part_number[:i] + rng.choice(EDIT_CHARS) + part_number[i + 1:])
+        edited.append(part_number[:i] + part_number[i + 1:])
+    padded = [f" {part_number}  " for part_number in parts[::7]]
+    unroutable = ["", "   ", "JSY3120-5Z", "SY30M-26-1A", "XYZ", "jsy1100t-5nzd"]
+    parts = parts + edited + padded + unroutable
+    rng.shuffle(parts)
+    return parts
+
+
+def test_route_column_matches_router(part_numbers):
+    router = get_router()
+    expected = []
+    for part_number in part_numbers:
+        try:
+            expected.append(router.entries.index(router.route(part_number)))
+        except RoutingError:
+            expected.append(-1)
+    assert route_column(part_numbers).tolist() == expected
+
+
+def test_split_column_matches_match_fast(part_numbers):
+    groups = split_column(part_numbers)
+    assert groups
+    for group in groups.values():
+        parser = compile_token_map(group.entry["token_map"])
+        for row, tokens in zip(group.rows, group.tokens.to_pylist()):
+            assert parser.match_fast(part_numbers[row].strip()) == tokens, part_numbers[row]
+        for row in group.fallback_rows:
+            assert parser.match_fast(part_numbers[row].strip()) is None, part_numbers[row]
+
+
+def test_validate_column_matches_scalar(part_numbers):
+    expected = [validate_part_number(part_number) for part_number in part_numbers]
+    assert any(result["valid"] for result in expected) and not all(result["valid"] for result in expected)
+    results = validate_column(part_numbers)
+    mismatches = [(got, want) for got, want in zip(results, expected) if got != want]
+    assert len(results) == len(expected)
+    assert not mismatches, mismatches[:5]
+
+
+def test_validate_chunk_takes_the_column_path(part_numbers, monkeypatch):
+    expected = validate_chunk(part_numbers)
+    calls = []
+
+    def spy(chunk):
+        calls.append(len(chunk))
+        return validate_column(chunk)
+
+    monkeypatch.setattr(validation, "COLUMNAR_MIN_ROWS", 100)
+    monkeypatch.setattr(columnar, "validate_column", spy)
+    assert validate_chunk(part_numbers) == expected
+    assert validate_chunk(part_numbers[:50]) == expected[:50]
+    assert validate_chunk(part_numbers, details=True) == [
+        validate_part_number(part_number, details=True) for part_number in part_numbers
+    ]
+    assert calls == [len(part_numbers)]
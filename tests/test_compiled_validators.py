@@ -0,0 +1,53 @@
+from pydantic import ValidationError
+
+from general_functions.compiled_validators import check_conformance, get_compiled_validator
+from general_functions.validation import error_messages
+from HF.HF1B_ZL import HF1B_ZL_MODEL
+from jsy_plugin.valve import JSY_PLUGIN_VALVE_MODEL
+
+# generated validators (general_functions/compiled_validators.py) against pydantic: same error lines, same instances
+# --> valid configurations, a sample of the field domain product and missing / unknown values of every field
+
+VALID_LIMIT = 1000
+SAMPLE_SIZE = 1000
+
+
+def _pydantic_errors(model_class, tokens) -> list:
+    try:
+        model_class(**tokens)
+    except ValidationError as e:
+        return error_messages(e)
+    return []
+
+
+def test_compiled_validator_matches_pydantic(model_class):
+    compared, mismatched, examples = check_conformance(model_class, SAMPLE_SIZE, valid_limit=VALID_LIMIT)
+    assert compared > 0
+    assert mismatched == 0, examples
+
+
+def test_check_rules_words_the_broken_rule_like_the_model():
+    # JSY1000 without the power saving circuit T --> third rule of the model_validator
+    validator = get_compiled_validator(JSY_PLUGIN_VALVE_MODEL)
+    tokens = {
+        "prefix": "JSY", "series": "1", "actuation": "1", "static": "00", "static2": "5", "light_surge": "Z",
+    }
+    errors, values = validator._check_fields(tokens)
+    assert errors == [] and values["coil_specs"] == ""
+    expected = ["JSY1000 not available without power saving circuit, T"]
+    assert validator._check_rules(values) == expected == _pydantic_errors(JSY_PLUGIN_VALVE_MODEL, tokens)
+    assert validator.errors(tokens) == expected
+
+    # raise style validator --> only the first broken rule is reported (U is also not allowed on JSY1000 here)
+    tokens = {**tokens, "series": "3", "light_surge": "U", "coil_specs": "T"}
+    assert validator._check_rules(validator._check_fields(tokens)[1]) == _pydantic_errors(JSY_PLUGIN_VALVE_MODEL, tokens)
+
+
+def test_check_fields_reports_every_field_error():
+    validator = get_compiled_validator(HF1B_ZL_MODEL)
+    tokens = {"prefix": "HF1B-ZL", "suction_flow_rate": "4", "standard_supply_pressure": "M"}
+    errors, values = validator._check_fields(tokens)
+    assert values is None
+    assert errors == _pydantic_errors(HF1B_ZL_MODEL, tokens) == [
+        "Input should be '3' or '6'", "Field required", "Field required",
+    ]
@@ -0,0 +1,42 @@
+from itertools import combinations, product
+
+from general_functions.counting import CountingPlan, count_valid, get_counting_plan
+from general_functions.rules import get_domains
+
+# exact counts against the brute force domain product validated by pydantic (small models, tests/conftest.py)
+
+
+def test_count_matches_brute_force(small_model, brute_force):
+    assert count_valid(small_model) == len(brute_force(small_model)) > 0
+
+
+def test_count_with_defaults_matches_brute_force(small_model, brute_force):
+    # every single field default and every pair of field defaults
+    domains = get_domains(small_model)
+    cases = [{name: value} for name, choices in domains.items() for value in choices]
+    cases += [
+        {a: value_a, b: value_b}
+        for a, b in combinations(domains, 2) for value_a, value_b in product(domains[a], domains[b])
+    ]
+    mismatches = [
+        (defaults, count_valid(small_model, defaults), len(brute_force(small_model, defaults)))
+        for defaults in cases
+        if count_valid(small_model, defaults) != len(brute_force(small_model, defaults))
+    ]
+    assert not mismatches, mismatches[:10]
+
+
+def test_unranking_lists_every_valid_configuration_once(small_model, brute_force):
+    plan = get_counting_plan(small_model)
+    configurations = [plan.configuration(index) for index in range(plan.total())]
+    found = {tuple(values.items()) for values in configurations}
+    assert len(found) == len(configurations)
+    assert found == {tuple(values.items()) for values in brute_force(small_model)}
+
+
+def test_count_without_rules_is_domain_product(small_model):
+    plan = CountingPlan(small_model, rules=[])
+    total = 1
+    for choices in get_domains(small_model).values():
+        total *= len(choices)
+    assert plan.total() == total
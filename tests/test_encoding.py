@@ -0,0 +1,87 @@
+from typing import Literal
+
+import numpy as np
+import pytest
+from pydantic import create_model
+
+from general_functions.encoding import ConfigurationCodec, contains, get_codec
+
+# mixed radix configuration ids (general_functions/encoding.py): round trips at the edges of every domain, id order,
+# and the uint64 limit
+
+
+def _boundary_ids(codec) -> list:
+    # first / last id, and the ids on both sides of every field's digit rolling over
+    ids = {0, codec.size - 1}
+    for stride in codec.strides:
+        for code in (stride - 1, stride, codec.size - stride, codec.size - 1 - stride):
+            if 0 <= code < codec.size:
+                ids.add(code)
+    return sorted(ids)
+
+
+def test_round_trip_at_domain_boundaries(model_class):
+    codec = get_codec(model_class)
+    ids = _boundary_ids(codec)
+    for code in ids:
+        values = codec.decode(code)
+        assert list(values) == codec.fields
+        assert codec.encode(values) == code
+
+    # first and last choice of every field
+    assert codec.decode(0) == {name: choices[0] for name, choices in codec.domains.items()}
+    assert codec.decode(codec.size - 1) == {name: choices[-1] for name, choices in codec.domains.items()}
+
+    # column wise, same answer
+    table = codec.decode_columns(np.array(ids, dtype=np.uint64))
+    assert table.to_pylist() == [codec.decode(code) for code in ids]
+    encoded_ids, encoded = codec.encode_columns(table)
+    assert encoded.all() and encoded_ids.tolist() == ids
+
+
+def test_out_of_range_ids_are_rejected(model_class):
+    codec = get_codec(model_class)
+    for code in (-1, codec.size):
+        with pytest.raises(ValueError):
+            codec.decode(code)
+    with pytest.raises(ValueError):
+        codec.decode_columns(np.array([codec.size], dtype=np.uint64))
+
+
+def test_values_outside_the_domains(small_model, brute_force):
+    codec = get_codec(small_model)
+    values = brute_force(small_model)[0]
+    name = codec.fields[-1]
+    with pytest.raises(ValueError):
+        codec.encode({**values, name: "?"})
+    columns = {field: [value, value] for field, value in values.items()}
+    columns[name] = [values[name], "?"]
+    ids, encoded = codec.encode_columns(columns)
+    assert encoded.tolist() == [True, False]
+    assert ids.tolist() == [codec.encode(values), 0]
+
+
+def test_valid_ids_follow_the_enumeration(small_model, brute_force):
+    codec = get_codec(small_model)
+    ids = codec.valid_ids()
+    assert ids.tolist() == [codec.encode(values) for values in brute_force(small_model)]
+    assert (np.diff(ids.astype(np.int64)) > 0).all()
+    assert contains(ids, np.arange(codec.size, dtype=np.uint64)).sum() == len(ids)
+    assert codec.to_part_numbers(ids).to_pylist() == [codec.to_part_number(code) for code in ids]
+
+
+def _wide_model(fields, choices):
+    values = tuple(f"v{index}" for index in range(choices))
+    return create_model(f"Wide{fields}x{choices}", **{f"f{index}": (Literal[values], ...) for index in range(fields)})
+
+
+def test_uint64_limit():
+    # 16 fields of 16 choices --> exactly 2**64 ids, the largest one still fits
+    codec = ConfigurationCodec(_wide_model(16, 16))
+    assert codec.size == 2 ** 64
+    last = codec.size - 1
+    assert codec.encode(codec.decode(last)) == last
+    assert codec.decode_columns(np.array([last], dtype=np.uint64)).to_pylist() == [codec.decode(last)]
+
+    with pytest.raises(OverflowError):
+        ConfigurationCodec(_wide_model(17, 16))
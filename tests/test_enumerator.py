@@ -0,0 +1,29 @@
+from general_functions.enumerator import enumerate_part_numbers, iter_valid_configurations
+from general_functions.rules import get_domains
+
+# pruning enumerator against the brute force domain product validated by pydantic (small models, tests/conftest.py)
+
+
+def _field_defaults(model_class) -> list:
+    # no defaults, then each field of more than one choice fixed to its first and to its last choice
+    cases = [{}]
+    for name, choices in get_domains(model_class).items():
+        if len(choices) > 1:
+            cases.extend([{name: choices[0]}, {name: choices[-1]}])
+    return cases
+
+
+def test_enumerator_matches_brute_force(small_model, brute_force):
+    for defaults in _field_defaults(small_model):
+        configurations = list(iter_valid_configurations(small_model, defaults))
+        assert configurations == brute_force(small_model, defaults), defaults
+
+
+def test_enumerator_unknown_default_is_empty(small_model):
+    name = next(iter(get_domains(small_model)))
+    assert list(iter_valid_configurations(small_model, {name: "?"})) == []
+
+
+def test_enumerated_part_numbers_validate(small_model, brute_force):
+    expected = [small_model(**values).build_part_number() for values in brute_force(small_model)]
+    assert list(enumerate_part_numbers(small_model)) == expected
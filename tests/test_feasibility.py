@@ -0,0 +1,64 @@
+from itertools import combinations, product
+
+import pytest
+
+from general_functions.counting import CountingPlan
+from general_functions.feasibility import blocking_rules, get_defaults_error
+from general_functions.rules import get_domains, get_rules
+from HF.HF1B_ZL import HF1B_ZL_MODEL
+from jsy_plugin.valve import JSY_PLUGIN_VALVE_MODEL
+
+# exact feasibility of generator defaults against the brute force pydantic check (small models, tests/conftest.py)
+
+NO_COMBINATION = "No valid combination exists for these defaults:"
+
+
+def test_feasibility_matches_brute_force(small_model, brute_force):
+    # every pair of field defaults --> no error exactly when some valid configuration keeps them
+    domains = get_domains(small_model)
+    rule_fields = {", ".join(f"`{name}`" for name in rule.fields) for rule in get_rules(small_model)}
+    for a, b in combinations(domains, 2):
+        for defaults in ({a: value_a, b: value_b} for value_a, value_b in product(domains[a], domains[b])):
+            error = get_defaults_error(small_model, defaults)
+            assert (error is None) == bool(brute_force(small_model, defaults)), (defaults, error)
+            if error is not None:
+                lines = error.splitlines()
+                assert lines[0] == NO_COMBINATION
+                # every line names the fields of a rule of the model
+                assert all(line.rsplit(" (", 1)[1][:-1] in rule_fields for line in lines[1:]), error
+
+
+@pytest.mark.parametrize("model_class, defaults, expected", [
+    (JSY_PLUGIN_VALVE_MODEL, {"series": "1", "coil_specs": ""},
+     ["JSY1000 not available without power saving circuit, T (`series`, `coil_specs`)"]),
+    (HF1B_ZL_MODEL, {"vacuum_port_size_app_tubing": "F06", "vacuum_pressure_sensor": "G"},
+     ["Pressure gauge not available when F06 or F04 vacuum port size indicated "
+      "(`vacuum_port_size_app_tubing`, `vacuum_pressure_sensor`)"]),
+    # no single rule is broken, but the adapter assembly the separator needs is only available with flow rate 3
+    (HF1B_ZL_MODEL, {"suction_flow_rate": "6", "dynamic2": "-"},
+     ['Adapter assembly only available when suction flow rate option "3" is selected '
+      "(`suction_flow_rate`, `suction_flow_rate_aux1`)",
+      'Dynamic separator "-" should not be present without adapter assembly (`dynamic2`, `suction_flow_rate_aux1`)']),
+])
+def test_defaults_error_names_the_rule(model_class, defaults, expected):
+    assert get_defaults_error(model_class, defaults) == "\n".join([NO_COMBINATION, *(f"- {line}" for line in expected)])
+
+
+def test_blocking_rules_each_unblock_the_defaults():
+    defaults = {"suction_flow_rate": "6", "dynamic2": "-"}
+    blocking = blocking_rules(HF1B_ZL_MODEL, defaults)
+    assert [rule.fields for rule in blocking] == [
+        ("suction_flow_rate", "suction_flow_rate_aux1"), ("dynamic2", "suction_flow_rate_aux1"),
+    ]
+    rules = get_rules(HF1B_ZL_MODEL)
+    for rule in blocking:
+        assert CountingPlan(HF1B_ZL_MODEL, defaults, [other for other in rules if other is not rule]).total() > 0
+
+
+def test_unknown_defaults():
+    assert get_defaults_error(HF1B_ZL_MODEL, {"suction_flow_rate": "9", "series": "1"}) == "\n".join([
+        "Invalid defaults:",
+        "- `suction_flow_rate` = `9` is not an option of HF1B_ZL_MODEL",
+        "- `series` = `1` is not an option of HF1B_ZL_MODEL",
+    ])
+    assert get_defaults_error(HF1B_ZL_MODEL, {}) is None
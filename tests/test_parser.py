@@ -0,0 +1,127 @@
+import pytest
+
+from general_functions.catalog import CATALOG, route_part_number
+from general_functions.parser import TokenMapParser, compile_token_map
+from general_functions.sampling import generate_valid_parts
+from general_functions.validation import validate_part_number
+from HF.HF1B_ZL import HF1B_ZL_MODEL, HF1B_ZL_TOKEN_MAP
+
+# single regex fast path of TokenMapParser against its token by token loop
+# --> the same token dict when the loop parses the string, None when the loop raises
+# packrat mode (parse_all / choose_valid) on part numbers the greedy split gets wrong
+
+PARTS_PER_MODEL = 30
+EDITED_PER_MODEL = 3
+EDIT_CHARS = "0135ABDEFGHLMNPRSTUZ-"
+
+
+def _edits(part_number):
+    # every single character substitution, deletion and insertion
+    for i in range(len(part_number) + 1):
+        if i < len(part_number):
+            yield part_number[:i] + part_number[i + 1:]
+        for ch in EDIT_CHARS:
+            if i < len(part_number):
+                yield part_number[:i] + ch + part_number[i + 1:]
+            yield part_number[:i] + ch + part_number[i:]
+
+
+def _loop_parse(parser, s):
+    # token loop of parse() without the fast path --> tokens, or None when it raises
+    try:
+        return parser.parse(s)
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize("entry", CATALOG, ids=lambda entry: entry["name"])
+def test_match_fast_matches_token_loop(entry):
+    token_map = entry["token_map"]
+    fast = compile_token_map(token_map)
+    assert fast._fast is not None
+    loop = TokenMapParser(token_map)
+    loop._fast = None
+
+    parts = generate_valid_parts(entry["model"], PARTS_PER_MODEL, seed=0)
+    inputs = set(parts)
+    for part_number in parts[:EDITED_PER_MODEL]:
+        inputs.update(_edits(part_number))
+
+    results = [(s, _loop_parse(loop, s), fast.match_fast(s)) for s in sorted(inputs)]
+    assert any(expected is not None for _, expected, _ in results)
+    mismatches = [result for result in results if result[1] != result[2]]
+    assert not mismatches, mismatches[:10]
+
+
+# ------------------------------ Packrat Mode ------------------------------
+
+def _routed_entries():
+    # EX120 part numbers also match the EX260 pattern, which is checked first (see tests/test_router.py)
+    for entry in CATALOG:
+        if entry["name"] == "JSY EX120 Manifold":
+            yield pytest.param(entry, marks=pytest.mark.xfail(reason="routed to the EX260 model", strict=True))
+        elif entry["pattern"]:
+            yield entry
+
+
+@pytest.mark.parametrize("entry", list(_routed_entries()), ids=lambda entry: entry["name"])
+def test_generated_parts_validate(entry):
+    # every valid part number has a split the model accepts and that rebuilds to it, greedy or not
+    for part_number in generate_valid_parts(entry["model"], PARTS_PER_MODEL, seed=1):
+        result = validate_part_number(part_number)
+        assert result["valid"], (part_number, result["errors"])
+        assert result["part_number"] == part_number
+
+
+@pytest.mark.parametrize("part_number, tokens", [
+    # electrical_entry H followed by empty m8_connector_length, S is the suppressor
+    ("SY3120-5HSE-N7", {"electrical_entry": "H", "m8_connector_length": "", "light_surge_voltage_suppressor": "S",
+                        "manual_override": "E", "ab_port_size": "N7"}),
+    # no trailing separator --> the fixed length `-?` token takes its empty option
+    ("SY3100B-5RF1", {"pilot_valve": "B", "light_surge_voltage_suppressor": "R", "manual_override": "F",
+                      "static2": "1", "mounting_screw": ""}),
+])
+def test_packrat_regressions(part_number, tokens):
+    parser = compile_token_map(route_part_number(part_number)["token_map"])
+    assert parser.match_fast(part_number) is None
+    assert parser.parse_all(part_number)
+    result = validate_part_number(part_number)
+    assert result["valid"], result["errors"]
+    assert result["part_number"] == part_number
+    assert {name: result["tokens"][name] for name in tokens} == tokens
+
+
+def test_regex_optional_fixed_token_can_be_empty():
+    parser = compile_token_map(route_part_number("SY3100B-5RF1")["token_map"])
+    s = "SY3100B-5RF1"
+    last_separator = max(k for k, token in enumerate(parser.tokens) if token[0] == "separator")
+    assert (s[len(s):], len(s)) in parser._token_options(s, last_separator, len(s))
+    assert any(tokens["mounting_screw"] == "" for tokens in parser.parse_all(s))
+
+
+def test_greedy_split_invalid_other_split_valid():
+    # greedy puts P into vacuum_pressure_sensor_aux2 (needs a pressure switch), the valid split reads it as the
+    # adapter assembly
+    parser = compile_token_map(HF1B_ZL_TOKEN_MAP)
+    s = "HF1B-ZL3M06-P"
+    greedy = parser.match_fast(s)
+    assert greedy["vacuum_pressure_sensor_aux2"] == "P"
+    candidates = parser.parse_all(s)
+    assert candidates[0] == greedy
+    tokens, instance = parser.choose_valid(HF1B_ZL_MODEL, candidates, s)
+    assert tokens["suction_flow_rate_aux1"] == "P" and tokens["vacuum_pressure_sensor_aux2"] == ""
+    assert instance.build_part_number() == s
+    assert validate_part_number(s)["tokens"] == tokens
+
+
+def test_split_must_rebuild_the_part_number():
+    # the only split leaves the `-` before the mounting screw out, the model accepts it but prints SY3100-5R1-B
+    s = "SY3100-5R1B"
+    entry = route_part_number(s)
+    parser = compile_token_map(entry["token_map"])
+    candidates = parser.parse_all(s)
+    assert len(candidates) == 1
+    assert entry["model"](**candidates[0]).build_part_number() == "SY3100-5R1-B"
+    with pytest.raises(ValueError, match="does not match any valid layout"):
+        parser.choose_valid(entry["model"], candidates, s)
+    assert not validate_part_number(s)["valid"]
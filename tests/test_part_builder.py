@@ -0,0 +1,37 @@
+import pyarrow as pa
+import pytest
+
+from general_functions.catalog import find_model
+from general_functions.part_builder import build_part_numbers, check_builder
+from general_functions.validation import validate_part_number
+
+# column wise building (general_functions/part_builder.py) against each model's build_part_number
+
+CHECK_LIMIT = 2000  # valid configurations per model
+
+# valid part numbers of models with optional / conditional pieces (empty tokens, dynamic separators)
+NAMED_PARTS = [
+    "HF1B-ZL3H06-FM-P",
+    "HF1B-ZL6HF06-EAPG",
+    "JSY1100T-5NZD",
+    "JSY5300-5Z",
+    "SY3300R-51",
+    "SY3100B-5RF1",
+    "SY3120-5HSE-N7",
+]
+
+
+def test_column_builder_matches_build_part_number(model_class):
+    checked, mismatched, examples = check_builder(model_class, limit=CHECK_LIMIT)
+    assert checked > 0
+    assert mismatched == 0, examples
+
+
+@pytest.mark.parametrize("part_number", NAMED_PARTS)
+def test_column_builder_rebuilds_named_parts(part_number):
+    result = validate_part_number(part_number)
+    assert result["valid"], result["errors"]
+    model_class, tokens = find_model(result["model"]), result["tokens"]
+    built = build_part_numbers(model_class, pa.Table.from_pylist([tokens, tokens])).to_pylist()
+    assert built == [model_class(**tokens).build_part_number()] * 2
+    assert built[0] == part_number
@@ -0,0 +1,51 @@
+from itertools import combinations, product
+
+from general_functions.propagation import reachable_options
+from general_functions.rules import get_domains
+from jsy_plugin.valve import JSY_PLUGIN_VALVE_MODEL
+
+# configurator option pruning against the brute force pydantic check (small models, tests/conftest.py)
+# --> a value used by some valid completion of the selections is never pruned
+
+
+def _used_values(configurations, domains) -> dict:
+    used = {name: set() for name in domains}
+    for values in configurations:
+        for name, value in values.items():
+            used[name].add(value)
+    return used
+
+
+def _check(model_class, selections, brute_force):
+    options = reachable_options(model_class, selections)
+    domains = get_domains(model_class)
+    completions = brute_force(model_class, selections)
+    for name, used in _used_values(completions, domains).items():
+        assert used <= set(options[name]), (selections, name, used - set(options[name]))
+        # options keep the model's choice order
+        assert list(options[name]) == [value for value in domains[name] if value in options[name]]
+    if completions:
+        assert all(options[name] == (value,) for name, value in selections.items()), selections
+
+
+def test_no_selection_keeps_every_reachable_value(small_model, brute_force):
+    _check(small_model, {}, brute_force)
+
+
+def test_selections_never_prune_a_valid_completion(small_model, brute_force):
+    # every single field selection and every pair of field selections
+    domains = get_domains(small_model)
+    for name, choices in domains.items():
+        for value in choices:
+            _check(small_model, {name: value}, brute_force)
+    for a, b in combinations(domains, 2):
+        for value_a, value_b in product(domains[a], domains[b]):
+            _check(small_model, {a: value_a, b: value_b}, brute_force)
+
+
+def test_selection_prunes_the_rule_it_breaks():
+    # JSY1000 needs the power saving circuit T --> no other coil option once series 1 is selected
+    options = reachable_options(JSY_PLUGIN_VALVE_MODEL, {"series": "1"})
+    assert options["coil_specs"] == ("T",)
+    assert options["manual_override"] == ("", "D")
+    assert reachable_options(JSY_PLUGIN_VALVE_MODEL, {"series": "1", "coil_specs": ""})["coil_specs"] == ()
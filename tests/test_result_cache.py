@@ -0,0 +1,75 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+from general_functions import result_cache, snapshot
+from general_functions.catalog import CATALOG, _entry, find_entry, module_file
+
+# validate_cached against an edited model module
+# --> the HF1B-ZL catalog entry is pointed at a copy of its module in a temp directory, the copy gets edited
+
+EDITED_MODULE = "edited_hf1b_zl"
+PART_NUMBER = "HF1B-ZL3M06"
+
+
+@pytest.fixture
+def edited_model(tmp_path, monkeypatch):
+    index = next(i for i, entry in enumerate(CATALOG) if entry["name"] == "HF1B-ZL")
+    path = tmp_path / f"{EDITED_MODULE}.py"
+    shutil.copyfile(module_file(CATALOG[index]["model_location"]), path)
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(result_cache._sources, "signature", result_cache._sources["signature"])
+    monkeypatch.setitem(result_cache._sources, "hash", result_cache._sources["hash"])
+    original = CATALOG[index]
+    CATALOG[index] = _entry("HF", "HF1B-ZL", original["pattern"], EDITED_MODULE, "HF1B_ZL_MODEL", "HF1B_ZL_TOKEN_MAP")
+    yield path
+
+    # state derived from the temp module must not outlive the test
+    CATALOG[index] = original
+    sys.modules.pop(EDITED_MODULE, None)
+    monkeypatch.undo()
+    snapshot.clear_derived_state()
+    result_cache.get_validation_cache().clear()
+
+
+def edit(path, old, new):
+    source = path.read_text()
+    assert old in source
+    path.write_text(source.replace(old, new))
+
+
+def test_edited_model_is_recomputed(edited_model):
+    cache = result_cache.get_validation_cache()
+    before = result_cache.validate_cached(PART_NUMBER)
+    model_class = find_entry("HF1B-ZL")["model"]
+    assert before["valid"]
+    assert model_class.__module__ == EDITED_MODULE
+
+    misses = cache.misses
+    assert result_cache.validate_cached(PART_NUMBER) is before
+    assert cache.misses == misses
+
+    version = result_cache.models_version()
+    edit(edited_model, "suction_flow_rate: Literal['3', '6']", "suction_flow_rate: Literal['6']")
+    after = result_cache.validate_cached(PART_NUMBER)
+
+    assert result_cache.models_version() != version
+    assert cache.misses == misses + 1
+    assert not after["valid"]
+    assert after["error_type"] == "validation"
+    assert find_entry("HF1B-ZL")["model"] is not model_class
+    assert find_entry("HF1B-ZL")["model"] is sys.modules[EDITED_MODULE].HF1B_ZL_MODEL
+
+
+def test_touched_model_keeps_cached_results(edited_model):
+    before = result_cache.validate_cached(PART_NUMBER)
+    version = result_cache.models_version()
+
+    stat = os.stat(edited_model)
+    os.utime(edited_model, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert result_cache.models_version() == version
+    assert result_cache.validate_cached(PART_NUMBER) is before
@@ -0,0 +1,98 @@
+import re
+
+import pytest
+
+from general_functions.catalog import CATALOG, route_part_number
+from general_functions.router import RoutingError
+from general_functions.sampling import generate_valid_parts
+
+# trie router (general_functions/router.py) against the if / elif chain the validator page used before the catalog
+# --> same model (or same routing error) for generated part numbers and for copies edited near the start, where the
+#     router patterns look
+
+PARTS_PER_MODEL = 40
+EDITED_PER_MODEL = 5
+EDIT_WINDOW = 14  # characters at the start of a part number that get edited
+EDIT_CHARS = "0123456789ABCDEFGHJKLMNPQRSTUVWYZ-"
+
+# the pre-catalog routing chain, in its order --> (pattern, model class name)
+BASELINE_CHAIN = [
+    (r"^JJ5SY[135]-10(TC|T)-", "JJ5SY_PLUGIN_MFLD_TERMBOX_MODEL"),
+    (r"^JJ5SY[135]-10(FW|FC|F|PG|PHC|PH|PGC|PC|P)[12]-", "JJ5SY_PLUGIN_MFLD_DSUB_MODEL"),
+    (r"^JJ5SY[135]-10(L1|L2|L3)[123]-", "JJ5SY_PLUGIN_MFLD_LEADWIRE_MODEL"),
+    (r"^JJ5SY[135]-10S6", "JJ5SY_PLUGIN_MFLD_EX600_MODEL"),
+    (r"^JJ5SY[135]-10S(?!FPN|DPN|0)[A-Z0-9]{2,3}", "JJ5SY_PLUGIN_MFLD_EX260_MODEL"),
+    (r"^JJ5SY[135]-10S(FPN|DPN|0)", "JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_MODEL"),
+    (r"^JJ5SY[135]-10S3(ZBN|ZB|V|Q|0)-", "JJ5SY_PLUG_IN_MFLD_EX120_MODEL"),
+    (r"^JJ5SY[135]-(40|41)", "JJ5SY_NONPLUGIN_MFLD_METALBASE_MODEL"),
+    (r"^JJ5SY1-E10S", "JJ5SY_PLUGIN_EJECTOR_MANIFOLD_MODEL"),
+    (r"^SS5Y[357]-(10|11)(FW|F|PG|PH|P)", "SY1_MFLD_TYPE_10_11_DSUB_FLATRIBBON_MODEL"),
+    (r"^SS5Y[357]-(10|11)(TC|T)", "SY1_MFLD_TYPE_10_11_TERM_BLOCK_SPRING_MODEL"),
+    (r"^SY[357][ABC12345]0", "SY1_BASE_MOUNTED_PLUGIN_VALVE_MODEL"),
+    (r"^SY[3579][12345]20", "SY_BODY_PORTED_VALVE_MODEL"),
+    (r"^HF1B-ZL", "HF1B_ZL_MODEL"),
+]
+VALVE_DETECTOR = r"^JSY(?P<series>[135])(?P<actuation>[1-5A-C])(?P<static>\d{2})"
+
+
+def baseline_route(part_number) -> str:
+    # model class name, or the error text the page showed
+    for pattern, model_name in BASELINE_CHAIN:
+        if re.match(pattern, part_number):
+            return model_name
+    match = re.match(VALVE_DETECTOR, part_number)
+    if match:
+        static_code = match.group("static")
+        if static_code == "40":
+            return "JSY_NONPLUGIN_VALVE_MODEL"
+        if static_code == "00":
+            return "JSY_PLUGIN_VALVE_MODEL"
+        return f"Unknown static code `{static_code}` — cannot determine part type."
+    return "Invalid part number format — unable to route to a model."
+
+
+def catalog_route(part_number) -> str:
+    try:
+        return route_part_number(part_number)["model"].__name__
+    except RoutingError as e:
+        return str(e)
+
+
+def _edits(part_number):
+    # every single character substitution, deletion and insertion within the edit window
+    for i in range(min(len(part_number), EDIT_WINDOW)):
+        yield part_number[:i] + part_number[i + 1:]
+        for ch in EDIT_CHARS:
+            yield part_number[:i] + ch + part_number[i + 1:]
+            yield part_number[:i] + ch + part_number[i:]
+
+
+@pytest.mark.parametrize("entry", CATALOG, ids=lambda entry: entry["name"])
+def test_router_matches_baseline_chain(entry):
+    parts = generate_valid_parts(entry["model"], PARTS_PER_MODEL, seed=0)
+    assert parts
+    inputs = set(parts)
+    for part_number in parts[:EDITED_PER_MODEL]:
+        inputs.update(_edits(part_number))
+    mismatches = [(p, baseline_route(p), catalog_route(p)) for p in sorted(inputs) if baseline_route(p) != catalog_route(p)]
+    assert not mismatches, mismatches[:10]
+
+
+@pytest.mark.parametrize("part_number, expected", [
+    # overlapping manifold prefixes --> EX260 is checked before EX120 and also matches S3ZB / S3V ...
+    ("JJ5SY1-10S3ZB-08BS-C6", "JJ5SY_PLUGIN_MFLD_EX260_MODEL"),
+    ("JJ5SY3-10SFPN-08B-C8", "JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_MODEL"),
+    ("JJ5SY3-10S0-08B-C8", "JJ5SY_PLUGIN_MFLD_EX260_PROFISAFE_MODEL"),
+    ("JJ5SY5-10S6-08B", "JJ5SY_PLUGIN_MFLD_EX600_MODEL"),
+    # JSY valves fall through every manifold pattern, the static code decides
+    ("JSY3140-5U", "JSY_NONPLUGIN_VALVE_MODEL"),
+    ("JSY5300-5Z", "JSY_PLUGIN_VALVE_MODEL"),
+    ("JSY3120-5Z", "Unknown static code `20` — cannot determine part type."),
+    # the blanking plate has no router pattern
+    ("SY30M-26-1A", "Invalid part number format — unable to route to a model."),
+    ("SY50M-26-1A-B", "Invalid part number format — unable to route to a model."),
+    ("", "Invalid part number format — unable to route to a model."),
+])
+def test_router_overlaps_and_fallthrough(part_number, expected):
+    assert baseline_route(part_number) == expected
+    assert catalog_route(part_number) == expected
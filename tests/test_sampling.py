@@ -0,0 +1,67 @@
+from collections import Counter
+
+from general_functions.counting import count_valid
+from general_functions.rules import get_domains
+from general_functions.sampling import generate_random_instance, generate_valid_parts, sample_configurations
+from HF.HF1B_ZL import HF1B_ZL_MODEL
+
+# uniform draws from the counted valid space against the brute force pydantic check (small models, tests/conftest.py)
+
+COUNT = 100
+
+
+def _key(values) -> tuple:
+    return tuple(values.items())
+
+
+def test_sampled_configurations_are_distinct_and_valid(small_model, brute_force):
+    valid = {_key(values) for values in brute_force(small_model)}
+    drawn = [_key(values) for values in sample_configurations(small_model, COUNT, seed=0)]
+    assert len(drawn) == min(COUNT, len(valid)) == len(set(drawn))
+    assert set(drawn) <= valid
+    assert drawn == [_key(values) for values in sample_configurations(small_model, COUNT, seed=0)]
+
+
+def test_sampling_the_whole_space_draws_every_configuration(small_model, brute_force):
+    drawn = {_key(values) for values in sample_configurations(small_model, count_valid(small_model) + 10, seed=0)}
+    assert drawn == {_key(values) for values in brute_force(small_model)}
+
+
+def test_generated_parts_are_distinct_and_valid(small_model, brute_force):
+    valid = {small_model(**values).build_part_number() for values in brute_force(small_model)}
+    parts = generate_valid_parts(small_model, COUNT, seed=0)
+    assert len(parts) == min(COUNT, len(valid)) == len(set(parts))
+    assert set(parts) <= valid
+
+
+def test_generated_parts_with_defaults(small_model, brute_force):
+    # a field of more than one choice fixed to its value in the last valid configuration
+    domains = get_domains(small_model)
+    name, value = next((name, value) for name, value in brute_force(small_model)[-1].items() if len(domains[name]) > 1)
+    valid = {small_model(**values).build_part_number() for values in brute_force(small_model, {name: value})}
+    parts = generate_valid_parts(small_model, COUNT, {name: value}, seed=0)
+    assert len(set(parts)) == len(parts) == min(COUNT, len(valid))
+    assert set(parts) <= valid
+
+
+def test_duplicate_part_numbers_top_up():
+    # HF1B-ZL prints some configurations the same way (dynamic / dynamic2 separators) --> fewer part numbers than
+    # configurations, asking for more than exist returns each part number once
+    printed = Counter(
+        HF1B_ZL_MODEL.model_construct(**values).build_part_number()
+        for values in sample_configurations(HF1B_ZL_MODEL, count_valid(HF1B_ZL_MODEL))
+    )
+    assert sum(printed.values()) == count_valid(HF1B_ZL_MODEL) > len(printed)
+    assert printed["HF1B-ZL3M06-P"] == 2  # drawn twice as often as a part number printed once (see sampling.py)
+
+    for count in (len(printed) - 1, len(printed), count_valid(HF1B_ZL_MODEL)):
+        parts = generate_valid_parts(HF1B_ZL_MODEL, count, seed=3)
+        assert len(parts) == len(set(parts)) == min(count, len(printed))
+        assert set(parts) <= set(printed)
+
+
+def test_random_instance_respects_defaults(small_model, brute_force):
+    defaults = brute_force(small_model)[0]
+    instance = generate_random_instance(small_model, defaults, seed=0)
+    assert instance.model_dump() == small_model(**defaults).model_dump()
+    assert generate_random_instance(small_model, {next(iter(defaults)): "?"}, seed=0) is None
@@ -0,0 +1,68 @@
+import os
+from itertools import product
+
+import numpy as np
+
+from general_functions import space_store
+from general_functions.encoding import get_codec
+from general_functions.rules import get_domains
+from general_functions.space_store import build_valid_space, open_valid_space, store_path
+from jsy_plugin.valve import JSY_PLUGIN_VALVE_MODEL
+
+# memory mapped valid spaces (general_functions/space_store.py), written to a temporary store directory
+
+
+def test_membership_matches_pydantic(small_model, brute_force, tmp_path):
+    space = open_valid_space(small_model, str(tmp_path))
+    valid = {tuple(values.items()) for values in brute_force(small_model)}
+    assert len(space) == len(valid)
+
+    domains = get_domains(small_model)
+    for combo in product(*domains.values()):
+        values = dict(zip(domains, combo))
+        assert space.contains_tokens(values) == (tuple(values.items()) in valid), values
+
+    # values the ids cannot hold are never members
+    values = brute_force(small_model)[0]
+    assert not space.contains_tokens({**values, next(iter(values)): "?"})
+
+
+def test_sampling_and_range_scans(tmp_path):
+    space = open_valid_space(JSY_PLUGIN_VALVE_MODEL, str(tmp_path))
+    codec = get_codec(JSY_PLUGIN_VALVE_MODEL)
+    sample = space.sample(50, seed=0)
+    assert len(set(sample.tolist())) == 50 and space.contains(sample).all()
+
+    in_range = space.prefix_range({"prefix": "JSY", "series": "5"})
+    assert [codec.decode(code)["series"] for code in in_range] == ["5"] * len(in_range)
+    assert len(in_range) == sum(codec.decode(code)["series"] == "5" for code in space.ids)
+
+
+def test_stale_store_is_rebuilt(monkeypatch, tmp_path):
+    store_dir = str(tmp_path)
+    expected = get_codec(JSY_PLUGIN_VALVE_MODEL).valid_ids().tolist()
+    first = build_valid_space(JSY_PLUGIN_VALVE_MODEL, store_dir)
+
+    # the model source changes --> new hash, the next open builds the new store and removes the old one
+    edited = os.path.join(store_dir, f"{JSY_PLUGIN_VALVE_MODEL.__name__}-1111111111111111.npy")
+    monkeypatch.setattr(space_store, "source_hash", lambda model_class: "1111111111111111")
+    open_valid_space.cache_clear()
+    space = open_valid_space(JSY_PLUGIN_VALVE_MODEL, store_dir)
+    assert store_path(JSY_PLUGIN_VALVE_MODEL, store_dir) == edited
+    assert space.ids.tolist() == expected
+    assert os.listdir(store_dir) == [os.path.basename(edited)]
+    assert not os.path.exists(first)
+    open_valid_space.cache_clear()
+
+
+def test_current_store_is_reused(monkeypatch, tmp_path):
+    store_dir = str(tmp_path)
+    path = build_valid_space(JSY_PLUGIN_VALVE_MODEL, store_dir)
+
+    def build_again(model_class, store_dir):
+        raise AssertionError("current store rebuilt")
+
+    monkeypatch.setattr(space_store, "build_valid_space", build_again)
+    open_valid_space.cache_clear()
+    assert open_valid_space(JSY_PLUGIN_VALVE_MODEL, store_dir).ids.tolist() == np.load(path).tolist()
+    open_valid_space.cache_clear()
@@ -0,0 +1,60 @@
+from itertools import islice
+
+import pandas as pd
+from pydantic import ValidationError
+
+from general_functions.enumerator import iter_valid_configurations
+from general_functions.rules import get_rules
+from general_functions.validation import error_messages
+from general_functions.vectorized import check_columns
+from HF.HF1B_ZL import HF1B_ZL_MODEL
+
+# column wise rule checks (general_functions/vectorized.py) against model(**tokens) when a field's column is missing
+# --> defaulted fields take their default, required fields are reported as "Field required"
+
+ROWS = 100  # valid configurations per model, each checked without one of its columns
+
+
+def _pydantic_errors(model_class, tokens) -> list:
+    try:
+        model_class(**tokens)
+    except ValidationError as e:
+        return error_messages(e)
+    return []
+
+
+def test_missing_column_matches_pydantic(model_class):
+    rows = list(islice(iter_valid_configurations(model_class), ROWS))
+    for field in model_class.model_fields:
+        token_df = pd.DataFrame(rows).drop(columns=[field])
+        check = check_columns(model_class, token_df)
+        for row, tokens in enumerate(token_df.to_dict("records")):
+            if check.unchecked[row]:
+                continue  # plain str fields --> validated normally
+            expected = _pydantic_errors(model_class, tokens)
+            assert bool(check.valid[row]) == (not expected), (field, tokens)
+            assert (check.messages(row) if expected else []) == expected, (field, tokens)
+
+
+def test_known_invalid_combination_is_flagged():
+    # F06 / F04 vacuum port with a pressure gauge --> first rule of HF1B_ZL_MODEL
+    tokens = {
+        "prefix": "HF1B-ZL", "suction_flow_rate": "3", "standard_supply_pressure": "H",
+        "vacuum_port_size_app_tubing": "F06", "vacuum_pressure_sensor": "G",
+    }
+    check = check_columns(HF1B_ZL_MODEL, pd.DataFrame([tokens, {**tokens, "vacuum_pressure_sensor": "GN"}]))
+    assert list(check.valid) == [False, True]
+    assert check.broken_rules(0) == [get_rules(HF1B_ZL_MODEL)[0]]
+    assert check.messages(0) == ["Pressure gauge not available when F06 or F04 vacuum port size indicated"]
+    assert check.messages(0) == _pydantic_errors(HF1B_ZL_MODEL, tokens)
+
+
+def test_missing_required_column_is_invalid():
+    # vacuum_pressure_sensor has no default --> every row fails with "Field required", like model(**tokens)
+    tokens = {
+        "prefix": "HF1B-ZL", "suction_flow_rate": "6", "standard_supply_pressure": "M",
+        "vacuum_port_size_app_tubing": "04",
+    }
+    check = check_columns(HF1B_ZL_MODEL, pd.DataFrame([tokens, tokens]))
+    assert not check.valid.any()
+    assert check.messages(0) == ["Field required"] == _pydantic_errors(HF1B_ZL_MODEL, tokens)
@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+
+import tornado.httpserver
+import tornado.web
+
+from general_functions.catalog import CATALOG, find_entry, find_model
+from general_functions.counting import count_valid
+from general_functions.feasibility import get_defaults_error
+from general_functions.instrumentation import record_results, summary
+from general_functions.rules import get_domains
+from general_functions.sampling import generate_valid_parts
+from general_functions.snapshot import load_snapshot
+from general_functions.validation import validate_chunk
+
+# HTTP counterpart of the validator / generator pages for ERP and PLM integrations
+# --> tornado on asyncio, the request handlers only parse JSON and wait, every validation / generation runs in a
+#     bounded process pool whose workers install the catalog snapshot (general_functions/snapshot.py) on start
+# --> single part numbers arriving within --batch-delay-ms of each other go to the pool as one job (up to
+#     --max-batch-size), batched requests are split into jobs of JOB_SIZE part numbers
+# --> connections are kept alive between requests (HTTP/1.1) until idle for --keep-alive seconds
+#
+#   POST /validate  {"part_number": "...", "details": false}           --> result dict (same as batch_validator.py)
+#   POST /validate  {"part_numbers": ["...", ...], "details": false}   --> {"results": [...]} in request order
+#   POST /generate  {"model": "...", "count": 10, "defaults": {...}, "seed": 0}
+#   GET  /models                                                       --> catalog models and their field choices
+#   GET  /timing                                                       --> per stage summary of the last requests
+#
+# --> POST /validate?debug=1 (or "timing": true in the body) adds "timing" (ms per stage) to every result, those
+#     timings also feed GET /timing (general_functions/instrumentation.py)
+#
+# ex. python validation_service.py --port 8080 --workers 8
+#     python load_generator.py --url http://127.0.0.1:8080 --concurrency 32 --requests 5000
+
+JOB_SIZE = 200  # part numbers per pool job for batched requests
+
+
+# ------------------------- Pool Jobs -----------------------------
+
+def _generate_job(model_name, count, defaults, seed):
+    model_class = find_model(model_name)
+    error = get_defaults_error(model_class, defaults)
+    if error:
+        return {"error": error}
+    return {
+        "model": model_class.__name__,
+        "available": count_valid(model_class, defaults),
+        "part_numbers": generate_valid_parts(model_class, count, defaults, seed),
+    }
+
+
+# ------------------------- Service -----------------------------
+
+class ValidationService:
+    def __init__(self, workers=None, max_batch_size=1000, batch_delay=0.002, max_generate=1000, queue_depth=4):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch_size = max_batch_size
+        self.batch_delay = batch_delay
+        self.max_generate = max_generate
+        self.pool = ProcessPoolExecutor(self.workers, initializer=load_snapshot)
+        # jobs submitted to the pool at once --> further requests wait here instead of piling up in the pool queue
+        self._slots = asyncio.Semaphore(self.workers * queue_depth)
+        self._pending = {}  # (details, timing) --> (part number, future) waiting for the next batch
+        self._flush_handle = None
+        self._batches = set()  # running micro batch tasks --> referenced here so they are not garbage collected
+        self.models = [_model_info(entry) for entry in CATALOG]
+
+    async def start(self):
+        # workers are started before the server listens --> they do not inherit its socket and the first request does
+        # not wait for them
+        await asyncio.gather(*(self.run(os.getpid) for _ in range(self.workers)))
+
+    async def run(self, function, *args):
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, function, *args)
+
+    # single part numbers --> micro batches
+    def submit(self, part_number, details, timing=False):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault((details, timing), [])
+        pending.append((part_number, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+        return future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for options, pending in self._pending.items():
+            if pending:
+                self._pending[options] = []
+                task = asyncio.ensure_future(self._run_batch(pending, *options))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch, details, timing):
+        try:
+            results = await self.run(validate_chunk, [part_number for part_number, _ in batch], details, timing)
+        except Exception as e:  # broken pool --> every request of the batch gets the error
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        if timing:
+            record_results(results)  # worker timings --> GET /timing
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def validate_many(self, part_numbers, details, timing=False):
+        jobs = [
+            self.run(validate_chunk, part_numbers[start:start + JOB_SIZE], details, timing)
+            for start in range(0, len(part_numbers), JOB_SIZE)
+        ]
+        results = [result for chunk in await asyncio.gather(*jobs) for result in chunk]
+        if timing:
+            record_results(results)
+        return results
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def _model_info(entry) -> dict:
+    return {
+        "name": entry["name"],
+        "family": entry["family"],
+        "model": entry["model"].__name__,
+        "routed": entry["pattern"] is not None,
+        "fields": {name: list(choices) for name, choices in get_domains(entry["model"]).items()},
+    }
+
+
+# ------------------------- Handlers -----------------------------
+
+class RequestError(tornado.web.HTTPError):
+    # answered as {"error": message} --> the message may span lines, the status line keeps the standard reason
+    def __init__(self, status_code, message):
+        super().__init__(status_code)
+        self.message = message
+
+
+class JsonHandler(tornado.web.RequestHandler):
+    def initialize(self, service):
+        self.service = service
+
+    def json_body(self) -> dict:
+        try:
+            body = json.loads(self.request.body or b"{}")
+        except ValueError:
+            raise RequestError(400, "Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise RequestError(400, "Request body must be a JSON object")
+        return body
+
+    def write_error(self, status_code, **kwargs):
+        error = kwargs.get("exc_info", (None, None, None))[1]
+        self.finish({"error": error.message if isinstance(error, RequestError) else self._reason})
+
+
+class ValidateHandler(JsonHandler):
+    async def post(self):
+        body = self.json_body()
+        details = bool(body.get("details", False))
+        timing = bool(body.get("timing", False) or self.get_query_argument("debug", ""))
+        if "part_numbers" in body:
+            part_numbers = body["part_numbers"]
+            if not isinstance(part_numbers, list) or not all(isinstance(p, str) for p in part_numbers):
+                raise RequestError(400, "`part_numbers` must be a list of strings")
+            if len(part_numbers) > self.service.max_batch_size:
+                raise RequestError(413, f"At most {self.service.max_batch_size} part numbers per request")
+            self.write({"results": await self.service.validate_many(part_numbers, details, timing)})
+            return
+
+        part_number = body.get("part_number")
+        if not isinstance(part_number, str):
+            raise RequestError(400, "Send `part_number` (string) or `part_numbers` (list of strings)")
+        self.write(await self.service.submit(part_number, details, timing))
+
+
+class GenerateHandler(JsonHandler):
+    async def post(self):
+        body = self.json_body()
+        model_name = body.get("model")
+        try:
+            entry = find_entry(model_name) if isinstance(model_name, str) else None
+        except KeyError:
+            entry = None
+        if entry is None:
+            raise RequestError(404, f"Unknown model '{model_name}', see GET /models")
+
+        count = body.get("count", 10)
+        defaults = body.get("defaults") or {}
+        seed = body.get("seed")
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+            raise RequestError(400, "`count` must be a positive integer")
+        if count > self.service.max_generate:
+            raise RequestError(413, f"At most {self.service.max_generate} part numbers per request")
+        if not isinstance(defaults, dict) or not all(isinstance(v, str) for v in defaults.values()):
+            raise RequestError(400, "`defaults` must map field names to string values")
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+            raise RequestError(400, "`seed` must be an integer or null")
+
+        result = await self.service.run(_generate_job, entry["name"], count, defaults, seed)
+        if "error" in result:
+            raise RequestError(422, result["error"])
+        self.write(result)
+
+
+class ModelsHandler(JsonHandler):
+    def get(self):
+        self.write({"models": self.service.models})
+
+
+class TimingHandler(JsonHandler):
+    def get(self):
+        self.write({"stages": summary()})
+
+
+def make_app(service) -> tornado.web.Application:
+    return tornado.web.Application([
+        (r"/validate", ValidateHandler, {"service": service}),
+        (r"/generate", GenerateHandler, {"service": service}),
+        (r"/models", ModelsHandler, {"service": service}),
+        (r"/timing", TimingHandler, {"service": service}),
+    ])
+
+
+# ------------------------- Main -----------------------------
+
+async def serve(args):
+    service = ValidationService(
+        workers=args.workers,
+        max_batch_size=args.max_batch_size,
+        batch_delay=args.batch_delay_ms / 1000,
+        max_generate=args.max_generate,
+    )
+    server = tornado.httpserver.HTTPServer(
+        make_app(service), idle_connection_timeout=args.keep_alive, body_timeout=args.keep_alive,
+    )
+    stop = asyncio.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal_number, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows --> Ctrl+C ends asyncio.run with KeyboardInterrupt, the finally below still runs
+    try:
+        await service.start()
+        server.listen(args.port, args.host)
+        print(f"validation service on http://{args.host}:{args.port} ({service.workers} workers)", flush=True)
+        await stop.wait()
+    finally:
+        server.stop()
+        service.close()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="HTTP service for part number validation and generation.")
+    arg_parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    arg_parser.add_argument("--port", type=int, default=8080)
+    arg_parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    arg_parser.add_argument("--max-batch-size", type=int, default=1000,
+                            help="part numbers per /validate request and per micro batch")
+    arg_parser.add_argument("--batch-delay-ms", type=float, default=2.0,
+                            help="how long a single part number waits for others to share its pool job")
+    arg_parser.add_argument("--max-generate", type=int, default=1000, help="part numbers per /generate request")
+    arg_parser.add_argument("--keep-alive", type=float, default=60.0, help="seconds an idle connection is kept open")
+    args = arg_parser.parse_args(argv)
+
+    load_snapshot()  # /models reads every model's domains, rebuilt here if stale so the workers only read the file
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()